@@ -7,7 +7,9 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import Board, Garment, Outfit, Product, User  # noqa: F401
+from app.models import (  # noqa: F401
+    Board, CanonicalGarment, FailedPin, Garment, Outfit, Product, TrendRollup, User,
+)
 
 config = context.config
 
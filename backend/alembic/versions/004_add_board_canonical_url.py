@@ -0,0 +1,50 @@
+"""add boards.canonical_url for cross-user analysis sharing
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+"""
+import re
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia congelada de app.services.pinterest.canonical_board_url al crear
+# esta migración: la migración no debe cambiar si la app cambia.
+_BOARD_PATTERN = re.compile(r"https?://(\w+\.)?pinterest\.\w+(/\w+)?/([^/]+)/([^/?]+)")
+
+
+def _canonical_board_url(url: str) -> str:
+    match = _BOARD_PATTERN.match(url.rstrip("/"))
+    if not match:
+        return url.strip().rstrip("/")
+    return f"https://www.pinterest.com/{match.group(3).lower()}/{match.group(4).lower()}/"
+
+
+def upgrade() -> None:
+    op.add_column("boards", sa.Column("canonical_url", sa.Text(), nullable=True))
+
+    # Backfill: sin él los tableros existentes no se deduplican ni comparten análisis
+    conn = op.get_bind()
+    boards = conn.execute(sa.text("SELECT id, pinterest_url FROM boards")).all()
+    if boards:
+        conn.execute(
+            sa.text("UPDATE boards SET canonical_url = :canonical_url WHERE id = :id"),
+            [
+                {"id": board_id, "canonical_url": _canonical_board_url(url)}
+                for board_id, url in boards
+            ],
+        )
+    op.create_index("ix_boards_canonical_url", "boards", ["canonical_url"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_boards_canonical_url", table_name="boards")
+    op.drop_column("boards", "canonical_url")
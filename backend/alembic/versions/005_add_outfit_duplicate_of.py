@@ -0,0 +1,33 @@
+"""add outfits.duplicate_of_id for near-duplicate pins
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("outfits", sa.Column("duplicate_of_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "fk_outfits_duplicate_of_id",
+        "outfits",
+        "outfits",
+        ["duplicate_of_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("fk_outfits_duplicate_of_id", "outfits", type_="foreignkey")
+    op.drop_column("outfits", "duplicate_of_id")
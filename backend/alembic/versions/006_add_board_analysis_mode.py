@@ -0,0 +1,29 @@
+"""add boards.analysis_mode for sampling analyses
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "boards",
+        sa.Column(
+            "analysis_mode", sa.String(20), server_default="full", nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("boards", "analysis_mode")
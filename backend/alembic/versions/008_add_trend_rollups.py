@@ -0,0 +1,96 @@
+"""add trend_rollups and boards.in_rollups, backfilled from completed boards
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GLOBAL_SCOPE = "00000000-0000-0000-0000-000000000000"
+
+_BACKFILL_SOURCES = {
+    "garment_type": """
+        SELECT b.user_id AS scope_id, g.type AS key,
+               date_trunc('month', b.analyzed_at)::date AS period, count(*) AS count
+        FROM garments g JOIN outfits o ON o.id = g.outfit_id
+        JOIN boards b ON b.id = o.board_id
+        WHERE b.status = 'completed' AND b.analyzed_at IS NOT NULL
+        GROUP BY 1, 2, 3
+    """,
+    "garment": """
+        SELECT b.user_id AS scope_id, g.name AS key,
+               date_trunc('month', b.analyzed_at)::date AS period, count(*) AS count
+        FROM garments g JOIN outfits o ON o.id = g.outfit_id
+        JOIN boards b ON b.id = o.board_id
+        WHERE b.status = 'completed' AND b.analyzed_at IS NOT NULL
+        GROUP BY 1, 2, 3
+    """,
+    "color": """
+        SELECT b.user_id AS scope_id, g.color AS key,
+               date_trunc('month', b.analyzed_at)::date AS period, count(*) AS count
+        FROM garments g JOIN outfits o ON o.id = g.outfit_id
+        JOIN boards b ON b.id = o.board_id
+        WHERE b.status = 'completed' AND b.analyzed_at IS NOT NULL
+          AND g.color IS NOT NULL
+        GROUP BY 1, 2, 3
+    """,
+    "style": """
+        SELECT b.user_id AS scope_id, o.style AS key,
+               date_trunc('month', b.analyzed_at)::date AS period, count(*) AS count
+        FROM outfits o JOIN boards b ON b.id = o.board_id
+        WHERE b.status = 'completed' AND b.analyzed_at IS NOT NULL
+          AND o.style IS NOT NULL AND o.duplicate_of_id IS NULL
+        GROUP BY 1, 2, 3
+    """,
+}
+
+
+def upgrade() -> None:
+    op.create_table(
+        "trend_rollups",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("scope_id", sa.Uuid(), nullable=False),
+        sa.Column("dimension", sa.String(20), nullable=False),
+        sa.Column("key", sa.String(100), nullable=False),
+        sa.Column("period", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("scope_id", "dimension", "key", "period"),
+    )
+    op.create_index("ix_trend_rollups_scope_id", "trend_rollups", ["scope_id"])
+    op.add_column(
+        "boards",
+        sa.Column("in_rollups", sa.Boolean(), server_default="false", nullable=False),
+    )
+
+    # Backfill: acumulados por usuario y globales de los tableros ya completados
+    for dimension, source in _BACKFILL_SOURCES.items():
+        op.execute(f"""
+            INSERT INTO trend_rollups (scope_id, dimension, key, period, count)
+            SELECT scope_id, '{dimension}', key, period, count FROM ({source}) s
+        """)
+        op.execute(f"""
+            INSERT INTO trend_rollups (scope_id, dimension, key, period, count)
+            SELECT '{GLOBAL_SCOPE}'::uuid, '{dimension}', key, period, sum(count)
+            FROM ({source}) s
+            GROUP BY key, period
+        """)
+    op.execute(
+        "UPDATE boards SET in_rollups = true "
+        "WHERE status = 'completed' AND analyzed_at IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("boards", "in_rollups")
+    op.drop_index("ix_trend_rollups_scope_id", table_name="trend_rollups")
+    op.drop_table("trend_rollups")
@@ -0,0 +1,150 @@
+"""add canonical_garments and garments.canonical_id, backfilled from existing names
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GLOBAL_SCOPE = "00000000-0000-0000-0000-000000000000"
+
+# Copia congelada de la normalización de app.services.garment_canonical al
+# crear esta migración: la migración no debe cambiar si la app cambia.
+_STOPWORDS = {
+    "a", "al", "con", "corte", "de", "del", "el", "en", "estilo", "la", "las",
+    "los", "modelo", "para", "tipo", "un", "una", "y",
+}
+_VOWELS = set("aeiou")
+_SIMILARITY_THRESHOLD = 0.6
+
+
+def _singular(token: str) -> str:
+    if len(token) > 4 and token.endswith("es") and token[-3] not in _VOWELS:
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _normalize_name(name: str) -> str:
+    text = unicodedata.normalize("NFKD", name.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    tokens = [
+        _singular(t) for t in re.findall(r"[a-z0-9]+", text) if t not in _STOPWORDS
+    ]
+    return " ".join(tokens)[:100]
+
+
+def _trigrams(normalized: str) -> frozenset[str]:
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _similar(
+    canonicals: list[tuple[int, frozenset[str]]], grams: frozenset[str]
+) -> int | None:
+    """Canónico más parecido por Jaccard de trigramas (búsqueda exhaustiva)."""
+    best_id, best_score = None, _SIMILARITY_THRESHOLD
+    for canonical_id, other in canonicals:
+        score = len(grams & other) / len(grams | other) if grams and other else 0.0
+        if score >= best_score:
+            best_id, best_score = canonical_id, score
+    return best_id
+
+_GARMENT_ROLLUP_SOURCE = """
+    SELECT b.user_id AS scope_id, c.name AS key,
+           date_trunc('month', b.analyzed_at)::date AS period, count(*) AS count
+    FROM garments g JOIN outfits o ON o.id = g.outfit_id
+    JOIN boards b ON b.id = o.board_id
+    JOIN canonical_garments c ON c.id = g.canonical_id
+    WHERE b.in_rollups
+    GROUP BY 1, 2, 3
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "canonical_garments",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("type", sa.String(50), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("normalized", sa.String(100), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True),
+            server_default=sa.text("now()"), nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("type", "normalized"),
+    )
+    op.add_column("garments", sa.Column("canonical_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "garments_canonical_id_fkey", "garments", "canonical_garments",
+        ["canonical_id"], ["id"], ondelete="SET NULL",
+    )
+    op.create_index("ix_garments_canonical_id", "garments", ["canonical_id"])
+
+    # Backfill: el nombre más frecuente de cada grupo queda como canónico
+    conn = op.get_bind()
+    names = conn.execute(sa.text(
+        "SELECT type, name FROM garments GROUP BY type, name ORDER BY count(*) DESC"
+    )).all()
+    exact: dict[tuple[str, str], int] = {}
+    by_type: dict[str, list[tuple[int, frozenset[str]]]] = {}
+    assignments = []
+    for garment_type, name in names:
+        normalized = _normalize_name(name) or name.lower()[:100]
+        grams = _trigrams(normalized)
+        canonicals = by_type.setdefault(garment_type, [])
+        canonical_id = exact.get((garment_type, normalized))
+        if canonical_id is None:
+            canonical_id = _similar(canonicals, grams)
+        if canonical_id is None:
+            canonical_id = conn.execute(
+                sa.text(
+                    "INSERT INTO canonical_garments (type, name, normalized) "
+                    "VALUES (:type, :name, :normalized) RETURNING id"
+                ),
+                {"type": garment_type, "name": name[:100], "normalized": normalized},
+            ).scalar_one()
+            exact[(garment_type, normalized)] = canonical_id
+            canonicals.append((canonical_id, grams))
+        assignments.append({"cid": canonical_id, "type": garment_type, "name": name})
+    if assignments:
+        conn.execute(
+            sa.text(
+                "UPDATE garments SET canonical_id = :cid "
+                "WHERE type = :type AND name = :name"
+            ),
+            assignments,
+        )
+
+    # Los acumulados de prendas pasan a contarse por nombre canónico
+    op.execute("DELETE FROM trend_rollups WHERE dimension = 'garment'")
+    op.execute(f"""
+        INSERT INTO trend_rollups (scope_id, dimension, key, period, count)
+        SELECT scope_id, 'garment', key, period, count FROM ({_GARMENT_ROLLUP_SOURCE}) s
+    """)
+    op.execute(f"""
+        INSERT INTO trend_rollups (scope_id, dimension, key, period, count)
+        SELECT '{GLOBAL_SCOPE}'::uuid, 'garment', key, period, sum(count)
+        FROM ({_GARMENT_ROLLUP_SOURCE}) s
+        GROUP BY key, period
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_garments_canonical_id", table_name="garments")
+    op.drop_constraint("garments_canonical_id_fkey", "garments", type_="foreignkey")
+    op.drop_column("garments", "canonical_id")
+    op.drop_table("canonical_garments")
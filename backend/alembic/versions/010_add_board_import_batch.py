@@ -0,0 +1,26 @@
+"""add boards.import_batch_id for bulk imports
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("boards", sa.Column("import_batch_id", sa.Uuid(), nullable=True))
+    op.create_index("ix_boards_import_batch_id", "boards", ["import_batch_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_boards_import_batch_id", table_name="boards")
+    op.drop_column("boards", "import_batch_id")
@@ -0,0 +1,47 @@
+"""add failed_pins dead-letter table
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "failed_pins",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("board_id", sa.Uuid(), nullable=False),
+        sa.Column("outfit_id", sa.Uuid(), nullable=False),
+        sa.Column("image_url", sa.Text(), nullable=False),
+        sa.Column("error_kind", sa.String(20), nullable=False),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.Column("failures", sa.Integer(), server_default="1", nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True),
+            server_default=sa.text("now()"), nullable=False,
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True),
+            server_default=sa.text("now()"), nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["board_id"], ["boards.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["outfit_id"], ["outfits.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint("outfit_id"),
+    )
+    op.create_index("ix_failed_pins_board_id", "failed_pins", ["board_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_failed_pins_board_id", table_name="failed_pins")
+    op.drop_table("failed_pins")
@@ -0,0 +1,28 @@
+"""add outfits.palette for locally extracted dominant colors
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "outfits",
+        sa.Column("palette", postgresql.ARRAY(sa.String(20)), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("outfits", "palette")
@@ -0,0 +1,24 @@
+"""add boards.sample_budget so resumed samples keep the requested budget
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("boards", sa.Column("sample_budget", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("boards", "sample_budget")
@@ -0,0 +1,28 @@
+"""index outfits.duplicate_of_id for ON DELETE SET NULL
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ON DELETE SET NULL de duplicate_of_id busca referencias por cada
+    # outfit borrado: sin índice, borrar un tablero grande es cuadrático.
+    # if_not_exists: las bases que aplicaron la primera versión de 013 ya lo tienen
+    op.create_index(
+        "ix_outfits_duplicate_of_id", "outfits", ["duplicate_of_id"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outfits_duplicate_of_id", table_name="outfits", if_exists=True)
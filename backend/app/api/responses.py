@@ -0,0 +1,157 @@
+import hashlib
+import types
+import typing
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+from app.models.board import Board
+from app.services.response_cache import response_cache
+
+# Estados en los que el contenido del tablero cambia pin a pin
+_IN_PROGRESS_STATUSES = ("scraping", "analyzing")
+
+
+class ORJSONResponse(Response):
+    """Respuesta JSON serializada con orjson (uuid y datetime nativos)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _nested_schema(annotation: Any) -> tuple[type[BaseModel] | None, bool]:
+    """Devuelve (schema anidado, es_lista) para anotaciones como list[X] o X | None."""
+    origin = typing.get_origin(annotation)
+    if origin is list:
+        (item,) = typing.get_args(annotation)
+        schema, _ = _nested_schema(item)
+        return schema, True
+    if origin in (typing.Union, types.UnionType):
+        for arg in typing.get_args(annotation):
+            if arg is not type(None):
+                return _nested_schema(arg)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _dump_plan(
+    schema: type[BaseModel],
+) -> tuple[tuple[str, Any, type[BaseModel] | None, bool], ...]:
+    plan = []
+    for name, field in schema.model_fields.items():
+        nested, is_list = _nested_schema(field.annotation)
+        plan.append((name, field.get_default(call_default_factory=True), nested, is_list))
+    return tuple(plan)
+
+
+def dump_orm(schema: type[BaseModel], obj: Any) -> dict:
+    """
+    Convierte un objeto ORM en dict siguiendo los campos de `schema`,
+    sin pasar por la validación de Pydantic.
+
+    Solo debe usarse con datos que ya vienen de la DB (tipos garantizados
+    por el modelo SQLAlchemy).
+    """
+    data = {}
+    for name, default, nested, is_list in _dump_plan(schema):
+        value = getattr(obj, name, default)
+        if nested is not None and value is not None:
+            if is_list:
+                value = [dump_orm(nested, item) for item in value]
+            else:
+                value = dump_orm(nested, value)
+        data[name] = value
+    return data
+
+
+def orm_json_response(schema: type[BaseModel], obj: Any) -> ORJSONResponse:
+    """Respuesta rápida para payloads ORM: sin validación y con orjson."""
+    if isinstance(obj, list):
+        return ORJSONResponse([dump_orm(schema, item) for item in obj])
+    return ORJSONResponse(dump_orm(schema, obj))
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def render_json(annotation: Any, value: Any) -> bytes:
+    """Serializa `value` como lo haría FastAPI con response_model=annotation."""
+    if settings.FAST_JSON_RESPONSES:
+        schema, is_list = _nested_schema(annotation)
+        if schema is not None:
+            data = [dump_orm(schema, v) for v in value] if is_list else dump_orm(schema, value)
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    adapter = _adapter(annotation)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def board_etag(request: Request, board: Board) -> str | None:
+    """
+    ETag débil de una lectura del tablero: ruta + parámetros + versión
+    (analyzed_at, updated_at y conteo). None mientras el análisis está en
+    curso, porque outfits y prendas cambian sin tocar la fila del tablero.
+    """
+    if board.status in _IN_PROGRESS_STATUSES:
+        return None
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    raw = (
+        f"{request.url.path}?{params}|{board.analyzed_at}|{board.updated_at}"
+        f"|{board.pins_analyzed_count}"
+    )
+    return f'W/"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparación débil: se ignora el prefijo W/
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def _cache_headers(etag: str) -> dict[str, str]:
+    # Respuestas por usuario: el navegador puede guardarlas pero revalida con ETag
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def cached_response(request: Request, etag: str | None) -> Response | None:
+    """
+    304 si el cliente ya tiene esta versión, 200 desde el cache del servidor
+    si está habilitado y la tiene; None si hay que calcular la respuesta.
+    """
+    response_cache.counters["requests"] += 1
+    if etag is None:
+        response_cache.counters["bypassed"] += 1
+        return None
+    if _etag_matches(request, etag):
+        response_cache.counters["not_modified"] += 1
+        return Response(status_code=304, headers=_cache_headers(etag))
+    body = response_cache.get(etag)
+    if body is not None:
+        response_cache.counters["hits"] += 1
+        return Response(body, media_type="application/json", headers=_cache_headers(etag))
+    response_cache.counters["misses"] += 1
+    return None
+
+
+def etag_response(etag: str | None, annotation: Any, value: Any) -> Response:
+    """Serializa la respuesta recién calculada, con ETag y guardada en cache si aplica."""
+    body = render_json(annotation, value)
+    if etag is None:
+        return Response(body, media_type="application/json")
+    response_cache.set(etag, body)
+    return Response(body, media_type="application/json", headers=_cache_headers(etag))
@@ -1,29 +1,87 @@
 import asyncio
 import logging
+import random
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Literal
 
-from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import delete, func as sa_func, select, update
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from sqlalchemy import delete, exists, func as sa_func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import CurrentUser, DBSession
+from app.api.responses import (
+    board_etag,
+    cached_response,
+    etag_response,
+)
+from app.core.config import settings
 from app.core.database import async_session
 from app.models.board import Board
+from app.models.canonical_garment import CanonicalGarment
+from app.models.failed_pin import FailedPin
 from app.models.garment import Garment
 from app.models.outfit import Outfit
-from app.schemas.board import AnalysisStatus, FacetItem, OutfitFacets
+from app.schemas.board import (
+    AnalysisStatus,
+    BulkBoardImport,
+    BulkBoardProgress,
+    BulkImportRejected,
+    BulkImportResponse,
+    BulkImportStatus,
+    FacetItem,
+    OutfitFacets,
+)
 from collections import defaultdict
 
-from app.schemas.garment import ColorRank, GarmentRank, GarmentTypeRank
-from app.schemas.outfit import OutfitDetail, OutfitResponse
+from app.schemas.garment import (
+    ColorRank,
+    GarmentCoOccurrence,
+    GarmentRank,
+    GarmentTypeRank,
+)
+from app.schemas.outfit import (
+    OutfitDetail,
+    OutfitResponse,
+    OutfitSearchHit,
+    OutfitSearchResults,
+    SimilarOutfit,
+)
 from app.services.ai_vision import analyze_outfit_image
-from app.services.pinterest import scrape_board_images
+from app.services.analysis_progress import analysis_progress
+from app.services.analysis_scheduler import analysis_scheduler
+from app.services.analysis_tasks import (
+    cancel_analysis_task,
+    is_analysis_running,
+    start_analysis_task,
+)
+from app.services import cooccurrence, outfit_vectors, search_index
+from app.services.board_sharing import clone_board_analysis, find_shared_analysis
+from app.services.garment_canonical import resolve_canonical_ids
+from app.services.image_dedup import cluster_near_duplicates
+from app.services.image_prefetch import prefetch_image
+from app.services.pinterest import (
+    canonical_board_url,
+    resolve_pinterest_url,
+    scrape_board_images,
+    validate_pinterest_url,
+)
+from app.services.thumbnails import ThumbnailStage
+from app.services.trend_estimates import estimate_fields, max_margin
+from app.services.trend_rollups import add_board_to_rollups, remove_board_from_rollups
+from app.services.vision_errors import classify_error
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["analysis"])
 
+# Outfits por lote de la etapa de color (cada lote se guarda al terminar)
+PALETTE_BATCH_SIZE = 50
+
+# Estados con un análisis en marcha; "queued" espera turno dentro de un lote
+_ACTIVE_STATUSES = ("queued", "scraping", "analyzing")
+
 
 async def _evaluate_garment_filter(
     db,
@@ -36,6 +94,7 @@ async def _evaluate_garment_filter(
 
     Si garment_colors está presente, solo considera prendas cuyo color
     esté en la lista (el color actúa como atributo de la prenda).
+    Los nombres se comparan contra el nombre canónico de la prenda.
     """
     conn_list = connectors_str.split(",") if connectors_str else []
     all_or = not conn_list or all(c == "or" for c in conn_list)
@@ -46,7 +105,11 @@ async def _evaluate_garment_filter(
         q = (
             select(sa_func.distinct(Garment.outfit_id))
             .join(Outfit)
-            .where(Outfit.board_id == board_id, Garment.name.in_(garment_name))
+            .join(CanonicalGarment, Garment.canonical_id == CanonicalGarment.id)
+            .where(
+                Outfit.board_id == board_id,
+                CanonicalGarment.name.in_(garment_name),
+            )
         )
         if color_cond is not None:
             q = q.where(color_cond)
@@ -57,21 +120,29 @@ async def _evaluate_garment_filter(
         q = (
             select(Garment.outfit_id)
             .join(Outfit)
-            .where(Outfit.board_id == board_id, Garment.name.in_(garment_name))
+            .join(CanonicalGarment, Garment.canonical_id == CanonicalGarment.id)
+            .where(
+                Outfit.board_id == board_id,
+                CanonicalGarment.name.in_(garment_name),
+            )
         )
         if color_cond is not None:
             q = q.where(color_cond)
         q = q.group_by(Garment.outfit_id).having(
-            sa_func.count(sa_func.distinct(Garment.name)) == len(garment_name)
+            sa_func.count(sa_func.distinct(CanonicalGarment.name)) == len(garment_name)
         )
         and_result = await db.execute(q)
         return {row[0] for row in and_result.all()}
 
     # Mixed AND/OR: evaluate with Python sets
     q = (
-        select(Garment.name, Garment.outfit_id)
+        select(CanonicalGarment.name, Garment.outfit_id)
         .join(Outfit)
-        .where(Outfit.board_id == board_id, Garment.name.in_(garment_name))
+        .join(CanonicalGarment, Garment.canonical_id == CanonicalGarment.id)
+        .where(
+            Outfit.board_id == board_id,
+            CanonicalGarment.name.in_(garment_name),
+        )
     )
     if color_cond is not None:
         q = q.where(color_cond)
@@ -90,11 +161,387 @@ async def _evaluate_garment_filter(
                 result_ids = result_ids | next_ids
     return result_ids
 
-GEMINI_CONCURRENCY = 3
+# Análisis en curso por URL canónica, para que otros usuarios esperen y
+# reutilicen el resultado en vez de scrapear y analizar el mismo tablero.
+_inflight_by_url: dict[str, asyncio.Event] = {}
+
+
+def _pending_outfit():
+    """Condición de outfit aún sin resultado de Gemini (sin style/season ni prendas)."""
+    has_garments = select(Garment.id).where(Garment.outfit_id == Outfit.id).exists()
+    return (Outfit.style.is_(None), Outfit.season.is_(None), ~has_garments)
+
+
+async def _extract_palettes(
+    board_id: uuid.UUID,
+    outfits_map: list[tuple[uuid.UUID, str]],
+    thumbnails: ThumbnailStage,
+) -> None:
+    """
+    Etapa local de color: paleta dominante de cada outfit desde su miniatura,
+    guardada por lotes para que filtros y tendencias de color estén
+    disponibles antes de que Gemini analice cada pin. Las miniaturas se
+    comparten con la detección de casi duplicados (una descarga por pin).
+    """
+    try:
+        for start in range(0, len(outfits_map), PALETTE_BATCH_SIZE):
+            batch = outfits_map[start:start + PALETTE_BATCH_SIZE]
+            features = await thumbnails.features([url for _oid, url in batch])
+            rows = [
+                {"id": oid, "palette": f.palette}
+                for (oid, _url), f in zip(batch, features)
+                if f.palette is not None
+            ]
+            if rows:
+                async with async_session() as db:
+                    await db.execute(update(Outfit), rows)
+                    # Cambia la versión del tablero (ETag) aunque ya esté completado
+                    await db.execute(
+                        update(Board).where(Board.id == board_id)
+                        .values(updated_at=datetime.now(timezone.utc))
+                    )
+                    await db.commit()
+    except Exception as e:
+        logger.warning("No se pudieron extraer las paletas de color: %s", e)
+
+
+def _pins_analyzed(board: Board) -> int:
+    """Pins terminados: valor de la fila más los incrementos aún en memoria."""
+    pending = analysis_progress.pending(board.id)
+    if not pending:
+        return board.pins_analyzed_count
+    # Un volcado recién confirmado puede contarse dos veces durante un instante
+    return min(board.pins_count, board.pins_analyzed_count + pending)
+
+
+async def _processed_pins(db, board_id: uuid.UUID) -> int:
+    """Pins terminados según los datos: con resultado, casi duplicados o fallidos."""
+    has_garments = select(Garment.id).where(Garment.outfit_id == Outfit.id).exists()
+    failed = select(FailedPin.id).where(FailedPin.outfit_id == Outfit.id).exists()
+    processed_result = await db.execute(
+        select(sa_func.count())
+        .select_from(Outfit)
+        .where(
+            Outfit.board_id == board_id,
+            or_(
+                Outfit.duplicate_of_id.isnot(None),
+                Outfit.style.isnot(None),
+                Outfit.season.isnot(None),
+                has_garments,
+                failed,
+            ),
+        )
+    )
+    return processed_result.scalar() or 0
+
+
+async def _sample_size(db, board: Board) -> int:
+    """Pins únicos ya procesados de un tablero (excluye casi duplicados)."""
+    duplicates_result = await db.execute(
+        select(sa_func.count())
+        .select_from(Outfit)
+        .where(Outfit.board_id == board.id, Outfit.duplicate_of_id.isnot(None))
+    )
+    return max(0, _pins_analyzed(board) - (duplicates_result.scalar() or 0))
+
+
+async def _sample_is_stable(board_id: uuid.UUID, sampled: int) -> bool:
+    """True si el IC 95% de la presencia de cada tipo de prenda ya es estrecho."""
+    async with async_session() as check_db:
+        presence_result = await check_db.execute(
+            select(sa_func.count(sa_func.distinct(Garment.outfit_id)))
+            .join(Outfit)
+            .where(Outfit.board_id == board_id)
+            .group_by(Garment.type)
+        )
+        presence = [row[0] for row in presence_result.all()]
+    return max_margin(presence, sampled) <= settings.SAMPLING_TARGET_MARGIN
+
+
+async def _heartbeat(board_id: uuid.UUID) -> None:
+    """Marca periódicamente que el análisis del tablero sigue vivo."""
+    while True:
+        try:
+            async with async_session() as hb_db:
+                await hb_db.execute(
+                    update(Board).where(Board.id == board_id)
+                    .values(heartbeat_at=datetime.now(timezone.utc))
+                )
+                await hb_db.commit()
+        except Exception as e:
+            logger.warning("No se pudo registrar heartbeat de %s: %s", board_id, e)
+        await asyncio.sleep(settings.ANALYSIS_HEARTBEAT_SECONDS)
+
+
+async def _analyze_single(
+    board_id: uuid.UUID,
+    user_id: uuid.UUID,
+    outfit_id: uuid.UUID,
+    img_url: str,
+    board_pins: int,
+    position: int,
+    prefetch_ahead: asyncio.Semaphore,
+) -> None:
+    """Analiza un pin con Gemini y guarda sus prendas en el outfit pre-creado."""
+    try:
+        # Los slots de Gemini se reparten entre usuarios y tableros en el
+        # planificador global; la posición original prioriza la primera página.
+        # La imagen se descarga antes, sin ocupar slot: el slot solo se toma
+        # durante la llamada al modelo.
+        def slot():
+            return analysis_scheduler.slot(
+                user_id, board_id, board_pins=board_pins, position=position
+            )
+
+        async with prefetch_ahead, prefetch_image(img_url) as image:
+            analysis = await analyze_outfit_image(image, slot=slot)
+        garments = analysis.get("garments", [])
+        canonical_ids = await resolve_canonical_ids(
+            [(g["name"], g["type"]) for g in garments]
+        )
+        async with async_session() as task_db:
+            res = await task_db.execute(
+                select(Outfit).where(Outfit.id == outfit_id)
+            )
+            outfit_obj = res.scalar_one()
+            outfit_obj.style = analysis.get("outfit_style")
+            outfit_obj.season = analysis.get("outfit_season")
+            for g, canonical_id in zip(garments, canonical_ids):
+                task_db.add(Garment(
+                    outfit_id=outfit_id,
+                    name=g["name"],
+                    canonical_id=canonical_id,
+                    type=g["type"],
+                    color=g.get("color"),
+                    material=g.get("material"),
+                    style=g.get("style"),
+                    season=g.get("season"),
+                    confidence=g.get("confidence"),
+                ))
+            await task_db.commit()
+        analysis_progress.record(board_id)
+        outfit_vectors.add_outfit(
+            user_id, board_id, outfit_id,
+            analysis.get("outfit_style"), analysis.get("outfit_season"),
+            [
+                (g["type"], canonical_id, g.get("color"), g.get("material"))
+                for g, canonical_id in zip(garments, canonical_ids)
+            ],
+        )
+    except Exception as e:
+        error = classify_error(e)
+        logger.error("Error %s analizando outfit %s: %s", error.kind, outfit_id, error)
+        try:
+            async with async_session() as err_db:
+                # Dead-letter: queda registrado para POST /retry-failed
+                stmt = pg_insert(FailedPin).values(
+                    board_id=board_id,
+                    outfit_id=outfit_id,
+                    image_url=img_url,
+                    error_kind=error.kind,
+                    error_message=str(error),
+                )
+                await err_db.execute(stmt.on_conflict_do_update(
+                    index_elements=["outfit_id"],
+                    set_={
+                        "error_kind": stmt.excluded.error_kind,
+                        "error_message": stmt.excluded.error_message,
+                        "failures": FailedPin.failures + 1,
+                        "updated_at": sa_func.now(),
+                    },
+                ))
+                await err_db.commit()
+        except Exception:
+            logger.exception(
+                "No se pudo registrar el pin fallido %s para reintentos", outfit_id
+            )
+        analysis_progress.record(board_id)
+
+
+async def _skip_near_duplicates(
+    board_id: uuid.UUID,
+    batch: list[tuple[uuid.UUID, str]],
+    representatives: list[tuple[uuid.UUID, int]],
+    thumbnails: ThumbnailStage,
+) -> list[tuple[uuid.UUID, str]]:
+    """
+    Detecta pins casi duplicados dentro del lote y contra los representantes
+    de lotes anteriores: los enlaza a su representante (cuentan como
+    procesados) y devuelve solo los pins que hay que analizar.
+    """
+    if not settings.NEAR_DUPLICATE_DETECTION or not batch:
+        return batch
+    features = await thumbnails.features([url for _oid, url in batch])
+    hashes = [f.phash for f in features]
+    offset = len(representatives)
+    reps = cluster_near_duplicates(
+        [h for _oid, h in representatives] + hashes,
+        settings.NEAR_DUPLICATE_MAX_DISTANCE,
+    )
+
+    to_analyze: list[tuple[uuid.UUID, str]] = []
+    duplicates: list[dict] = []
+    for i, ((oid, url), h) in enumerate(zip(batch, hashes)):
+        rep = reps[offset + i]
+        if rep == offset + i:
+            to_analyze.append((oid, url))
+            if h is not None:
+                representatives.append((oid, h))
+        elif rep < offset:
+            duplicates.append({"id": oid, "duplicate_of_id": representatives[rep][0]})
+        else:
+            duplicates.append({"id": oid, "duplicate_of_id": batch[rep - offset][0]})
+
+    if duplicates:
+        async with async_session() as dup_db:
+            await dup_db.execute(update(Outfit), duplicates)
+            await dup_db.commit()
+        analysis_progress.record(board_id, len(duplicates))
+        logger.info(
+            "Tablero %s: %d pins casi duplicados (llamadas a Gemini ahorradas)",
+            board_id, len(duplicates),
+        )
+    return to_analyze
+
 
+async def _analyze_outfits(
+    db,
+    board_id: uuid.UUID,
+    user_id: uuid.UUID,
+    outfits_map: list[tuple[uuid.UUID, str]],
+    analysis_mode: str,
+    sample_budget: int | None = None,
+    detect_duplicates: bool = True,
+    thumbnails: ThumbnailStage | None = None,
+) -> None:
+    """
+    FASES 3 y 4: analiza los outfits pendientes con Gemini y finaliza el
+    tablero. `thumbnails` es la etapa de miniaturas del tablero, compartida
+    con la etapa de color; sin ella se crea una solo para los pHash.
+    """
+    # ═══ FASE 3: ANÁLISIS CONCURRENTE CON GEMINI ═══
+    pin_positions = {oid: i for i, (oid, _url) in enumerate(outfits_map)}
+    # Cola acotada del tablero: imágenes descargándose, listas o en análisis.
+    # Cada pin retiene su lugar también durante la llamada a Gemini porque
+    # hasta que termina sigue reteniendo su imagen en el presupuesto global de
+    # bytes: soltarlo al obtener el slot dejaría a un solo tablero descargar
+    # más imágenes y acaparar ese presupuesto. Por eso la cola del
+    # planificador no refleja el largo del tablero (ver board_queue).
+    prefetch_ahead = asyncio.Semaphore(settings.IMAGE_PREFETCH_AHEAD)
+
+    def _task(oid: uuid.UUID, url: str):
+        return _analyze_single(
+            board_id, user_id, oid, url, len(outfits_map), pin_positions[oid],
+            prefetch_ahead,
+        )
 
-async def _run_analysis(board_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    # Los casi duplicados se detectan solo entre los pins que se van a
+    # analizar: en modo muestreo no se descargan miniaturas de pins que
+    # quedan fuera de la muestra.
+    representatives: list[tuple[uuid.UUID, int]] = []
+
+    own_thumbnails = thumbnails is None and detect_duplicates
+    if own_thumbnails:
+        thumbnails = ThumbnailStage(with_palette=False)
+
+    async def _unique(batch: list[tuple[uuid.UUID, str]]):
+        if not detect_duplicates:
+            return batch
+        return await _skip_near_duplicates(board_id, batch, representatives, thumbnails)
+
+    try:
+        if analysis_mode == "sample":
+            # Muestreo aleatorio por lotes: se detiene cuando las
+            # estimaciones se estabilizan o se agota el presupuesto.
+            outfits_map = outfits_map.copy()
+            random.shuffle(outfits_map)
+            budget = min(
+                sample_budget or settings.SAMPLING_DEFAULT_BUDGET,
+                len(outfits_map),
+            )
+            analysis_scheduler.track_board(
+                user_id, board_id, budget, board_pins=len(outfits_map)
+            )
+            sampled = 0
+            drawn = 0
+            while sampled < budget and drawn < len(outfits_map):
+                batch = outfits_map[
+                    drawn:drawn + min(settings.SAMPLING_BATCH_SIZE, budget - sampled)
+                ]
+                drawn += len(batch)
+                batch = await _unique(batch)
+                await asyncio.gather(*[_task(oid, url) for oid, url in batch])
+                sampled += len(batch)
+                if sampled and await _sample_is_stable(board_id, sampled):
+                    break
+            logger.info(
+                "Tablero %s: muestreo de %d/%d pins únicos",
+                board_id, sampled, len(outfits_map),
+            )
+        else:
+            # Pins a analizar, para el ETA de los demás tableros en cola; los
+            # casi duplicados se descuentan a medida que se detectan
+            analysis_scheduler.track_board(
+                user_id, board_id, len(outfits_map), board_pins=len(outfits_map)
+            )
+            # Deduplicación por lotes en orden del tablero: cada lote entra en
+            # la cola de Gemini en cuanto se limpia, sin esperar los pHash del
+            # resto, y la primera página conserva su prioridad.
+            tasks: list[asyncio.Task] = []
+            try:
+                for start in range(0, len(outfits_map), settings.SAMPLING_BATCH_SIZE):
+                    batch = outfits_map[start:start + settings.SAMPLING_BATCH_SIZE]
+                    unique = await _unique(batch)
+                    analysis_scheduler.discount_board(board_id, len(batch) - len(unique))
+                    tasks.extend(asyncio.create_task(_task(oid, url)) for oid, url in unique)
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+    finally:
+        analysis_scheduler.untrack_board(board_id)
+        if own_thumbnails:
+            await thumbnails.aclose()
+
+    # ═══ FASE 4: FINALIZACIÓN ═══
+    await analysis_progress.flush(board_id)
+    result = await db.execute(select(Board).where(Board.id == board_id))
+    board = result.scalar_one()
+    if analysis_progress.pending(board_id):
+        # El volcado final falló: el progreso se recalcula desde los datos
+        await analysis_progress.discard(board_id)
+        board.pins_analyzed_count = await _processed_pins(db, board_id)
+
+    garment_count = await db.execute(
+        select(sa_func.count())
+        .select_from(Garment)
+        .join(Outfit)
+        .where(Outfit.board_id == board_id)
+    )
+    total_garments = garment_count.scalar() or 0
+
+    if total_garments == 0:
+        board.status = "failed"
+        logger.error("Tablero %s: 0 prendas identificadas de %d pins", board_id, board.pins_count)
+    else:
+        board.status = "completed"
+    board.analyzed_at = datetime.now(timezone.utc)
+    if board.status == "completed":
+        await add_board_to_rollups(db, board)
+    await db.commit()
+
+
+async def _run_analysis(
+    board_id: uuid.UUID,
+    user_id: uuid.UUID,
+    refresh: bool = False,
+) -> None:
     """Background task que ejecuta scraping + análisis concurrente."""
+    owned_event: asyncio.Event | None = None
+    canonical_url: str | None = None
+    palette_task: asyncio.Task | None = None
+    thumbnails: ThumbnailStage | None = None
+    heartbeat = asyncio.create_task(_heartbeat(board_id))
     async with async_session() as db:
         try:
             result = await db.execute(
@@ -104,6 +551,27 @@ async def _run_analysis(board_id: uuid.UUID, user_id: uuid.UUID) -> None:
             if board is None:
                 return
 
+            # ═══ FASE 0: REUTILIZAR ANÁLISIS COMPARTIDO ═══
+            canonical_url = canonical_board_url(board.pinterest_url)
+            board.canonical_url = canonical_url
+            if not refresh:
+                inflight = _inflight_by_url.get(canonical_url)
+                if inflight is not None:
+                    await inflight.wait()
+                source = await find_shared_analysis(db, canonical_url, board_id)
+                if source is not None:
+                    await clone_board_analysis(db, source, board)
+                    await add_board_to_rollups(db, board)
+                    await db.commit()
+                    outfit_vectors.invalidate_user(user_id)
+                    logger.info(
+                        "Tablero %s reutiliza el análisis de %s", board_id, source.id
+                    )
+                    return
+            if canonical_url not in _inflight_by_url:
+                owned_event = asyncio.Event()
+                _inflight_by_url[canonical_url] = owned_event
+
             # ═══ FASE 1: SCRAPING ═══
             board.status = "scraping"
             await db.commit()
@@ -111,6 +579,7 @@ async def _run_analysis(board_id: uuid.UUID, user_id: uuid.UUID) -> None:
             scrape_data = await scrape_board_images(board.pinterest_url)
 
             board.pins_count = len(scrape_data["image_urls"])
+            await analysis_progress.discard(board_id)
             board.pins_analyzed_count = 0
             if scrape_data.get("cover_image"):
                 board.image_url = scrape_data["cover_image"]
@@ -121,8 +590,11 @@ async def _run_analysis(board_id: uuid.UUID, user_id: uuid.UUID) -> None:
 
             image_urls = scrape_data["image_urls"]
             pin_urls = scrape_data.get("pin_urls", [])
+            # Una descarga de miniatura por pin para la paleta y el pHash
+            thumbnails = ThumbnailStage(with_palette=settings.LOCAL_COLOR_EXTRACTION)
 
             # ═══ FASE 2: PRE-CREAR OUTFITS ═══
+            # Los casi duplicados se enlazan después, lote a lote (fase 3)
             outfits_map: list[tuple[uuid.UUID, str]] = []
             for i, image_url in enumerate(image_urls):
                 pin_url = pin_urls[i] if i < len(pin_urls) else None
@@ -136,70 +608,19 @@ async def _run_analysis(board_id: uuid.UUID, user_id: uuid.UUID) -> None:
                 outfits_map.append((outfit.id, image_url))
             await db.commit()
 
-            # ═══ FASE 3: ANÁLISIS CONCURRENTE CON GEMINI ═══
-            semaphore = asyncio.Semaphore(GEMINI_CONCURRENCY)
-
-            async def _analyze_single(outfit_id: uuid.UUID, img_url: str) -> None:
-                try:
-                    analysis = await analyze_outfit_image(img_url, semaphore=semaphore)
-                    async with async_session() as task_db:
-                        res = await task_db.execute(
-                            select(Outfit).where(Outfit.id == outfit_id)
-                        )
-                        outfit_obj = res.scalar_one()
-                        outfit_obj.style = analysis.get("outfit_style")
-                        outfit_obj.season = analysis.get("outfit_season")
-                        for g in analysis.get("garments", []):
-                            task_db.add(Garment(
-                                outfit_id=outfit_id,
-                                name=g["name"],
-                                type=g["type"],
-                                color=g.get("color"),
-                                material=g.get("material"),
-                                style=g.get("style"),
-                                season=g.get("season"),
-                                confidence=g.get("confidence"),
-                            ))
-                        await task_db.execute(
-                            update(Board).where(Board.id == board_id)
-                            .values(pins_analyzed_count=Board.pins_analyzed_count + 1)
-                        )
-                        await task_db.commit()
-                except Exception as e:
-                    logger.error("Error analizando outfit %s: %s", outfit_id, e)
-                    try:
-                        async with async_session() as err_db:
-                            await err_db.execute(
-                                update(Board).where(Board.id == board_id)
-                                .values(pins_analyzed_count=Board.pins_analyzed_count + 1)
-                            )
-                            await err_db.commit()
-                    except Exception:
-                        pass
-
-            await asyncio.gather(
-                *[_analyze_single(oid, url) for oid, url in outfits_map]
-            )
-
-            # ═══ FASE 4: FINALIZACIÓN ═══
-            result = await db.execute(select(Board).where(Board.id == board_id))
-            board = result.scalar_one()
+            # ═══ FASE 2.5: PALETA DE COLOR LOCAL (en paralelo con Gemini) ═══
+            if settings.LOCAL_COLOR_EXTRACTION:
+                palette_task = asyncio.create_task(
+                    _extract_palettes(board_id, outfits_map, thumbnails)
+                )
 
-            garment_count = await db.execute(
-                select(sa_func.count())
-                .select_from(Garment)
-                .join(Outfit)
-                .where(Outfit.board_id == board_id)
+            await _analyze_outfits(
+                db, board_id, user_id, outfits_map,
+                board.analysis_mode, sample_budget=board.sample_budget,
+                thumbnails=thumbnails,
             )
-            total_garments = garment_count.scalar() or 0
-
-            if total_garments == 0:
-                board.status = "failed"
-                logger.error("Tablero %s: 0 prendas identificadas de %d pins", board_id, len(image_urls))
-            else:
-                board.status = "completed"
-            board.analyzed_at = datetime.now(timezone.utc)
-            await db.commit()
+            if palette_task is not None:
+                await palette_task
 
         except Exception as e:
             logger.error("Error en análisis del tablero %s: %s", board_id, e)
@@ -213,12 +634,340 @@ async def _run_analysis(board_id: uuid.UUID, user_id: uuid.UUID) -> None:
                     await db.commit()
             except Exception:
                 await db.rollback()
+        finally:
+            heartbeat.cancel()
+            if palette_task is not None:
+                palette_task.cancel()
+            if thumbnails is not None:
+                await thumbnails.aclose()
+            if owned_event is not None:
+                _inflight_by_url.pop(canonical_url, None)
+                owned_event.set()
+
+
+def _stall_cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.ANALYSIS_STALL_SECONDS)
+
+
+def _is_stalled(board: Board) -> bool:
+    """Análisis en curso sin tarea viva en este proceso ni heartbeat reciente."""
+    if board.status not in _ACTIVE_STATUSES or is_analysis_running(board.id):
+        return False
+    return board.heartbeat_at is None or board.heartbeat_at < _stall_cutoff()
+
+
+async def _claim_stalled(db, board_id: uuid.UUID) -> bool:
+    """
+    Reclama un análisis interrumpido renovando su heartbeat en un solo
+    UPDATE condicional: con varios workers o réplicas solo uno lo retoma.
+    """
+    result = await db.execute(
+        update(Board)
+        .where(
+            Board.id == board_id,
+            Board.status.in_(_ACTIVE_STATUSES),
+            or_(Board.heartbeat_at.is_(None), Board.heartbeat_at < _stall_cutoff()),
+        )
+        .values(heartbeat_at=datetime.now(timezone.utc))
+        .returning(Board.id)
+    )
+    await db.commit()
+    return result.scalar_one_or_none() is not None
+
+
+async def _resume_analysis(board_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    """
+    Retoma un análisis interrumpido: recalcula el progreso a partir de los
+    datos y re-encola solo los outfits sin style/season ni prendas.
+    Si se cortó antes de pre-crear outfits, se relanza el análisis completo.
+    """
+    palette_task: asyncio.Task | None = None
+    thumbnails: ThumbnailStage | None = None
+    heartbeat = asyncio.create_task(_heartbeat(board_id))
+    async with async_session() as db:
+        try:
+            result = await db.execute(select(Board).where(Board.id == board_id))
+            board = result.scalar_one_or_none()
+            if board is None:
+                return
+
+            total_result = await db.execute(
+                select(sa_func.count())
+                .select_from(Outfit)
+                .where(Outfit.board_id == board_id)
+            )
+            total = total_result.scalar() or 0
+            if total == 0:
+                heartbeat.cancel()
+                await _run_analysis(board_id, user_id)
+                return
+
+            pending_result = await db.execute(
+                select(Outfit.id, Outfit.image_url, Outfit.palette)
+                .where(
+                    Outfit.board_id == board_id,
+                    Outfit.duplicate_of_id.is_(None),
+                    *_pending_outfit(),
+                )
+                .order_by(Outfit.created_at)
+            )
+            pending_rows = pending_result.all()
+            outfits_map = [(row.id, row.image_url) for row in pending_rows]
+            thumbnails = ThumbnailStage(with_palette=settings.LOCAL_COLOR_EXTRACTION)
+            if settings.LOCAL_COLOR_EXTRACTION:
+                palette_task = asyncio.create_task(_extract_palettes(board_id, [
+                    (row.id, row.image_url) for row in pending_rows
+                    if row.palette is None
+                ], thumbnails))
+
+            board.pins_count = total
+            await analysis_progress.discard(board_id)
+            board.pins_analyzed_count = total - len(outfits_map)
+            board.status = "analyzing"
+            await db.commit()
+            logger.info(
+                "Tablero %s: reanudando análisis, %d/%d pins pendientes",
+                board_id, len(outfits_map), total,
+            )
+
+            sample_budget = None
+            if board.analysis_mode == "sample":
+                sampled = await _sample_size(db, board)
+                sample_budget = max(
+                    0, (board.sample_budget or settings.SAMPLING_DEFAULT_BUDGET) - sampled
+                )
+                if sample_budget == 0:
+                    outfits_map = []
+
+            await _analyze_outfits(
+                db, board_id, user_id, outfits_map,
+                board.analysis_mode, sample_budget=sample_budget,
+                thumbnails=thumbnails,
+            )
+            if palette_task is not None:
+                await palette_task
+        except Exception as e:
+            logger.error("Error reanudando el análisis del tablero %s: %s", board_id, e)
+            try:
+                await db.rollback()
+                await db.execute(
+                    update(Board).where(Board.id == board_id).values(status="failed")
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+        finally:
+            heartbeat.cancel()
+            if palette_task is not None:
+                palette_task.cancel()
+            if thumbnails is not None:
+                await thumbnails.aclose()
+
+
+async def _retry_failed_analysis(
+    board_id: uuid.UUID,
+    user_id: uuid.UUID,
+    outfits_map: list[tuple[uuid.UUID, str]],
+) -> None:
+    """Re-analiza los pins del dead-letter y vuelve a finalizar el tablero."""
+    heartbeat = asyncio.create_task(_heartbeat(board_id))
+    async with async_session() as db:
+        try:
+            # Los pins fallidos ya pasaron la detección de duplicados
+            await _analyze_outfits(
+                db, board_id, user_id, outfits_map, "full", detect_duplicates=False
+            )
+        except Exception as e:
+            logger.error("Error reintentando pins fallidos de %s: %s", board_id, e)
+            try:
+                await db.rollback()
+                await db.execute(
+                    update(Board).where(Board.id == board_id).values(status="failed")
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+        finally:
+            heartbeat.cancel()
+
+
+async def resume_stalled_analyses() -> int:
+    """Re-encola todos los análisis interrumpidos (p. ej. al iniciar el proceso)."""
+    async with async_session() as db:
+        result = await db.execute(
+            select(Board).where(Board.status.in_(_ACTIVE_STATUSES))
+        )
+        candidates = [board for board in result.scalars().all() if _is_stalled(board)]
+        # Otro proceso puede estar retomando los mismos tableros
+        stalled = [board for board in candidates if await _claim_stalled(db, board.id)]
+
+    for board in stalled:
+        start_analysis_task(board.id, _resume_analysis(board.id, board.user_id))
+    if stalled:
+        logger.info("Reanudando %d análisis interrumpidos", len(stalled))
+    return len(stalled)
+
+
+async def _run_queued_analysis(
+    batch_slots: asyncio.Semaphore,
+    board_id: uuid.UUID,
+    user_id: uuid.UUID,
+) -> None:
+    """
+    Análisis de un tablero de un lote: espera turno entre los del mismo lote
+    en estado "queued", con heartbeat para que no se tome por interrumpido.
+    """
+    heartbeat = asyncio.create_task(_heartbeat(board_id))
+    try:
+        await batch_slots.acquire()
+    finally:
+        heartbeat.cancel()
+    try:
+        await _run_analysis(board_id, user_id)
+    finally:
+        batch_slots.release()
+
+
+@router.post("/boards/bulk", response_model=BulkImportResponse, status_code=201)
+async def bulk_import_boards(
+    data: BulkBoardImport, current_user: CurrentUser, db: DBSession
+):
+    """
+    Importa varios tableros de una vez: resuelve los enlaces cortos en
+    paralelo, descarta duplicados y tableros ya existentes, crea los nuevos
+    en una sola transacción y encola sus análisis como un lote.
+    """
+    if len(data.pinterest_urls) > settings.BULK_IMPORT_MAX_URLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo {settings.BULK_IMPORT_MAX_URLS} URLs por importación",
+        )
+
+    resolve_slots = asyncio.Semaphore(settings.BULK_RESOLVE_CONCURRENCY)
+
+    async def resolve(url: str) -> str:
+        async with resolve_slots:
+            return await resolve_pinterest_url(url)
+
+    resolved_urls = await asyncio.gather(*(resolve(u) for u in data.pinterest_urls))
+
+    rejected: list[BulkImportRejected] = []
+    urls_by_canonical: dict[str, str] = {}
+    for original, resolved_url in zip(data.pinterest_urls, resolved_urls):
+        if not validate_pinterest_url(resolved_url):
+            rejected.append(
+                BulkImportRejected(url=original, reason="URL de Pinterest inválida")
+            )
+            continue
+        canonical_url = canonical_board_url(resolved_url)
+        if canonical_url in urls_by_canonical:
+            rejected.append(
+                BulkImportRejected(url=original, reason="URL repetida en el lote")
+            )
+            continue
+        urls_by_canonical[canonical_url] = resolved_url
+
+    existing_result = await db.execute(
+        select(Board).where(
+            Board.user_id == current_user.id,
+            Board.canonical_url.in_(urls_by_canonical),
+        )
+    )
+    existing = list(existing_result.scalars().all())
+    existing_urls = {board.canonical_url for board in existing}
+
+    new_urls = [
+        (canonical_url, resolved_url)
+        for canonical_url, resolved_url in urls_by_canonical.items()
+        if canonical_url not in existing_urls
+    ]
+    batch_id = uuid.uuid4()
+    analysis_mode = "sample" if data.pin_budget and data.analyze else "full"
+    # El presupuesto de pins del lote se reparte por igual entre tableros
+    sample_budget = (
+        max(1, data.pin_budget // len(new_urls))
+        if analysis_mode == "sample" and new_urls else None
+    )
+    created = [
+        Board(
+            user_id=current_user.id,
+            name=resolved_url.rstrip("/").split("/")[-1].replace("-", " ").title(),
+            pinterest_url=resolved_url,
+            canonical_url=canonical_url,
+            import_batch_id=batch_id,
+            analysis_mode=analysis_mode,
+            sample_budget=sample_budget,
+            status="queued" if data.analyze else "pending",
+            heartbeat_at=datetime.now(timezone.utc) if data.analyze else None,
+            pins_count=0,
+            pins_analyzed_count=0,
+        )
+        for canonical_url, resolved_url in new_urls
+    ]
+    db.add_all(created)
+    await db.commit()
+
+    if data.analyze and created:
+        batch_slots = asyncio.Semaphore(settings.BULK_ANALYSIS_CONCURRENCY)
+        for board in created:
+            start_analysis_task(
+                board.id, _run_queued_analysis(batch_slots, board.id, current_user.id)
+            )
+
+    return BulkImportResponse(
+        batch_id=batch_id,
+        created=[BulkBoardProgress.model_validate(board) for board in created],
+        existing=[BulkBoardProgress.model_validate(board) for board in existing],
+        rejected=rejected,
+    )
+
+
+@router.get("/boards/bulk/{batch_id}", response_model=BulkImportStatus)
+async def get_bulk_import_status(
+    batch_id: uuid.UUID, current_user: CurrentUser, db: DBSession
+):
+    """Progreso agregado de todos los tableros de un lote de importación."""
+    result = await db.execute(
+        select(Board)
+        .where(Board.import_batch_id == batch_id, Board.user_id == current_user.id)
+        .order_by(Board.created_at)
+    )
+    boards = list(result.scalars().all())
+    if not boards:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Lote no encontrado"
+        )
+
+    in_progress = any(b.status in ("pending", *_ACTIVE_STATUSES) for b in boards)
+    return BulkImportStatus(
+        batch_id=batch_id,
+        status="analyzing" if in_progress else "completed",
+        boards_total=len(boards),
+        boards_completed=sum(b.status == "completed" for b in boards),
+        boards_failed=sum(b.status in ("failed", "cancelled") for b in boards),
+        pins_total=sum(b.pins_count for b in boards),
+        pins_analyzed=sum(_pins_analyzed(b) for b in boards),
+        boards=[BulkBoardProgress.model_validate(b) for b in boards],
+    )
 
 
 @router.post("/boards/{board_id}/analyze", status_code=202)
 async def analyze_board(
-    board_id: uuid.UUID, current_user: CurrentUser, db: DBSession
+    board_id: uuid.UUID,
+    current_user: CurrentUser,
+    db: DBSession,
+    refresh: bool = False,
+    mode: Literal["full", "sample"] = "full",
+    sample_budget: int | None = Query(None, ge=1),
 ):
+    """
+    Inicia el análisis del tablero. Si otro usuario ya analizó el mismo
+    tablero dentro de la ventana de frescura se reutiliza su resultado;
+    `refresh=true` fuerza un scraping y análisis nuevos.
+
+    Con `mode=sample` se analiza una muestra aleatoria de hasta
+    `sample_budget` pins y las tendencias se publican como estimaciones.
+    """
     result = await db.execute(
         select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
     )
@@ -229,26 +978,148 @@ async def analyze_board(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
         )
 
-    if board.status in ("scraping", "analyzing"):
+    if is_analysis_running(board_id) or (
+        board.status in _ACTIVE_STATUSES
+        and not (_is_stalled(board) and await _claim_stalled(db, board_id))
+    ):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="El tablero ya está siendo analizado",
         )
 
     # Borrar outfits anteriores para re-análisis limpio
+    await remove_board_from_rollups(db, board)
     await db.execute(delete(Outfit).where(Outfit.board_id == board_id))
+    cooccurrence.invalidate(board_id)
+    search_index.invalidate(board_id)
+    outfit_vectors.remove_board(current_user.id, board_id)
 
     board.status = "scraping"
+    board.analysis_mode = mode
+    board.sample_budget = sample_budget if mode == "sample" else None
+    # Heartbeat desde ya: otro proceso no debe tomarlo por interrumpido
+    board.heartbeat_at = datetime.now(timezone.utc)
     board.pins_count = 0
+    await analysis_progress.discard(board_id)
     board.pins_analyzed_count = 0
     await db.commit()
 
     # Lanzar análisis en background
-    asyncio.create_task(_run_analysis(board_id, current_user.id))
+    start_analysis_task(
+        board_id, _run_analysis(board_id, current_user.id, refresh=refresh)
+    )
 
     return {"message": "Análisis iniciado", "board_id": str(board_id)}
 
 
+@router.post("/boards/{board_id}/analyze/resume", status_code=202)
+async def resume_board_analysis(
+    board_id: uuid.UUID, current_user: CurrentUser, db: DBSession
+):
+    """Retoma un análisis interrumpido sin repetir los pins ya analizados."""
+    result = await db.execute(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
+    )
+    board = result.scalar_one_or_none()
+
+    if board is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
+        )
+
+    if not _is_stalled(board) or not await _claim_stalled(db, board_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El tablero no tiene un análisis interrumpido",
+        )
+
+    start_analysis_task(board_id, _resume_analysis(board_id, current_user.id))
+
+    return {"message": "Análisis reanudado", "board_id": str(board_id)}
+
+
+@router.post("/boards/{board_id}/retry-failed", status_code=202)
+async def retry_failed_pins(
+    board_id: uuid.UUID, current_user: CurrentUser, db: DBSession
+):
+    """Vuelve a encolar todos los pins del tablero cuyo análisis falló."""
+    result = await db.execute(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
+    )
+    board = result.scalar_one_or_none()
+
+    if board is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
+        )
+
+    if is_analysis_running(board_id) or (
+        board.status in _ACTIVE_STATUSES
+        and not (_is_stalled(board) and await _claim_stalled(db, board_id))
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El tablero ya está siendo analizado",
+        )
+
+    failed_result = await db.execute(
+        select(FailedPin.outfit_id, FailedPin.image_url)
+        .where(FailedPin.board_id == board_id)
+        .order_by(FailedPin.created_at)
+    )
+    outfits_map = [(row.outfit_id, row.image_url) for row in failed_result.all()]
+    if not outfits_map:
+        return {"message": "No hay pins fallidos", "board_id": str(board_id), "retried": 0}
+
+    # Los conteos del tablero cambiarán: se restan de los acumulados
+    await remove_board_from_rollups(db, board)
+    await db.execute(delete(FailedPin).where(FailedPin.board_id == board_id))
+    board.status = "analyzing"
+    board.heartbeat_at = datetime.now(timezone.utc)
+    board.pins_analyzed_count = max(0, board.pins_analyzed_count - len(outfits_map))
+    await db.commit()
+
+    start_analysis_task(
+        board_id, _retry_failed_analysis(board_id, current_user.id, outfits_map)
+    )
+
+    return {
+        "message": "Reintentando pins fallidos",
+        "board_id": str(board_id),
+        "retried": len(outfits_map),
+    }
+
+
+@router.post("/boards/{board_id}/analyze/cancel")
+async def cancel_board_analysis(
+    board_id: uuid.UUID, current_user: CurrentUser, db: DBSession
+):
+    """Cancela el análisis en curso o en cola y marca el tablero como `cancelled`."""
+    result = await db.execute(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
+    )
+    board = result.scalar_one_or_none()
+
+    if board is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
+        )
+
+    if board.status not in _ACTIVE_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El tablero no tiene un análisis en curso",
+        )
+
+    await cancel_analysis_task(board_id)
+
+    await db.refresh(board)
+    board.status = "cancelled"
+    await db.commit()
+
+    return {"message": "Análisis cancelado", "board_id": str(board_id)}
+
+
 @router.get("/boards/{board_id}/status", response_model=AnalysisStatus)
 async def get_board_status(
     board_id: uuid.UUID, current_user: CurrentUser, db: DBSession
@@ -272,6 +1143,37 @@ async def get_board_status(
     )
     garments_created = garments_count_result.scalar() or 0
 
+    duplicates_result = await db.execute(
+        select(sa_func.count())
+        .select_from(Outfit)
+        .where(Outfit.board_id == board_id, Outfit.duplicate_of_id.isnot(None))
+    )
+    duplicates_skipped = duplicates_result.scalar() or 0
+
+    failed_result = await db.execute(
+        select(sa_func.count())
+        .select_from(FailedPin)
+        .where(FailedPin.board_id == board_id)
+    )
+    pins_failed = failed_result.scalar() or 0
+
+    # Pins que faltan por analizar: la cola del planificador solo tiene los
+    # ya descargados, así que posición y ETA se estiman a partir de estos
+    remaining = 0
+    if board.status == "analyzing":
+        remaining = board.pins_count - _pins_analyzed(board)
+        if board.analysis_mode == "sample":
+            budget = min(
+                board.sample_budget or settings.SAMPLING_DEFAULT_BUDGET,
+                board.pins_count - duplicates_skipped,
+            )
+            remaining = min(
+                remaining, budget - (_pins_analyzed(board) - duplicates_skipped)
+            )
+    queue_position, eta_seconds = analysis_scheduler.board_queue(
+        board_id, board.user_id, remaining
+    )
+
     # board.status ya contiene la fase explícita
     phase = board.status
 
@@ -279,15 +1181,21 @@ async def get_board_status(
         status=board.status,
         phase=phase,
         pins_total=board.pins_count,
-        pins_analyzed=board.pins_analyzed_count,
-        outfits_created=board.pins_analyzed_count,
+        pins_analyzed=_pins_analyzed(board),
+        outfits_created=_pins_analyzed(board),
         garments_created=garments_created,
+        duplicates_skipped=duplicates_skipped,
+        pins_failed=pins_failed,
+        analysis_mode=board.analysis_mode,
+        queue_position=queue_position,
+        eta_seconds=eta_seconds,
     )
 
 
 @router.get("/boards/{board_id}/outfits", response_model=list[OutfitResponse])
 async def list_board_outfits(
     board_id: uuid.UUID,
+    request: Request,
     current_user: CurrentUser,
     db: DBSession,
     garment_name: list[str] | None = Query(None),
@@ -298,19 +1206,23 @@ async def list_board_outfits(
     outfit_style: list[str] | None = Query(None),
 ):
     board_result = await db.execute(
-        select(Board.id).where(
+        select(Board).where(
             Board.id == board_id, Board.user_id == current_user.id
         )
     )
-    if board_result.scalar_one_or_none() is None:
+    board = board_result.scalar_one_or_none()
+    if board is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
         )
+    etag = board_etag(request, board)
+    if (cached := cached_response(request, etag)) is not None:
+        return cached
 
     query = (
         select(Outfit)
         .options(selectinload(Outfit.garments))
-        .where(Outfit.board_id == board_id)
+        .where(Outfit.board_id == board_id, Outfit.duplicate_of_id.is_(None))
     )
 
     # ── Filtro combinado: colores actúan como atributo de prendas ──
@@ -338,6 +1250,17 @@ async def list_board_outfits(
             )
         )
         color_outfit_ids = {row[0] for row in color_result.all()}
+        if board.status == "analyzing":
+            # Pins que Gemini aún no analizó: se filtran por su paleta local
+            palette_result = await db.execute(
+                select(Outfit.id).where(
+                    Outfit.board_id == board_id,
+                    Outfit.duplicate_of_id.is_(None),
+                    Outfit.palette.overlap(garment_color),
+                    *_pending_outfit(),
+                )
+            )
+            color_outfit_ids.update(row[0] for row in palette_result.all())
         if color_outfit_ids:
             query = query.where(Outfit.id.in_(color_outfit_ids))
         else:
@@ -361,40 +1284,52 @@ async def list_board_outfits(
 
     query = query.order_by(Outfit.created_at)
     result = await db.execute(query)
-    return result.scalars().all()
+    return etag_response(etag, list[OutfitResponse], result.scalars().all())
 
 
 @router.get("/boards/{board_id}/outfit-facets", response_model=OutfitFacets)
 async def get_outfit_facets(
-    board_id: uuid.UUID, current_user: CurrentUser, db: DBSession
+    board_id: uuid.UUID, request: Request, current_user: CurrentUser, db: DBSession
 ):
     board_result = await db.execute(
-        select(Board.id).where(
+        select(Board).where(
             Board.id == board_id, Board.user_id == current_user.id
         )
     )
-    if board_result.scalar_one_or_none() is None:
+    board = board_result.scalar_one_or_none()
+    if board is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
         )
+    etag = board_etag(request, board)
+    if (cached := cached_response(request, etag)) is not None:
+        return cached
 
     season_result = await db.execute(
         select(Outfit.season, sa_func.count().label("count"))
-        .where(Outfit.board_id == board_id, Outfit.season.isnot(None))
+        .where(
+            Outfit.board_id == board_id,
+            Outfit.duplicate_of_id.is_(None),
+            Outfit.season.isnot(None),
+        )
         .group_by(Outfit.season)
         .order_by(sa_func.count().desc())
     )
     style_result = await db.execute(
         select(Outfit.style, sa_func.count().label("count"))
-        .where(Outfit.board_id == board_id, Outfit.style.isnot(None))
+        .where(
+            Outfit.board_id == board_id,
+            Outfit.duplicate_of_id.is_(None),
+            Outfit.style.isnot(None),
+        )
         .group_by(Outfit.style)
         .order_by(sa_func.count().desc())
     )
 
-    return OutfitFacets(
+    return etag_response(etag, OutfitFacets, OutfitFacets(
         seasons=[FacetItem(name=r.season, count=r.count) for r in season_result.all()],
         styles=[FacetItem(name=r.style, count=r.count) for r in style_result.all()],
-    )
+    ))
 
 
 @router.get("/outfits/{outfit_id}", response_model=OutfitDetail)
@@ -416,49 +1351,137 @@ async def get_outfit(
     return outfit
 
 
+@router.get("/outfits/{outfit_id}/similar", response_model=list[SimilarOutfit])
+async def get_similar_outfits(
+    outfit_id: uuid.UUID,
+    current_user: CurrentUser,
+    db: DBSession,
+    k: int = Query(10, ge=1, le=50),
+):
+    """Outfits más parecidos (similitud coseno de atributos) en todos los tableros del usuario."""
+    result = await db.execute(
+        select(Outfit.id, exists().where(Garment.outfit_id == Outfit.id))
+        .join(Board)
+        .where(Outfit.id == outfit_id, Board.user_id == current_user.id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Outfit no encontrado"
+        )
+    # Sin prendas el vector solo tendría estilo/temporada: no hay nada que comparar
+    # y no vale la pena construir la matriz del usuario
+    if not row[1]:
+        return []
+
+    matrix = outfit_vectors.get_matrix(current_user.id)
+    if matrix is None or outfit_id not in matrix.rows:
+        outfit_rows = await db.execute(
+            select(Outfit.id, Outfit.board_id, Outfit.style, Outfit.season)
+            .join(Board)
+            .where(Board.user_id == current_user.id, Outfit.duplicate_of_id.is_(None))
+        )
+        garment_rows = await db.execute(
+            select(
+                Garment.outfit_id, Garment.type, Garment.canonical_id,
+                Garment.color, Garment.material,
+            )
+            .join(Outfit)
+            .join(Board)
+            .where(Board.user_id == current_user.id, Outfit.duplicate_of_id.is_(None))
+        )
+        matrix = await asyncio.to_thread(
+            outfit_vectors.build_matrix,
+            [tuple(row) for row in outfit_rows.all()],
+            [tuple(row) for row in garment_rows.all()],
+        )
+        outfit_vectors.set_matrix(current_user.id, matrix)
+
+    similar = matrix.top_k(outfit_id, k)
+    outfits_result = await db.execute(
+        select(Outfit)
+        .options(selectinload(Outfit.garments))
+        .where(Outfit.id.in_([similar_id for similar_id, _ in similar]))
+    )
+    outfits = {outfit.id: outfit for outfit in outfits_result.scalars().all()}
+    return [
+        SimilarOutfit(
+            **OutfitResponse.model_validate(outfits[similar_id]).model_dump(),
+            board_id=outfits[similar_id].board_id,
+            score=round(score, 4),
+        )
+        for similar_id, score in similar
+        if similar_id in outfits
+    ]
+
+
 @router.get(
     "/boards/{board_id}/trends", response_model=list[GarmentTypeRank]
 )
 async def get_board_trends(
-    board_id: uuid.UUID, current_user: CurrentUser, db: DBSession
+    board_id: uuid.UUID, request: Request, current_user: CurrentUser, db: DBSession
 ):
     board_result = await db.execute(
-        select(Board.id).where(
+        select(Board).where(
             Board.id == board_id, Board.user_id == current_user.id
         )
     )
-    if board_result.scalar_one_or_none() is None:
+    board = board_result.scalar_one_or_none()
+    if board is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
         )
+    etag = board_etag(request, board)
+    if (cached := cached_response(request, etag)) is not None:
+        return cached
 
     result = await db.execute(
         select(
             Garment.type,
-            Garment.name,
+            CanonicalGarment.name,
             sa_func.count().label("count"),
+            sa_func.count(sa_func.distinct(Garment.outfit_id)).label("outfits"),
         )
         .join(Outfit)
+        .join(CanonicalGarment, Garment.canonical_id == CanonicalGarment.id)
         .where(Outfit.board_id == board_id)
-        .group_by(Garment.type, Garment.name)
+        # Se agrupa por id canónico: las variantes de nombre suman juntas
+        .group_by(Garment.type, Garment.canonical_id, CanonicalGarment.name)
         .order_by(Garment.type, sa_func.count().desc())
     )
     rows = result.all()
 
+    # En modo muestreo los conteos se acompañan de la proporción estimada
+    # de outfits que contienen la prenda, con su IC 95%.
+    sampled = await _sample_size(db, board) if board.analysis_mode == "sample" else 0
+    type_presence: dict[str, int] = {}
+    if board.analysis_mode == "sample":
+        presence_result = await db.execute(
+            select(Garment.type, sa_func.count(sa_func.distinct(Garment.outfit_id)))
+            .join(Outfit)
+            .where(Outfit.board_id == board_id)
+            .group_by(Garment.type)
+        )
+        type_presence = {row[0]: row[1] for row in presence_result.all()}
+
     type_groups: dict[str, list[GarmentRank]] = defaultdict(list)
     for row in rows:
-        type_groups[row.type].append(GarmentRank(name=row.name, count=row.count))
+        estimates = estimate_fields(row.outfits, sampled) if sampled else {}
+        type_groups[row.type].append(
+            GarmentRank(name=row.name, count=row.count, **estimates)
+        )
 
     type_ranks = [
         GarmentTypeRank(
             type=t,
             count=sum(g.count for g in gs),
             garments=gs,
+            **(estimate_fields(type_presence.get(t, 0), sampled) if sampled else {}),
         )
         for t, gs in type_groups.items()
     ]
     type_ranks.sort(key=lambda x: x.count, reverse=True)
-    return type_ranks
+    return etag_response(etag, list[GarmentTypeRank], type_ranks)
 
 
 @router.get(
@@ -466,33 +1489,184 @@ async def get_board_trends(
 )
 async def get_board_color_trends(
     board_id: uuid.UUID,
+    request: Request,
     current_user: CurrentUser,
     db: DBSession,
     garment_name: list[str] | None = Query(None),
     connectors: str | None = None,
 ):
     board_result = await db.execute(
-        select(Board.id).where(
+        select(Board).where(
             Board.id == board_id, Board.user_id == current_user.id
         )
     )
-    if board_result.scalar_one_or_none() is None:
+    board = board_result.scalar_one_or_none()
+    if board is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
         )
+    etag = board_etag(request, board)
+    if (cached := cached_response(request, etag)) is not None:
+        return cached
 
     color_query = (
-        select(Garment.color, sa_func.count().label("count"))
+        select(
+            Garment.color,
+            sa_func.count().label("count"),
+            sa_func.count(sa_func.distinct(Garment.outfit_id)).label("outfits"),
+        )
         .join(Outfit)
         .where(Outfit.board_id == board_id, Garment.color.isnot(None))
     )
 
     if garment_name and len(garment_name) > 0:
-        color_query = color_query.where(Garment.name.in_(garment_name))
+        color_query = color_query.join(
+            CanonicalGarment, Garment.canonical_id == CanonicalGarment.id
+        ).where(CanonicalGarment.name.in_(garment_name))
 
-    color_query = color_query.group_by(Garment.color).order_by(
-        sa_func.count().desc()
-    )
+    color_query = color_query.group_by(Garment.color)
     result = await db.execute(color_query)
-    rows = result.all()
-    return [ColorRank(color=row.color, count=row.count) for row in rows]
+    counts = {row.color: [row.count, row.outfits] for row in result.all()}
+
+    if (
+        board.status == "analyzing"
+        and board.analysis_mode != "sample"
+        and not garment_name
+    ):
+        # Mientras Gemini avanza, los pins pendientes aportan su paleta local
+        palette_colors = (
+            select(sa_func.unnest(Outfit.palette).label("color"))
+            .where(
+                Outfit.board_id == board_id,
+                Outfit.duplicate_of_id.is_(None),
+                Outfit.palette.isnot(None),
+                *_pending_outfit(),
+            )
+            .subquery()
+        )
+        palette_result = await db.execute(
+            select(palette_colors.c.color, sa_func.count().label("outfits"))
+            .group_by(palette_colors.c.color)
+        )
+        for row in palette_result.all():
+            entry = counts.setdefault(row.color, [0, 0])
+            entry[0] += row.outfits
+            entry[1] += row.outfits
+
+    sampled = await _sample_size(db, board) if board.analysis_mode == "sample" else 0
+    return etag_response(etag, list[ColorRank], [
+        ColorRank(
+            color=color,
+            count=count,
+            **(estimate_fields(outfits, sampled) if sampled else {}),
+        )
+        for color, (count, outfits) in sorted(
+            counts.items(), key=lambda item: item[1][0], reverse=True
+        )
+    ])
+
+
+@router.get(
+    "/boards/{board_id}/co-occurrence", response_model=GarmentCoOccurrence
+)
+async def get_board_cooccurrence(
+    board_id: uuid.UUID,
+    current_user: CurrentUser,
+    db: DBSession,
+    k: int = Query(20, ge=1, le=200),
+    min_count: int = Query(2, ge=1),
+):
+    """Pares y tríos de prendas que aparecen juntas, con soporte y lift."""
+    board_result = await db.execute(
+        select(Board).where(
+            Board.id == board_id, Board.user_id == current_user.id
+        )
+    )
+    board = board_result.scalar_one_or_none()
+    if board is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
+        )
+
+    # La versión cambia con cada pin analizado y con cada re-análisis
+    version = f"{board.analyzed_at}:{_pins_analyzed(board)}"
+    cached = cooccurrence.get_cached(board_id, k, min_count, version)
+    if cached is not None:
+        return cached
+
+    rows = await db.execute(
+        select(Garment.outfit_id, CanonicalGarment.name)
+        .join(Outfit)
+        .join(CanonicalGarment, Garment.canonical_id == CanonicalGarment.id)
+        .where(Outfit.board_id == board_id)
+    )
+    pairs = [(row.outfit_id, row.name) for row in rows.all()]
+    result = await asyncio.to_thread(
+        cooccurrence.compute_cooccurrence, pairs, k, min_count
+    )
+    cooccurrence.set_cached(board_id, k, min_count, version, result)
+    return result
+
+
+@router.get("/boards/{board_id}/search", response_model=OutfitSearchResults)
+async def search_board(
+    board_id: uuid.UUID,
+    current_user: CurrentUser,
+    db: DBSession,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """Búsqueda de texto libre en prendas (nombre, material, estilo, color) y outfits."""
+    board_result = await db.execute(
+        select(Board).where(
+            Board.id == board_id, Board.user_id == current_user.id
+        )
+    )
+    board = board_result.scalar_one_or_none()
+    if board is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tablero no encontrado"
+        )
+
+    version = f"{board.analyzed_at}:{_pins_analyzed(board)}"
+    index = search_index.get_cached(board_id, version)
+    if index is None:
+        outfit_rows = await db.execute(
+            select(Outfit.id, Outfit.style).where(
+                Outfit.board_id == board_id, Outfit.duplicate_of_id.is_(None)
+            )
+        )
+        garment_rows = await db.execute(
+            select(
+                Garment.id, Garment.outfit_id, Garment.name,
+                Garment.material, Garment.style, Garment.color,
+            )
+            .join(Outfit)
+            .where(Outfit.board_id == board_id, Outfit.duplicate_of_id.is_(None))
+        )
+        index = await asyncio.to_thread(
+            search_index.build_index,
+            [tuple(row) for row in outfit_rows.all()],
+            [tuple(row) for row in garment_rows.all()],
+        )
+        search_index.set_cached(board_id, version, index)
+
+    total, page = index.search(q, offset=offset, limit=limit)
+    outfits_result = await db.execute(
+        select(Outfit)
+        .options(selectinload(Outfit.garments))
+        .where(Outfit.id.in_([outfit_id for outfit_id, _, _ in page]))
+    )
+    outfits = {outfit.id: outfit for outfit in outfits_result.scalars().all()}
+
+    items = [
+        OutfitSearchHit(
+            **OutfitResponse.model_validate(outfits[outfit_id]).model_dump(),
+            score=score,
+            matched_garment_ids=matched,
+        )
+        for outfit_id, score, matched in page
+        if outfit_id in outfits
+    ]
+    return OutfitSearchResults(total=total, items=items)
@@ -1,14 +1,32 @@
 import uuid
+from typing import Literal
 
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import CurrentUser, DBSession
+from app.api.responses import (
+    board_etag,
+    cached_response,
+    etag_response,
+    orm_json_response,
+)
+from app.core.config import settings
 from app.models.board import Board
 from app.models.outfit import Outfit
 from app.schemas.board import BoardCreate, BoardDetail, BoardResponse
-from app.services.pinterest import resolve_pinterest_url, validate_pinterest_url
+from app.services import outfit_vectors
+from app.services.board_export import MEDIA_TYPES, export_board
+from app.services.board_purge import soft_delete_board, start_purge
+from app.services.analysis_tasks import cancel_analysis_task
+from app.services.trend_rollups import remove_board_from_rollups
+from app.services.pinterest import (
+    canonical_board_url,
+    resolve_pinterest_url,
+    validate_pinterest_url,
+)
 
 router = APIRouter(prefix="/api/boards", tags=["boards"])
 
@@ -24,11 +42,15 @@ async def create_board(data: BoardCreate, current_user: CurrentUser, db: DBSessi
             detail="URL de Pinterest inválida. Formato esperado: https://pinterest.com/usuario/tablero o https://pin.it/...",
         )
 
-    # Si ya existe un tablero con esta URL, devolver el existente
+    # Si ya existe un tablero con esta URL (en cualquier variante: dominio,
+    # mayúsculas, barra final), devolver el existente
+    canonical_url = canonical_board_url(resolved_url)
     existing = await db.execute(
         select(Board)
         .options(selectinload(Board.outfits))
-        .where(Board.user_id == current_user.id, Board.pinterest_url == resolved_url)
+        .where(Board.user_id == current_user.id, Board.canonical_url == canonical_url)
+        .order_by(Board.created_at)
+        .limit(1)
     )
     existing_board = existing.scalar_one_or_none()
     if existing_board:
@@ -38,6 +60,7 @@ async def create_board(data: BoardCreate, current_user: CurrentUser, db: DBSessi
         user_id=current_user.id,
         name=data.name or resolved_url.rstrip("/").split("/")[-1].replace("-", " ").title(),
         pinterest_url=resolved_url,
+        canonical_url=canonical_url,
     )
     db.add(board)
     await db.commit()
@@ -53,15 +76,50 @@ async def list_boards(current_user: CurrentUser, db: DBSession):
         .where(Board.user_id == current_user.id)
         .order_by(Board.created_at.desc())
     )
-    return result.scalars().all()
+    boards = result.scalars().all()
+    if settings.FAST_JSON_RESPONSES:
+        return orm_json_response(BoardResponse, boards)
+    return boards
 
 
 @router.get("/{board_id}", response_model=BoardDetail)
-async def get_board(board_id: uuid.UUID, current_user: CurrentUser, db: DBSession):
+async def get_board(
+    board_id: uuid.UUID, request: Request, current_user: CurrentUser, db: DBSession
+):
+    # Primero solo la fila: si el cliente tiene la versión vigente no se
+    # cargan outfits ni prendas
+    result = await db.execute(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
+    )
+    board = result.scalar_one_or_none()
+
+    if board is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tablero no encontrado",
+        )
+    etag = board_etag(request, board)
+    if (cached := cached_response(request, etag)) is not None:
+        return cached
+
     result = await db.execute(
         select(Board)
         .options(selectinload(Board.outfits).selectinload(Outfit.garments))
-        .where(Board.id == board_id, Board.user_id == current_user.id)
+        .where(Board.id == board_id)
+    )
+    return etag_response(etag, BoardDetail, result.scalar_one())
+
+
+@router.get("/{board_id}/export")
+async def export_board_analysis(
+    board_id: uuid.UUID,
+    current_user: CurrentUser,
+    db: DBSession,
+    format: Literal["csv", "jsonl", "parquet"] = "csv",
+):
+    """Exporta el análisis aplanado (outfit → prenda → producto) en streaming."""
+    result = await db.execute(
+        select(Board).where(Board.id == board_id, Board.user_id == current_user.id)
     )
     board = result.scalar_one_or_none()
 
@@ -70,7 +128,14 @@ async def get_board(board_id: uuid.UUID, current_user: CurrentUser, db: DBSessio
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tablero no encontrado",
         )
-    return board
+
+    return StreamingResponse(
+        export_board(board, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="board-{board_id}.{format}"'
+        },
+    )
 
 
 @router.delete("/{board_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -86,5 +151,17 @@ async def delete_board(board_id: uuid.UUID, current_user: CurrentUser, db: DBSes
             detail="Tablero no encontrado",
         )
 
-    await db.delete(board)
-    await db.commit()
+    # Cancelar el análisis en curso antes de borrar sus filas
+    await cancel_analysis_task(board_id)
+
+    await remove_board_from_rollups(db, board)
+    if board.pins_count >= settings.BOARD_SOFT_DELETE_MIN_PINS:
+        # Tablero grande: se oculta ya y sus filas se purgan por lotes
+        await soft_delete_board(db, board_id)
+        await db.commit()
+        start_purge(board_id)
+    else:
+        # Outfits, prendas y productos caen por ON DELETE CASCADE sin cargarlos
+        await db.execute(delete(Board).where(Board.id == board_id))
+        await db.commit()
+    outfit_vectors.remove_board(current_user.id, board_id)
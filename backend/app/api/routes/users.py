@@ -0,0 +1,55 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Query
+
+from app.api.deps import CurrentUser, DBSession
+from app.models.trend_rollup import GLOBAL_SCOPE
+from app.schemas.user import PeriodCount, TrendRollupItem, UserTrends
+from app.services.trend_rollups import get_rollups
+
+router = APIRouter(prefix="/api/users", tags=["users"])
+
+
+def _months_ago(months: int) -> date:
+    today = datetime.now(timezone.utc).date()
+    total = today.year * 12 + (today.month - 1) - (months - 1)
+    return date(total // 12, total % 12 + 1, 1)
+
+
+@router.get("/me/trends", response_model=UserTrends)
+async def get_my_trends(
+    current_user: CurrentUser,
+    db: DBSession,
+    scope: Literal["user", "global"] = "user",
+    months: int = Query(12, ge=1, le=120),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Tendencias acumuladas de todos los tableros del usuario (o globales)."""
+    scope_id = current_user.id if scope == "user" else GLOBAL_SCOPE
+    rollups = await get_rollups(db, scope_id, _months_ago(months))
+
+    grouped: dict[str, dict[str, list[PeriodCount]]] = defaultdict(
+        lambda: defaultdict(list)
+    )
+    for r in rollups:
+        grouped[r.dimension][r.key].append(PeriodCount(period=r.period, count=r.count))
+
+    def _items(dimension: str) -> list[TrendRollupItem]:
+        items = [
+            TrendRollupItem(
+                key=key, count=sum(p.count for p in periods), by_period=periods
+            )
+            for key, periods in grouped[dimension].items()
+        ]
+        items.sort(key=lambda x: x.count, reverse=True)
+        return items[:limit]
+
+    return UserTrends(
+        scope=scope,
+        garment_types=_items("garment_type"),
+        garments=_items("garment"),
+        colors=_items("color"),
+        styles=_items("style"),
+    )
@@ -0,0 +1,67 @@
+import brotli
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """Parsea Accept-Encoding ignorando las codificaciones con q=0."""
+    accepted = set()
+    for token in accept_encoding.split(","):
+        coding, _, params = token.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor: brotli.Compressor | None = None
+
+    @property
+    def compressor(self) -> brotli.Compressor:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        return self._compressor
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        chunk = self.compressor.process(body)
+        if more_body:
+            return chunk + self.compressor.flush()
+        return chunk + self.compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Comprime respuestas grandes negociando Brotli o GZip según Accept-Encoding.
+
+    Brotli tiene prioridad cuando el cliente lo acepta; en otro caso se
+    delega al GZipMiddleware de Starlette.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        brotli_quality: int = 5,
+    ) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "br" in _accepted_encodings(headers.get("Accept-Encoding", "")):
+                responder = BrotliResponder(
+                    self.app, self.minimum_size, quality=self.brotli_quality
+                )
+                await responder(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
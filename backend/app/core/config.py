@@ -12,11 +12,79 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
 
     GEMINI_API_KEY: str = ""
+
+    # Salida estructurada: esquema con claves cortas y códigos expandidos en el servidor
+    GEMINI_STRUCTURED_OUTPUT: bool = True
+    # Prompt estático como contexto cacheado de Gemini; apagado por defecto porque
+    # el prompt actual queda bajo el mínimo de tokens que Gemini permite cachear
+    GEMINI_CONTEXT_CACHE: bool = False
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS: int = 3600
+    # Circuit breaker: fallos consecutivos antes de pausar y duración de la pausa
+    GEMINI_BREAKER_FAILURES: int = 5
+    GEMINI_BREAKER_OPEN_SECONDS: int = 60
+
     CLOUDINARY_CLOUD_NAME: str = ""
     CLOUDINARY_API_KEY: str = ""
     CLOUDINARY_API_SECRET: str = ""
     SERPAPI_KEY: str = ""
 
+    # Planificador global de análisis (slots de Gemini compartidos)
+    GEMINI_CONCURRENCY: int = 3
+    ANALYSIS_USER_CONCURRENCY: int = 3
+    SMALL_BOARD_PINS: int = 50
+    ANALYSIS_HEARTBEAT_SECONDS: int = 30
+    ANALYSIS_STALL_SECONDS: int = 300
+    # Progreso en memoria: se vuelca a boards cada N segundos o cada N pins
+    PROGRESS_FLUSH_SECONDS: float = 1.0
+    PROGRESS_FLUSH_PINS: int = 25
+
+    # Prefetch de imágenes, independiente de los slots de Gemini
+    IMAGE_PREFETCH_CONCURRENCY: int = 12
+    IMAGE_PREFETCH_AHEAD: int = 8
+    IMAGE_PREFETCH_BYTE_BUDGET: int = 64 * 1024 * 1024
+    IMAGE_MAX_BYTES: int = 10 * 1024 * 1024
+
+    # Respuestas: orjson sin re-validar payloads ORM y compresión br/gzip
+    FAST_JSON_RESPONSES: bool = False
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    # Cache en servidor de lecturas de tableros, indexado por ETag
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Análisis compartido entre usuarios para el mismo tablero de Pinterest
+    SHARED_ANALYSIS_MAX_AGE_HOURS: int = 168
+
+    # Peticiones a Pinterest y a i.pinimg.com
+    PINTEREST_USER_AGENT: str = (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    )
+    # Descargas simultáneas de miniaturas 236x por tablero (pHash, paleta)
+    THUMBNAIL_CONCURRENCY: int = 8
+
+    # Detección de pins casi duplicados (distancia de Hamming entre pHashes)
+    NEAR_DUPLICATE_DETECTION: bool = True
+    NEAR_DUPLICATE_MAX_DISTANCE: int = 6
+
+    # Paleta dominante local (k-means en un pool de procesos) tras el scraping
+    LOCAL_COLOR_EXTRACTION: bool = True
+    COLOR_EXTRACTION_WORKERS: int = 2
+
+    # Modo muestreo: lotes progresivos hasta que el IC 95% sea <= margen
+    SAMPLING_DEFAULT_BUDGET: int = 500
+    SAMPLING_BATCH_SIZE: int = 50
+    SAMPLING_TARGET_MARGIN: float = 0.05
+
+    # Borrado de tableros: desde N pins se borra lógicamente y se purga por lotes
+    BOARD_SOFT_DELETE_MIN_PINS: int = 500
+    BOARD_PURGE_BATCH_SIZE: int = 500
+    BOARD_PURGE_PAUSE_SECONDS: float = 0.1
+
+    # Importación masiva de tableros
+    BULK_IMPORT_MAX_URLS: int = 100
+    BULK_RESOLVE_CONCURRENCY: int = 10
+    BULK_ANALYSIS_CONCURRENCY: int = 3
+
     model_config = SettingsConfigDict(env_file=str(_env_path), extra="ignore")
 
 
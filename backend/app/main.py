@@ -1,18 +1,47 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from app.api.deps import CurrentUser
+from app.api.routes.analysis import resume_stalled_analyses
 from app.api.routes.analysis import router as analysis_router
 from app.api.routes.auth import router as auth_router
 from app.api.routes.boards import router as boards_router
 from app.api.routes.products import router as products_router
+from app.api.routes.users import router as users_router
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.services.ai_vision import get_usage_stats
+from app.services.analysis_scheduler import analysis_scheduler
+from app.services.board_purge import resume_pending_purges
+from app.services.color_palette import shutdown_executor
+from app.services.response_cache import response_cache
+from app.services.warmup import readiness, warm_up
 
 ALLOWED_ORIGINS = ["http://localhost:3000"]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pools y clientes se calientan en segundo plano; /ready informa el avance.
+    # Tras comprobar la base se retoman los análisis que quedaron a medias y
+    # las purgas de tableros borrados lógicamente, sin retrasar el arranque.
+    warmup_task = asyncio.create_task(
+        warm_up(recovery=[resume_stalled_analyses, resume_pending_purges])
+    )
+    yield
+    warmup_task.cancel()
+    shutdown_executor()
+
+
 app = FastAPI(
     title="OutfitBase API",
     description="Analiza tableros de Pinterest con IA para identificar prendas de vestir",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -22,6 +51,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE
+)
 
 
 @app.exception_handler(Exception)
@@ -42,8 +74,39 @@ app.include_router(auth_router)
 app.include_router(boards_router)
 app.include_router(analysis_router)
 app.include_router(products_router)
+app.include_router(users_router)
 
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """503 hasta que termine el warm-up (pools de base y procesos, cliente de Gemini)."""
+    return JSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content={
+            "status": readiness.status,
+            "checks": readiness.checks,
+            "warmup_seconds": readiness.warmup_seconds,
+        },
+    )
+
+
+@app.get("/stats")
+async def stats(current_user: CurrentUser):
+    """
+    Tasa de aciertos de las respuestas condicionales (304) y del cache de
+    lecturas, y uso de Gemini: llamadas, tokens (incluidos los de entrada
+    servidos desde el contexto cacheado) y aciertos del caché del prompt, y
+    estado del planificador de slots (ocupación, duración de una llamada y
+    pins en cola). Requiere sesión: los contadores revelan el tráfico del
+    proceso.
+    """
+    return {
+        "response_cache": response_cache.stats(),
+        "gemini": get_usage_stats(),
+        "analysis_scheduler": analysis_scheduler.stats(),
+    }
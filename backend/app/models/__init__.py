@@ -1,7 +1,13 @@
 from app.models.board import Board
+from app.models.canonical_garment import CanonicalGarment
+from app.models.failed_pin import FailedPin
 from app.models.garment import Garment
 from app.models.outfit import Outfit
 from app.models.product import Product
+from app.models.trend_rollup import TrendRollup
 from app.models.user import User
 
-__all__ = ["User", "Board", "Outfit", "Garment", "Product"]
+__all__ = [
+    "User", "Board", "Outfit", "Garment", "CanonicalGarment", "Product", "TrendRollup",
+    "FailedPin",
+]
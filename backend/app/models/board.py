@@ -1,8 +1,16 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, event, func
+from sqlalchemy.orm import (
+    Mapped,
+    ORMExecuteState,
+    Session,
+    mapped_column,
+    relationship,
+    with_loader_criteria,
+)
+from sqlalchemy.sql.util import find_tables
 
 from app.core.database import Base
 
@@ -14,13 +22,32 @@ class Board(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), index=True)
     name: Mapped[str] = mapped_column(String(255))
     pinterest_url: Mapped[str] = mapped_column(Text)
+    canonical_url: Mapped[str | None] = mapped_column(
+        Text, nullable=True, index=True
+    )
     image_url: Mapped[str | None] = mapped_column(Text, nullable=True)
     pins_count: Mapped[int] = mapped_column(Integer, default=0)
     pins_analyzed_count: Mapped[int] = mapped_column(Integer, default=0)
     status: Mapped[str] = mapped_column(String(20), default="pending")
+    # "full" analiza todos los pins; "sample" una muestra con tendencias estimadas
+    analysis_mode: Mapped[str] = mapped_column(String(20), default="full")
+    # Pins pedidos en modo muestreo (None = SAMPLING_DEFAULT_BUDGET)
+    sample_budget: Mapped[int | None] = mapped_column(Integer, nullable=True)
     analyzed_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Si sus conteos ya están sumados en trend_rollups
+    in_rollups: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Lote de importación masiva al que pertenece (progreso agregado)
+    import_batch_id: Mapped[uuid.UUID | None] = mapped_column(nullable=True, index=True)
+    # Última señal de vida del análisis en curso (para detectar procesos caídos)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    # Borrado lógico de tableros grandes: sus filas se purgan por lotes en segundo plano
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -34,10 +61,39 @@ class Board(Base):
     )
 
     user: Mapped["User"] = relationship(back_populates="boards")  # noqa: F821
+    # passive_deletes: el borrado de hijos lo hace ON DELETE CASCADE en la base
     outfits: Mapped[list["Outfit"]] = relationship(  # noqa: F821
-        back_populates="board", cascade="all, delete-orphan"
+        back_populates="board", cascade="all, delete-orphan", passive_deletes=True
     )
 
     @property
     def outfits_count(self) -> int:
         return len(self.outfits)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleted_boards(execute_state: ORMExecuteState) -> None:
+    """
+    Los tableros borrados lógicamente no aparecen en ninguna consulta ORM
+    que lea `boards` (directa, por join o en una subconsulta); las demás
+    consultas no se tocan.
+
+    Para leer también los borrados (p. ej. el purgado), la consulta debe
+    pedirlo con `.execution_options(include_deleted=True)`.
+    """
+    if not execute_state.is_select or execute_state.execution_options.get(
+        "include_deleted", False
+    ):
+        return
+    if Board.__table__ in find_tables(
+        execute_state.statement,
+        check_columns=True,
+        include_aliases=True,
+        include_joins=True,
+        include_selects=True,
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                Board, lambda cls: cls.deleted_at.is_(None), include_aliases=True
+            )
+        )
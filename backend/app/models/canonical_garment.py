@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Integer, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class CanonicalGarment(Base):
+    """Nombre canónico de prenda al que se asignan las variantes de nombre."""
+
+    __tablename__ = "canonical_garments"
+    __table_args__ = (UniqueConstraint("type", "normalized"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    type: Mapped[str] = mapped_column(String(50))
+    name: Mapped[str] = mapped_column(String(100))
+    normalized: Mapped[str] = mapped_column(String(100))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
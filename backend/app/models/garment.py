@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Float, ForeignKey, String, func
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -15,6 +15,10 @@ class Garment(Base):
         ForeignKey("outfits.id", ondelete="CASCADE"), index=True
     )
     name: Mapped[str] = mapped_column(String(100))
+    canonical_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("canonical_garments.id", ondelete="SET NULL"),
+        nullable=True, index=True,
+    )
     type: Mapped[str] = mapped_column(String(50), index=True)
     color: Mapped[str | None] = mapped_column(String(50), nullable=True)
     material: Mapped[str | None] = mapped_column(String(100), nullable=True)
@@ -27,7 +31,8 @@ class Garment(Base):
         server_default=func.now(),
     )
 
+    canonical: Mapped["CanonicalGarment | None"] = relationship()  # noqa: F821
     outfit: Mapped["Outfit"] = relationship(back_populates="garments")  # noqa: F821
     products: Mapped[list["Product"]] = relationship(  # noqa: F821
-        back_populates="garment", cascade="all, delete-orphan"
+        back_populates="garment", cascade="all, delete-orphan", passive_deletes=True
     )
@@ -2,6 +2,7 @@ import uuid
 from datetime import datetime, timezone
 
 from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -18,6 +19,14 @@ class Outfit(Base):
     style: Mapped[str | None] = mapped_column(String(50), nullable=True)
     season: Mapped[str | None] = mapped_column(String(50), nullable=True)
     source_pin_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Paleta dominante calculada localmente (colores del prompt, por proporción)
+    palette: Mapped[list[str] | None] = mapped_column(
+        ARRAY(String(20)), nullable=True
+    )
+    # Pin casi idéntico a otro del tablero: no se analiza, usa el del representante
+    duplicate_of_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("outfits.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -26,7 +35,7 @@ class Outfit(Base):
 
     board: Mapped["Board"] = relationship(back_populates="outfits")  # noqa: F821
     garments: Mapped[list["Garment"]] = relationship(  # noqa: F821
-        back_populates="outfit", cascade="all, delete-orphan"
+        back_populates="outfit", cascade="all, delete-orphan", passive_deletes=True
     )
 
     @property
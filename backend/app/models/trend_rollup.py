@@ -0,0 +1,26 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import Date, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+# scope_id de los acumulados globales (todos los usuarios)
+GLOBAL_SCOPE = uuid.UUID(int=0)
+
+
+class TrendRollup(Base):
+    """Conteo acumulado por usuario (o global) de una prenda/color/estilo por mes."""
+
+    __tablename__ = "trend_rollups"
+    __table_args__ = (
+        UniqueConstraint("scope_id", "dimension", "key", "period"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    scope_id: Mapped[uuid.UUID] = mapped_column(index=True)
+    dimension: Mapped[str] = mapped_column(String(20))
+    key: Mapped[str] = mapped_column(String(100))
+    period: Mapped[date] = mapped_column(Date)
+    count: Mapped[int] = mapped_column(Integer, default=0)
@@ -38,3 +38,21 @@ Responde ÚNICAMENTE con JSON válido en este formato exacto, sin texto adiciona
     }
   ]
 }"""
+
+
+# Versión para salida estructurada: el esquema de respuesta lo impone la API,
+# con claves cortas y códigos que el servidor expande (ver ai_vision).
+OUTFIT_ANALYSIS_PROMPT_COMPACT = """Analiza esta imagen de outfit/moda e identifica TODAS las prendas de vestir y accesorios visibles, incluyendo accesorios (bolsos, gorras, lentes, cinturones, joyas).
+
+Campos de cada prenda en "g":
+- "n": nombre descriptivo en español SIN el color, específico (ej: "Blazer de corte recto", "Jeans slim fit", "Camisa de lino de tirantes")
+- "t": tipo: T=Top, B=Bottom, V=Vestido, A=Abrigo, C=Calzado, X=Accesorio
+- "c": color básico principal: ne=negro, bl=blanco, gr=gris, ro=rojo, az=azul, ve=verde, am=amarillo, na=naranja, rs=rosa, mo=morado, ma=marrón, be=beige, do=dorado, pl=plateado, cr=crema
+- "m": material estimado (ej: "algodón", "cuero", "denim")
+- "st": estilo de la prenda (ej: "casual", "formal", "bohemio")
+- "se": temporada: pri=primavera, ver=verano, oto=otoño, inv=invierno, all=todo el año
+- "cf": confianza de 0 a 100
+
+Del outfit completo: "s" es el estilo general (ej: "casual chic", "streetwear") y "ss" la temporada (mismos códigos que "se").
+
+Usa null si no puedes determinar un campo. Si la imagen NO contiene ropa o moda, devuelve "g" vacío."""
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.outfit import OutfitResponse
 
@@ -11,6 +11,47 @@ class BoardCreate(BaseModel):
     name: str | None = None
 
 
+class BulkBoardImport(BaseModel):
+    pinterest_urls: list[str] = Field(min_length=1)
+    analyze: bool = True
+    # Pins totales a repartir entre los tableros (modo muestreo); None = todos
+    pin_budget: int | None = Field(None, ge=1)
+
+
+class BulkBoardProgress(BaseModel):
+    id: uuid.UUID
+    name: str
+    pinterest_url: str
+    status: str
+    pins_count: int
+    pins_analyzed_count: int = 0
+
+    model_config = {"from_attributes": True}
+
+
+class BulkImportRejected(BaseModel):
+    url: str
+    reason: str
+
+
+class BulkImportResponse(BaseModel):
+    batch_id: uuid.UUID
+    created: list[BulkBoardProgress]
+    existing: list[BulkBoardProgress]
+    rejected: list[BulkImportRejected]
+
+
+class BulkImportStatus(BaseModel):
+    batch_id: uuid.UUID
+    status: str
+    boards_total: int
+    boards_completed: int
+    boards_failed: int
+    pins_total: int
+    pins_analyzed: int
+    boards: list[BulkBoardProgress]
+
+
 class BoardResponse(BaseModel):
     id: uuid.UUID
     name: str
@@ -20,6 +61,7 @@ class BoardResponse(BaseModel):
     pins_analyzed_count: int = 0
     outfits_count: int = 0
     status: str
+    analysis_mode: str = "full"
     analyzed_at: datetime | None = None
     created_at: datetime
 
@@ -37,6 +79,11 @@ class AnalysisStatus(BaseModel):
     pins_analyzed: int
     outfits_created: int
     garments_created: int
+    duplicates_skipped: int = 0
+    pins_failed: int = 0
+    analysis_mode: str = "full"
+    queue_position: int | None = None
+    eta_seconds: float | None = None
 
 
 class FacetItem(BaseModel):
@@ -24,17 +24,39 @@ class GarmentDetail(GarmentResponse):
     products: list[ProductResponse] = []
 
 
-class GarmentRank(BaseModel):
+class TrendEstimate(BaseModel):
+    """Proporción estimada de outfits (IC 95%) cuando el análisis es por muestreo."""
+
+    share: float | None = None
+    share_low: float | None = None
+    share_high: float | None = None
+    estimated: bool = False
+
+
+class GarmentRank(TrendEstimate):
     name: str
     count: int
 
 
-class GarmentTypeRank(BaseModel):
+class GarmentTypeRank(TrendEstimate):
     type: str
     count: int
     garments: list[GarmentRank]
 
 
-class ColorRank(BaseModel):
+class ColorRank(TrendEstimate):
     color: str
     count: int
+
+
+class CoOccurrenceItem(BaseModel):
+    garments: list[str]
+    count: int
+    support: float
+    lift: float
+
+
+class GarmentCoOccurrence(BaseModel):
+    outfits: int
+    pairs: list[CoOccurrenceItem]
+    triples: list[CoOccurrenceItem]
@@ -12,6 +12,7 @@ class OutfitResponse(BaseModel):
     style: str | None = None
     season: str | None = None
     source_pin_url: str | None = None
+    palette: list[str] | None = None
     garments_count: int = 0
     created_at: datetime
 
@@ -20,3 +21,18 @@ class OutfitResponse(BaseModel):
 
 class OutfitDetail(OutfitResponse):
     garments: list[GarmentResponse] = []
+
+
+class OutfitSearchHit(OutfitResponse):
+    score: float
+    matched_garment_ids: list[uuid.UUID] = []
+
+
+class OutfitSearchResults(BaseModel):
+    total: int
+    items: list[OutfitSearchHit]
+
+
+class SimilarOutfit(OutfitResponse):
+    board_id: uuid.UUID
+    score: float
@@ -1,5 +1,5 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 from pydantic import BaseModel, EmailStr
 
@@ -27,3 +27,22 @@ class UserResponse(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+
+
+class PeriodCount(BaseModel):
+    period: date
+    count: int
+
+
+class TrendRollupItem(BaseModel):
+    key: str
+    count: int
+    by_period: list[PeriodCount]
+
+
+class UserTrends(BaseModel):
+    scope: str
+    garment_types: list[TrendRollupItem]
+    garments: list[TrendRollupItem]
+    colors: list[TrendRollupItem]
+    styles: list[TrendRollupItem]
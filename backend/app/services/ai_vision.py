@@ -2,94 +2,233 @@ import asyncio
 import contextlib
 import json
 import logging
-import re
-
-import httpx
-from google import genai
+from typing import Callable
 
 from app.core.config import settings
-from app.prompts.outfit_analysis import OUTFIT_ANALYSIS_PROMPT
+from app.prompts.outfit_analysis import (
+    OUTFIT_ANALYSIS_PROMPT,
+    OUTFIT_ANALYSIS_PROMPT_COMPACT,
+)
+from app.services.circuit_breaker import gemini_breaker
+from app.services.image_prefetch import PrefetchedImage
+from app.services.prompt_cache import prompt_cache
+from app.services.vision_errors import (
+    BREAKER_KINDS,
+    backoff_delay,
+    classify_error,
+    is_cache_error,
+)
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
+MODEL = "gemini-2.5-flash-lite"
 
 VALID_TYPES = {"Top", "Bottom", "Vestido", "Abrigo", "Calzado", "Accesorio"}
 
+# Códigos de la salida estructurada → valores que guarda la base
+TYPE_CODES = {
+    "T": "Top", "B": "Bottom", "V": "Vestido",
+    "A": "Abrigo", "C": "Calzado", "X": "Accesorio",
+}
+COLOR_CODES = {
+    "ne": "negro", "bl": "blanco", "gr": "gris", "ro": "rojo", "az": "azul",
+    "ve": "verde", "am": "amarillo", "na": "naranja", "rs": "rosa",
+    "mo": "morado", "ma": "marrón", "be": "beige", "do": "dorado",
+    "pl": "plateado", "cr": "crema",
+}
+SEASON_CODES = {
+    "pri": "primavera", "ver": "verano", "oto": "otoño",
+    "inv": "invierno", "all": "todo el año",
+}
+
+
+def _nullable(schema: dict) -> dict:
+    return {**schema, "nullable": True}
+
+
+# Esquema de respuesta (subconjunto OpenAPI que acepta Gemini)
+COMPACT_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "s": _nullable({"type": "STRING"}),
+        "ss": _nullable({"type": "STRING", "enum": list(SEASON_CODES)}),
+        "g": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "n": {"type": "STRING"},
+                    "t": {"type": "STRING", "enum": list(TYPE_CODES)},
+                    "c": _nullable({"type": "STRING", "enum": list(COLOR_CODES)}),
+                    "m": _nullable({"type": "STRING"}),
+                    "st": _nullable({"type": "STRING"}),
+                    "se": _nullable({"type": "STRING", "enum": list(SEASON_CODES)}),
+                    "cf": _nullable({"type": "INTEGER"}),
+                },
+                "required": ["n", "t"],
+                "property_ordering": ["n", "t", "c", "m", "st", "se", "cf"],
+            },
+        },
+    },
+    "required": ["g"],
+    "property_ordering": ["s", "ss", "g"],
+}
+
+_client = None
+
+
+def get_client():
+    """
+    Cliente de Gemini compartido. google.genai se importa en el primer uso
+    (o en el warm-up) para no cargarlo al arrancar la API.
+    """
+    global _client
+    if _client is None:
+        from google import genai
+
+        _client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    return _client
+
+
+# Contadores de uso de Gemini en este proceso
+_usage = {
+    "calls": 0,
+    "prompt_tokens": 0,
+    "output_tokens": 0,
+    # Tokens de entrada servidos desde el contexto cacheado (ahorrados)
+    "cached_input_tokens": 0,
+    "parse_failures": 0,
+}
+
+
+def get_usage_stats() -> dict:
+    """Llamadas, tokens de entrada/salida/cacheados y respuestas no parseables."""
+    return {**_usage, "prompt_cache": dict(prompt_cache.stats)}
+
+
+def _record_usage(response) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    _usage["calls"] += 1
+    if usage is not None:
+        _usage["prompt_tokens"] += usage.prompt_token_count or 0
+        _usage["output_tokens"] += usage.candidates_token_count or 0
+        _usage["cached_input_tokens"] += usage.cached_content_token_count or 0
+
 
 async def analyze_outfit_image(
-    image_url: str,
-    semaphore: asyncio.Semaphore | None = None,
+    image: PrefetchedImage,
+    slot: Callable[[], contextlib.AbstractAsyncContextManager] | None = None,
 ) -> dict:
     """
-    Envía una imagen a Gemini Vision y retorna el análisis de prendas.
-    Si se proporciona un semaphore, limita la concurrencia.
+    Envía una imagen ya descargada a Gemini Vision y retorna el análisis de
+    prendas. `slot` crea el context manager que limita la concurrencia (un
+    slot del planificador); se toma solo mientras la llamada al modelo está
+    en curso, no durante descargas ni esperas de backoff.
+
+    Los errores se clasifican (rate limit, transitorio, permanente, imagen
+    inválida) y se reintentan con backoff exponencial y jitter según su
+    clase; si se agotan los intentos se lanza el VisionError correspondiente.
     """
     if not settings.GEMINI_API_KEY:
         raise ValueError("GEMINI_API_KEY no está configurada")
 
-    async with semaphore if semaphore else contextlib.nullcontext():
-        # Descargar la imagen (Pinterest requiere User-Agent válido)
-        async with httpx.AsyncClient(timeout=30.0) as http_client:
-            resp = await http_client.get(image_url, headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            })
-            resp.raise_for_status()
-            image_bytes = resp.content
-            content_type = resp.headers.get("content-type", "image/jpeg")
-
-        # Crear cliente Gemini
-        client = genai.Client(api_key=settings.GEMINI_API_KEY)
-
-        image_part = genai.types.Part.from_bytes(
-            data=image_bytes,
-            mime_type=content_type.split(";")[0],
-        )
+    if settings.GEMINI_STRUCTURED_OUTPUT:
+        prompt, response_schema = OUTFIT_ANALYSIS_PROMPT_COMPACT, COMPACT_RESPONSE_SCHEMA
+    else:
+        prompt, response_schema = OUTFIT_ANALYSIS_PROMPT, None
 
-        # Retry loop para Gemini con backoff en 429
-        response = None
-        for attempt in range(MAX_RETRIES):
-            try:
+    from google.genai import types
+
+    client = get_client()
+    image_part = types.Part.from_bytes(data=image.data, mime_type=image.mime_type)
+    response = None
+    cache_retries = 0
+    attempt = 0
+    while response is None:
+        # Si Gemini está caído, esperar sin ocupar un slot
+        await gemini_breaker.wait_until_closed()
+        # El prompt estático va como contexto cacheado si está disponible
+        cached_name = (
+            await prompt_cache.get(MODEL, prompt)
+            if settings.GEMINI_CONTEXT_CACHE else None
+        )
+        try:
+            async with slot() if slot else contextlib.nullcontext():
                 response = await client.aio.models.generate_content(
-                    model="gemini-2.5-flash-lite",
-                    contents=[OUTFIT_ANALYSIS_PROMPT, image_part],
-                    config=genai.types.GenerateContentConfig(
+                    model=MODEL,
+                    contents=[image_part] if cached_name else [prompt, image_part],
+                    config=types.GenerateContentConfig(
                         response_mime_type="application/json",
+                        response_schema=response_schema,
+                        cached_content=cached_name,
                         temperature=0.2,
                     ),
                 )
-                break
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str and attempt < MAX_RETRIES - 1:
-                    match = re.search(r"retryDelay.*?(\d+)", error_str)
-                    wait = int(match.group(1)) + 2 if match else 60
-                    logger.warning(
-                        "Gemini 429, esperando %ds (intento %d/%d)",
-                        wait, attempt + 1, MAX_RETRIES,
-                    )
-                    await asyncio.sleep(wait)
-                else:
-                    raise
-
-        if response is None:
-            return {"outfit_style": None, "outfit_season": None, "garments": []}
-
-        # Parsear respuesta JSON
-        raw_text = response.text.strip()
-        if raw_text.startswith("```"):
-            raw_text = raw_text.split("\n", 1)[1]
-            if raw_text.endswith("```"):
-                raw_text = raw_text[:-3]
-            raw_text = raw_text.strip()
+            gemini_breaker.record_success()
+        except Exception as e:
+            if cached_name and is_cache_error(e) and cache_retries < MAX_RETRIES:
+                # Expiró o fue borrado: se re-crea en el siguiente intento
+                logger.warning("Contexto cacheado %s inválido, re-creando", cached_name)
+                prompt_cache.invalidate(MODEL, prompt)
+                cache_retries += 1
+                continue
+            error = classify_error(e)
+            if error.kind in BREAKER_KINDS:
+                gemini_breaker.record_failure()
+            delay = backoff_delay(error, attempt)
+            if delay is None:
+                raise error from e
+            logger.warning(
+                "Error %s analizando %s, reintento %d en %.1fs: %s",
+                error.kind, image.url, attempt + 1, delay, error,
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
 
-        try:
-            data = json.loads(raw_text)
-        except json.JSONDecodeError:
-            return {"outfit_style": None, "outfit_season": None, "garments": []}
+    _record_usage(response)
+
+    # Parsear respuesta JSON
+    raw_text = response.text.strip()
+    if raw_text.startswith("```"):
+        raw_text = raw_text.split("\n", 1)[1]
+        if raw_text.endswith("```"):
+            raw_text = raw_text[:-3]
+        raw_text = raw_text.strip()
+
+    try:
+        data = json.loads(raw_text)
+    except json.JSONDecodeError:
+        _usage["parse_failures"] += 1
+        return {"outfit_style": None, "outfit_season": None, "garments": []}
+
+    if settings.GEMINI_STRUCTURED_OUTPUT:
+        data = _expand_compact(data)
+    return _validate_response(data)
 
-        return _validate_response(data)
+
+def _expand_compact(data: dict) -> dict:
+    """Convierte la respuesta con claves cortas y códigos al formato completo."""
+    if not isinstance(data, dict):
+        return {}
+    garments = data.get("g")
+    return {
+        "outfit_style": data.get("s"),
+        "outfit_season": SEASON_CODES.get(data.get("ss")),
+        "garments": [
+            {
+                "name": g.get("n"),
+                "type": TYPE_CODES.get(g.get("t"), g.get("t")),
+                "color": COLOR_CODES.get(g.get("c")),
+                "material": g.get("m"),
+                "style": g.get("st"),
+                "season": SEASON_CODES.get(g.get("se")),
+                "confidence": g.get("cf"),
+            }
+            for g in (garments if isinstance(garments, list) else [])
+            if isinstance(g, dict)
+        ],
+    }
 
 
 def _validate_response(data: dict) -> dict:
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+
+from sqlalchemy import bindparam, update
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.board import Board
+
+logger = logging.getLogger(__name__)
+
+_boards = Board.__table__
+# UPDATE por tablero con executemany (incremento relativo, nunca absoluto)
+_INCREMENT = (
+    update(_boards)
+    .where(_boards.c.id == bindparam("b_id"))
+    .values(pins_analyzed_count=_boards.c.pins_analyzed_count + bindparam("delta"))
+)
+
+
+class ProgressAggregator:
+    """
+    Progreso de análisis en memoria: cada pin terminado suma a un contador
+    del tablero en vez de actualizar la fila `boards` en su propia
+    transacción.
+
+    Los incrementos se vuelcan a `pins_analyzed_count` cada flush_seconds o
+    al acumular flush_pins en un tablero, en un solo UPDATE por lote. Los
+    lectores suman `pending()` al valor de la fila para ver el progreso
+    exacto. Si el proceso muere se pierden como mucho los incrementos sin
+    volcar; el resume recalcula el progreso a partir de los datos.
+    """
+
+    def __init__(self, flush_seconds: float, flush_pins: int) -> None:
+        self.flush_seconds = flush_seconds
+        self.flush_pins = flush_pins
+        self._pending: dict[uuid.UUID, int] = defaultdict(int)
+        # Incrementos que se están escribiendo (siguen visibles hasta el commit)
+        self._inflight: dict[uuid.UUID, int] = defaultdict(int)
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"pins": 0, "flushes": 0, "rows_updated": 0}
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _schedule_timer(self) -> None:
+        if self._timer is None or self._timer.done():
+            self._timer = self._spawn(self._flush_later())
+
+    def record(self, board_id: uuid.UUID, pins: int = 1) -> None:
+        before = self._pending[board_id]
+        self._pending[board_id] = before + pins
+        self.stats["pins"] += pins
+        # Un volcado inmediato por cada vez que el tablero cruza el umbral
+        if before < self.flush_pins <= before + pins:
+            self._spawn(self.flush(board_id))
+        else:
+            self._schedule_timer()
+
+    def pending(self, board_id: uuid.UUID) -> int:
+        return self._pending.get(board_id, 0) + self._inflight.get(board_id, 0)
+
+    async def discard(self, board_id: uuid.UUID) -> None:
+        """
+        Descarta incrementos sin volcar (el llamador fija el valor absoluto).
+        Espera al volcado en curso: su incremento se confirma antes de que el
+        llamador escriba el valor absoluto, no después.
+        """
+        async with self._lock:
+            self._pending.pop(board_id, None)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_seconds)
+        # Los pins que lleguen durante el volcado programan otro timer
+        self._timer = None
+        await self.flush()
+
+    def _settle(self, deltas: dict[uuid.UUID, int]) -> None:
+        for b_id, delta in deltas.items():
+            self._inflight[b_id] -= delta
+            if not self._inflight[b_id]:
+                del self._inflight[b_id]
+
+    async def flush(self, board_id: uuid.UUID | None = None) -> None:
+        """Vuelca los incrementos de un tablero (o de todos) a la base."""
+        async with self._lock:
+            if board_id is None:
+                deltas = dict(self._pending)
+                self._pending.clear()
+            else:
+                delta = self._pending.pop(board_id, 0)
+                deltas = {board_id: delta} if delta else {}
+            if not deltas:
+                return
+            for b_id, delta in deltas.items():
+                self._inflight[b_id] += delta
+            committed = False
+            try:
+                async with async_session() as db:
+                    # Orden fijo de filas para no interbloquearse con otro flush
+                    await db.execute(_INCREMENT, [
+                        {"b_id": b_id, "delta": deltas[b_id]} for b_id in sorted(deltas)
+                    ])
+                    await db.commit()
+                    committed = True
+                self.stats["flushes"] += 1
+                self.stats["rows_updated"] += len(deltas)
+            except Exception as e:
+                logger.warning("No se pudo volcar el progreso de análisis: %s", e)
+            finally:
+                # También ante CancelledError: los incrementos no pueden quedar
+                # en vuelo para siempre. Sin commit vuelven a pendientes y se
+                # reintentan en el siguiente volcado
+                self._settle(deltas)
+                if not committed:
+                    for b_id, delta in deltas.items():
+                        self._pending[b_id] += delta
+        if self._pending:
+            self._schedule_timer()
+
+
+analysis_progress = ProgressAggregator(
+    flush_seconds=settings.PROGRESS_FLUSH_SECONDS,
+    flush_pins=settings.PROGRESS_FLUSH_PINS,
+)
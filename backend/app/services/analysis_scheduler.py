@@ -0,0 +1,322 @@
+import asyncio
+import itertools
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+# Primeros pins del tablero (la "primera página" que ve el usuario)
+FIRST_PAGE_PINS = 25
+SMALL_BOARD_BOOST = 4.0
+FIRST_PAGE_BOOST = 2.0
+# Duración inicial estimada de una llamada a Gemini (segundos)
+_INITIAL_SERVICE_TIME = 6.0
+_SERVICE_TIME_ALPHA = 0.2
+
+
+@dataclass
+class _Ticket:
+    # Etiqueta de tiempo virtual dentro del usuario (orden entre sus tableros)
+    board_tag: float
+    seq: int
+    cost: float
+    user_id: uuid.UUID
+    board_id: uuid.UUID
+    granted: asyncio.Event = field(default_factory=asyncio.Event)
+    cancelled: bool = False
+
+
+class AnalysisScheduler:
+    """
+    Planificador global de slots de Gemini con weighted fair queuing en
+    dos niveles.
+
+    Cada tablero tiene su propia cola FIFO. Al encolar, cada pin recibe una
+    etiqueta de tiempo virtual del tablero dentro de su usuario, y el
+    siguiente pin de un usuario es el de menor etiqueta entre las cabezas
+    de sus tableros: sus tableros se reparten su parte de los slots. La
+    etiqueta a nivel de usuario se asigna al despachar, con el costo de ese
+    pin, y entre usuarios gana la menor: los usuarios se reparten los slots
+    por igual. Los tableros pequeños y los pins de la primera página tienen
+    más peso (menor costo). Además cada usuario tiene un máximo de slots
+    simultáneos.
+    """
+
+    def __init__(self, capacity: int, per_user_limit: int) -> None:
+        self.capacity = capacity
+        self.per_user_limit = per_user_limit
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        # Pins en espera por tablero y tableros con pins en espera por usuario
+        self._queues: dict[uuid.UUID, deque[_Ticket]] = {}
+        self._user_boards: dict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+        # Etiqueta de inicio del próximo pin de cada usuario con pins en espera
+        # (se fija al entrar en cola o al despachar, no se recalcula)
+        self._user_starts: dict[uuid.UUID, float] = {}
+        self._user_tags: dict[uuid.UUID, float] = defaultdict(float)
+        # Tiempo virtual de cada usuario entre sus tableros y última etiqueta por tablero
+        self._user_clocks: dict[uuid.UUID, float] = defaultdict(float)
+        self._board_tags: dict[uuid.UUID, float] = {}
+        self._running = 0
+        self._running_by_user: dict[uuid.UUID, int] = defaultdict(int)
+        # Pins que le faltan a cada tablero en análisis, su usuario y su peso
+        self._board_remaining: dict[uuid.UUID, int] = {}
+        self._board_owners: dict[uuid.UUID, uuid.UUID] = {}
+        self._board_weights: dict[uuid.UUID, float] = {}
+        self._service_time = _INITIAL_SERVICE_TIME
+        self._busy_seconds = 0.0
+        self._started_at = time.monotonic()
+
+    def _weight(self, board_pins: int, position: int) -> float:
+        weight = 1.0
+        if board_pins <= settings.SMALL_BOARD_PINS:
+            weight *= SMALL_BOARD_BOOST
+        if position < FIRST_PAGE_PINS:
+            weight *= FIRST_PAGE_BOOST
+        return weight
+
+    def _enqueue(
+        self, user_id: uuid.UUID, board_id: uuid.UUID, board_pins: int, position: int
+    ) -> _Ticket:
+        cost = 1.0 / self._weight(board_pins, position)
+        if not any(self._queues.get(b) for b in self._user_boards.get(user_id, ())):
+            self._user_starts[user_id] = max(self._virtual_time, self._user_tags[user_id])
+        board_tag = max(
+            self._user_clocks[user_id], self._board_tags.get(board_id, 0.0)
+        ) + cost
+        self._board_tags[board_id] = board_tag
+        ticket = _Ticket(board_tag, next(self._seq), cost, user_id, board_id)
+        self._queues.setdefault(board_id, deque()).append(ticket)
+        self._user_boards[user_id].add(board_id)
+        return ticket
+
+    def _head(self, user_id: uuid.UUID) -> _Ticket | None:
+        """Próximo pin del usuario: la menor etiqueta entre las cabezas de sus tableros."""
+        best: _Ticket | None = None
+        for board_id in list(self._user_boards[user_id]):
+            queue = self._queues[board_id]
+            while queue and queue[0].cancelled:
+                queue.popleft()
+            if not queue:
+                self._drop_board(user_id, board_id)
+                continue
+            if best is None or (queue[0].board_tag, queue[0].seq) < (best.board_tag, best.seq):
+                best = queue[0]
+        if not self._user_boards[user_id]:
+            del self._user_boards[user_id]
+            self._user_starts.pop(user_id, None)
+        return best
+
+    def _drop_board(self, user_id: uuid.UUID, board_id: uuid.UUID) -> None:
+        # Sin pins en espera: la siguiente llegada parte del reloj del usuario
+        del self._queues[board_id]
+        self._board_tags.pop(board_id, None)
+        self._user_boards[user_id].discard(board_id)
+
+    def _dispatch(self) -> None:
+        while self._running < self.capacity:
+            chosen: tuple[float, int, _Ticket] | None = None
+            for user_id in list(self._user_boards):
+                if self._running_by_user[user_id] >= self.per_user_limit:
+                    continue
+                head = self._head(user_id)
+                if head is None:
+                    continue
+                user_tag = self._user_starts[user_id] + head.cost
+                if chosen is None or (user_tag, head.seq) < chosen[:2]:
+                    chosen = (user_tag, head.seq, head)
+            if chosen is None:
+                return
+            user_tag, _seq, ticket = chosen
+            self._queues[ticket.board_id].popleft()
+            self._user_tags[ticket.user_id] = user_tag
+            self._user_starts[ticket.user_id] = user_tag
+            self._user_clocks[ticket.user_id] = max(
+                self._user_clocks[ticket.user_id], ticket.board_tag
+            )
+            self._virtual_time = max(self._virtual_time, user_tag)
+            self._running += 1
+            self._running_by_user[ticket.user_id] += 1
+            ticket.granted.set()
+
+    def track_board(
+        self, user_id: uuid.UUID, board_id: uuid.UUID, pins: int, board_pins: int
+    ) -> None:
+        """Registra los pins que el tablero va a analizar, para estimar ETAs."""
+        self._board_remaining[board_id] = pins
+        self._board_owners[board_id] = user_id
+        self._board_weights[board_id] = self._weight(board_pins, FIRST_PAGE_PINS)
+
+    def discount_board(self, board_id: uuid.UUID, pins: int) -> None:
+        """Descuenta pins que el tablero ya no va a analizar (casi duplicados)."""
+        if board_id in self._board_remaining:
+            self._board_remaining[board_id] = max(0, self._board_remaining[board_id] - pins)
+
+    def untrack_board(self, board_id: uuid.UUID) -> None:
+        self._board_remaining.pop(board_id, None)
+        self._board_owners.pop(board_id, None)
+        self._board_weights.pop(board_id, None)
+
+    def _release(self, ticket: _Ticket, elapsed: float) -> None:
+        if ticket.board_id in self._board_remaining:
+            self._board_remaining[ticket.board_id] = max(
+                0, self._board_remaining[ticket.board_id] - 1
+            )
+        self._running -= 1
+        self._running_by_user[ticket.user_id] -= 1
+        if not self._running_by_user[ticket.user_id]:
+            del self._running_by_user[ticket.user_id]
+        self._service_time += _SERVICE_TIME_ALPHA * (elapsed - self._service_time)
+        self._busy_seconds += elapsed
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self, user_id: uuid.UUID, board_id: uuid.UUID, board_pins: int, position: int
+    ):
+        """Espera turno en la cola global y retiene un slot durante el bloque."""
+        ticket = self._enqueue(user_id, board_id, board_pins, position)
+        self._dispatch()
+        try:
+            await ticket.granted.wait()
+        except BaseException:
+            ticket.cancelled = True
+            if ticket.granted.is_set():
+                self._release(ticket, self._service_time)
+            raise
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(ticket, time.monotonic() - started)
+
+    def stats(self) -> dict:
+        """
+        Slots en uso, pins en cola, duración estimada de una llamada y
+        fracción del tiempo de los slots ocupada por llamadas desde el arranque.
+        """
+        elapsed = time.monotonic() - self._started_at
+        utilization = (
+            min(1.0, self._busy_seconds / (self.capacity * elapsed)) if elapsed > 0 else 0.0
+        )
+        return {
+            "capacity": self.capacity,
+            "running": self._running,
+            "queued": sum(
+                1 for queue in self._queues.values() for t in queue if not t.cancelled
+            ),
+            "boards_analyzing": len(self._board_remaining),
+            "service_time_seconds": round(self._service_time, 2),
+            "utilization": round(utilization, 3),
+        }
+
+    def _projected_order(self) -> list[_Ticket]:
+        """
+        Pins en espera en el orden en que se despacharían si no llegara
+        ninguno nuevo (simula las etiquetas sin el límite por usuario).
+        """
+        queues = {
+            b_id: [t for t in q if not t.cancelled] for b_id, q in self._queues.items()
+        }
+        boards_by_user: dict[uuid.UUID, list[uuid.UUID]] = defaultdict(list)
+        for b_id, queue in queues.items():
+            if queue:
+                boards_by_user[queue[0].user_id].append(b_id)
+        heads = {b_id: 0 for b_id in queues}
+        starts = {
+            user_id: self._user_starts.get(
+                user_id, max(self._virtual_time, self._user_tags.get(user_id, 0.0))
+            )
+            for user_id in boards_by_user
+        }
+
+        order: list[_Ticket] = []
+        while True:
+            chosen: tuple[float, int, _Ticket] | None = None
+            for user_id, board_ids in boards_by_user.items():
+                pending = [
+                    queues[b][heads[b]] for b in board_ids if heads[b] < len(queues[b])
+                ]
+                if not pending:
+                    continue
+                head = min(pending, key=lambda t: (t.board_tag, t.seq))
+                user_tag = starts[user_id] + head.cost
+                if chosen is None or (user_tag, head.seq) < chosen[:2]:
+                    chosen = (user_tag, head.seq, head)
+            if chosen is None:
+                return order
+            user_tag, _seq, ticket = chosen
+            heads[ticket.board_id] += 1
+            starts[ticket.user_id] = user_tag
+            order.append(ticket)
+
+    def _fluid_finish(
+        self, board_id: uuid.UUID, user_id: uuid.UUID, remaining: int
+    ) -> float:
+        """
+        Llamadas-slot hasta que el tablero termine, simulando el reparto
+        fluido de los slots: entre usuarios por igual (hasta su límite) y
+        entre los tableros de un usuario según su peso. Cuando un tablero
+        termina, su parte pasa a los demás.
+        """
+        left = dict(self._board_remaining)
+        owners = dict(self._board_owners)
+        weights = dict(self._board_weights)
+        # Tableros sin registrar (p. ej. un reintento): se cuenta lo que tienen en cola
+        for b_id, queue in self._queues.items():
+            if b_id not in left and queue:
+                left[b_id] = len(queue)
+                owners[b_id] = queue[0].user_id
+                weights[b_id] = 1.0 / queue[0].cost
+        left[board_id] = remaining
+        owners[board_id] = user_id
+        weights.setdefault(board_id, 1.0)
+
+        elapsed = 0.0
+        while True:
+            active = [b_id for b_id, pins in left.items() if pins > 0]
+            users = {owners[b_id] for b_id in active}
+            user_share = min(self.per_user_limit, self.capacity / len(users))
+            user_weights: dict[uuid.UUID, float] = defaultdict(float)
+            for b_id in active:
+                user_weights[owners[b_id]] += weights[b_id]
+            rates = {
+                b_id: user_share * weights[b_id] / user_weights[owners[b_id]]
+                for b_id in active
+            }
+            first = min(active, key=lambda b_id: left[b_id] / rates[b_id])
+            step = left[first] / rates[first]
+            if left[board_id] / rates[board_id] <= step:
+                return elapsed + left[board_id] / rates[board_id]
+            elapsed += step
+            for b_id in active:
+                left[b_id] -= rates[b_id] * step
+            left[first] = 0
+
+    def board_queue(
+        self, board_id: uuid.UUID, user_id: uuid.UUID, remaining: int
+    ) -> tuple[int | None, float | None]:
+        """
+        Posición en cola del próximo pin del tablero y segundos estimados
+        hasta terminar sus `remaining` pins pendientes. En la cola solo hay
+        los pins ya descargados (IMAGE_PREFETCH_AHEAD por tablero), así que
+        el ETA sale de los pins que les faltan a los tableros en análisis,
+        no del largo de la cola. (None, None) si no le quedan pins.
+        """
+        if remaining <= 0:
+            return None, None
+        waiting = self._projected_order()
+        position = next(
+            (i for i, t in enumerate(waiting) if t.board_id == board_id), 0
+        )
+        calls = self._fluid_finish(board_id, user_id, remaining)
+        return position, round(calls * self._service_time, 1)
+
+
+analysis_scheduler = AnalysisScheduler(
+    capacity=settings.GEMINI_CONCURRENCY,
+    per_user_limit=settings.ANALYSIS_USER_CONCURRENCY,
+)
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import Coroutine
+
+logger = logging.getLogger(__name__)
+
+CANCEL_TIMEOUT_SECONDS = 10.0
+
+# Tareas de análisis en curso en este proceso, por tablero
+_tasks: dict[uuid.UUID, asyncio.Task] = {}
+
+
+def start_analysis_task(board_id: uuid.UUID, coro: Coroutine) -> asyncio.Task:
+    """
+    Lanza el análisis en background y lo registra para poder cancelarlo.
+    Falla si el tablero ya tiene uno vivo: reemplazarlo en el registro
+    dejaría la tarea anterior corriendo sin forma de cancelarla.
+    """
+    if is_analysis_running(board_id):
+        coro.close()
+        raise RuntimeError(f"El tablero {board_id} ya tiene un análisis en curso")
+    task = asyncio.create_task(coro)
+    _tasks[board_id] = task
+
+    def _unregister(done: asyncio.Task) -> None:
+        if _tasks.get(board_id) is done:
+            del _tasks[board_id]
+
+    task.add_done_callback(_unregister)
+    return task
+
+
+def is_analysis_running(board_id: uuid.UUID) -> bool:
+    task = _tasks.get(board_id)
+    return task is not None and not task.done()
+
+
+async def cancel_analysis_task(board_id: uuid.UUID) -> bool:
+    """
+    Cancela el análisis del tablero: las tareas por pin pendientes se
+    descartan y las llamadas HTTP en curso se abortan al propagarse
+    CancelledError. Espera a que la tarea termine de desenrollarse.
+    Retorna False si no había un análisis corriendo en este proceso.
+    """
+    task = _tasks.get(board_id)
+    if task is None or task.done():
+        return False
+    task.cancel()
+    done, _pending = await asyncio.wait({task}, timeout=CANCEL_TIMEOUT_SECONDS)
+    if not done:
+        logger.warning("El análisis del tablero %s no terminó tras cancelarlo", board_id)
+    return True
@@ -0,0 +1,171 @@
+import csv
+import io
+import uuid
+from collections.abc import AsyncIterator
+
+import orjson
+from sqlalchemy import select
+
+from app.core.database import async_session
+from app.models.board import Board
+from app.models.canonical_garment import CanonicalGarment
+from app.models.garment import Garment
+from app.models.outfit import Outfit
+from app.models.product import Product
+
+# Filas que se leen del cursor del servidor y se emiten por bloque
+EXPORT_CHUNK_ROWS = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_BOARD_COLUMNS = ("board_id", "board_name", "board_url")
+_QUERY_COLUMNS = (
+    ("outfit_id", Outfit.id),
+    ("outfit_image_url", Outfit.image_url),
+    ("outfit_style", Outfit.style),
+    ("outfit_season", Outfit.season),
+    ("source_pin_url", Outfit.source_pin_url),
+    ("garment_id", Garment.id),
+    ("garment_name", Garment.name),
+    ("garment_canonical_name", CanonicalGarment.name),
+    ("garment_type", Garment.type),
+    ("garment_color", Garment.color),
+    ("garment_material", Garment.material),
+    ("garment_style", Garment.style),
+    ("garment_season", Garment.season),
+    ("garment_confidence", Garment.confidence),
+    ("product_name", Product.name),
+    ("product_price", Product.price),
+    ("product_store", Product.store),
+    ("product_url", Product.product_url),
+    ("product_similarity", Product.similarity),
+)
+COLUMNS = _BOARD_COLUMNS + tuple(name for name, _ in _QUERY_COLUMNS)
+_FLOAT_COLUMNS = {"garment_confidence", "product_similarity"}
+
+
+async def _row_chunks(board: Board) -> AsyncIterator[list[tuple]]:
+    """
+    Filas aplanadas tablero → outfit → prenda → producto, leídas con un
+    cursor del servidor en bloques de EXPORT_CHUNK_ROWS (memoria constante).
+    """
+    query = (
+        select(*(column for _, column in _QUERY_COLUMNS))
+        .select_from(Outfit)
+        .outerjoin(Garment, Garment.outfit_id == Outfit.id)
+        .outerjoin(CanonicalGarment, Garment.canonical_id == CanonicalGarment.id)
+        .outerjoin(Product, Product.garment_id == Garment.id)
+        .where(Outfit.board_id == board.id, Outfit.duplicate_of_id.is_(None))
+        .order_by(Outfit.created_at, Outfit.id, Garment.id, Product.similarity.desc())
+        .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+    )
+    prefix = (str(board.id), board.name, board.pinterest_url)
+    # Sesión propia: la del request se cierra antes de terminar el streaming
+    async with async_session() as export_db:
+        result = await export_db.stream(query)
+        async for partition in result.partitions():
+            yield [
+                prefix + tuple(str(v) if isinstance(v, uuid.UUID) else v for v in row)
+                for row in partition
+            ]
+
+
+async def _export_csv(board: Board) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode()
+    async for chunk in _row_chunks(board):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+
+
+async def _export_jsonl(board: Board) -> AsyncIterator[bytes]:
+    async for chunk in _row_chunks(board):
+        yield b"".join(
+            orjson.dumps(dict(zip(COLUMNS, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in chunk
+        )
+
+
+class _ChunkSink:
+    """
+    Destino de escritura que acumula bytes hasta vaciarlo, pero conserva la
+    posición total para que los offsets del footer de Parquet sean válidos.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _export_parquet(board: Board) -> AsyncIterator[bytes]:
+    """Un row group por bloque; los bytes se emiten a medida que se escriben."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (name, pa.float64() if name in _FLOAT_COLUMNS else pa.string())
+        for name in COLUMNS
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        async for chunk in _row_chunks(board):
+            columns = list(zip(*chunk))
+            writer.write_table(pa.Table.from_arrays(
+                [
+                    pa.array(values, type=field.type)
+                    for field, values in zip(schema, columns)
+                ],
+                schema=schema,
+            ))
+            yield sink.drain()
+        # El pie del archivo se escribe al cerrar
+        writer.close()
+        yield sink.drain()
+    finally:
+        # Si el cliente se desconecta solo se cierra, sin volver a emitir
+        # (close es idempotente)
+        writer.close()
+
+
+_EXPORTERS = {
+    "csv": _export_csv,
+    "jsonl": _export_jsonl,
+    "parquet": _export_parquet,
+}
+
+
+def export_board(board: Board, fmt: str) -> AsyncIterator[bytes]:
+    return _EXPORTERS[fmt](board)
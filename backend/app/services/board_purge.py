@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select, update
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.board import Board
+from app.models.outfit import Outfit
+
+logger = logging.getLogger(__name__)
+
+# Purgas en curso en este proceso (referencia fuerte a las tareas)
+_purges: dict[uuid.UUID, asyncio.Task] = {}
+
+
+async def soft_delete_board(db, board_id: uuid.UUID) -> None:
+    """Oculta el tablero al instante; sus filas se purgan después."""
+    await db.execute(
+        update(Board).where(Board.id == board_id)
+        .values(deleted_at=datetime.now(timezone.utc))
+    )
+
+
+async def purge_board(board_id: uuid.UUID) -> None:
+    """
+    Borra un tablero eliminado lógicamente en lotes acotados de outfits,
+    cada uno en su propia transacción (prendas, productos y pins fallidos
+    caen por ON DELETE CASCADE), y al final la fila del tablero.
+    """
+    batch = (
+        delete(Outfit)
+        .where(Outfit.id.in_(
+            select(Outfit.id)
+            .where(Outfit.board_id == board_id)
+            .limit(settings.BOARD_PURGE_BATCH_SIZE)
+        ))
+        .execution_options(synchronize_session=False)
+    )
+    purged = 0
+    try:
+        while True:
+            async with async_session() as db:
+                result = await db.execute(batch)
+                await db.commit()
+            purged += result.rowcount
+            if result.rowcount < settings.BOARD_PURGE_BATCH_SIZE:
+                break
+            # Pausa entre lotes para no acaparar la base
+            await asyncio.sleep(settings.BOARD_PURGE_PAUSE_SECONDS)
+        async with async_session() as db:
+            await db.execute(
+                delete(Board)
+                .where(Board.id == board_id, Board.deleted_at.isnot(None))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        logger.info("Tablero %s purgado (%d outfits)", board_id, purged)
+    except Exception as e:
+        # deleted_at sigue puesto: se reintenta al reiniciar el proceso
+        logger.error("Error purgando el tablero %s: %s", board_id, e)
+
+
+def start_purge(board_id: uuid.UUID) -> None:
+    if board_id in _purges and not _purges[board_id].done():
+        return
+    task = asyncio.create_task(purge_board(board_id))
+    _purges[board_id] = task
+    task.add_done_callback(lambda done: _purges.pop(board_id, None))
+
+
+async def resume_pending_purges() -> int:
+    """Re-lanza las purgas que quedaron a medias (p. ej. al iniciar el proceso)."""
+    async with async_session() as db:
+        result = await db.execute(
+            select(Board.id)
+            .where(Board.deleted_at.isnot(None))
+            .execution_options(include_deleted=True)
+        )
+        board_ids = list(result.scalars().all())
+    for board_id in board_ids:
+        start_purge(board_id)
+    if board_ids:
+        logger.info("Reanudando la purga de %d tableros eliminados", len(board_ids))
+    return len(board_ids)
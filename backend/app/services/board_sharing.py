@@ -0,0 +1,96 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.models.board import Board
+from app.models.garment import Garment
+from app.models.outfit import Outfit
+
+
+async def find_shared_analysis(
+    db: AsyncSession, canonical_url: str, exclude_board_id: uuid.UUID
+) -> Board | None:
+    """
+    Busca el análisis completado más reciente del mismo tablero de Pinterest
+    (de cualquier usuario) que siga dentro de la ventana de frescura.
+    """
+    max_age = timedelta(hours=settings.SHARED_ANALYSIS_MAX_AGE_HOURS)
+    result = await db.execute(
+        select(Board)
+        .where(
+            Board.canonical_url == canonical_url,
+            Board.id != exclude_board_id,
+            Board.status == "completed",
+            Board.analysis_mode == "full",
+            Board.analyzed_at >= datetime.now(timezone.utc) - max_age,
+        )
+        .order_by(Board.analyzed_at.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def clone_board_analysis(
+    db: AsyncSession, source: Board, target: Board
+) -> int:
+    """
+    Copia outfits y prendas de `source` a `target` con inserts masivos.
+
+    Los productos no se copian: son datos propios de cada usuario y se
+    generan sobre sus prendas al buscarlos. Retorna la cantidad de outfits.
+    """
+    result = await db.execute(
+        select(Outfit)
+        .options(selectinload(Outfit.garments))
+        .where(Outfit.board_id == source.id)
+        .order_by(Outfit.created_at)
+    )
+    source_outfits = result.scalars().all()
+
+    new_ids = {outfit.id: uuid.uuid4() for outfit in source_outfits}
+    outfit_rows: list[dict] = []
+    garment_rows: list[dict] = []
+    for outfit in source_outfits:
+        outfit_id = new_ids[outfit.id]
+        outfit_rows.append({
+            "id": outfit_id,
+            "board_id": target.id,
+            "image_url": outfit.image_url,
+            "style": outfit.style,
+            "season": outfit.season,
+            "source_pin_url": outfit.source_pin_url,
+            "palette": outfit.palette,
+            "duplicate_of_id": new_ids.get(outfit.duplicate_of_id),
+            "created_at": outfit.created_at,
+        })
+        for g in outfit.garments:
+            garment_rows.append({
+                "id": uuid.uuid4(),
+                "outfit_id": outfit_id,
+                "name": g.name,
+                "canonical_id": g.canonical_id,
+                "type": g.type,
+                "color": g.color,
+                "material": g.material,
+                "style": g.style,
+                "season": g.season,
+                "confidence": g.confidence,
+            })
+
+    if outfit_rows:
+        await db.execute(insert(Outfit), outfit_rows)
+    if garment_rows:
+        await db.execute(insert(Garment), garment_rows)
+
+    target.pins_count = source.pins_count
+    target.pins_analyzed_count = source.pins_analyzed_count
+    target.image_url = target.image_url or source.image_url
+    # Se conserva la fecha del análisis original para la política de frescura
+    target.analyzed_at = source.analyzed_at
+    target.analysis_mode = source.analysis_mode
+    target.status = "completed"
+    return len(outfit_rows)
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Pausa todas las llamadas a un servicio tras N fallos consecutivos.
+
+    Abierto: wait_until_closed() bloquea hasta que pase open_seconds.
+    Semiabierto: se dejan pasar llamadas; el primer fallo lo vuelve a abrir
+    y el primer éxito lo cierra.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        open_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self._failures = 0
+        self._opened_until: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_until is None:
+            return "closed"
+        return "open" if self.clock() < self._opened_until else "half_open"
+
+    async def wait_until_closed(self) -> None:
+        while self._opened_until is not None:
+            remaining = self._opened_until - self.clock()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    def record_success(self) -> None:
+        if self._opened_until is not None:
+            logger.info("Circuito %s cerrado", self.name)
+        self._failures = 0
+        self._opened_until = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            self._opened_until = self.clock() + self.open_seconds
+            self._failures = 0
+            logger.warning(
+                "Circuito %s abierto: análisis en pausa %ds", self.name, self.open_seconds
+            )
+
+
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=settings.GEMINI_BREAKER_FAILURES,
+    open_seconds=settings.GEMINI_BREAKER_OPEN_SECONDS,
+)
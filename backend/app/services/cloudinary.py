@@ -1,12 +1,12 @@
 import asyncio
 
-import cloudinary
-import cloudinary.uploader
-
 from app.core.config import settings
 
 
 def _configure():
+    # El SDK se importa en el primer uso para no cargarlo al arrancar la API
+    import cloudinary
+
     cloudinary.config(
         cloud_name=settings.CLOUDINARY_CLOUD_NAME,
         api_key=settings.CLOUDINARY_API_KEY,
@@ -39,6 +39,8 @@ async def upload_image_from_url(
     if filename:
         options["public_id"] = filename
 
+    import cloudinary.uploader
+
     try:
         result = await asyncio.to_thread(cloudinary.uploader.upload, image_url, **options)
         return result.get("secure_url")
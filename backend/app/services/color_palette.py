@@ -0,0 +1,154 @@
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+
+# Lado de la imagen reducida sobre la que corre k-means (64x64 = 4096 píxeles)
+_SAMPLE_SIZE = 64
+CLUSTERS = 5
+KMEANS_ITERATIONS = 12
+# Proporción mínima (ponderada) para que un color entre en la paleta
+MIN_SHARE = 0.12
+MAX_PALETTE_COLORS = 3
+
+# Los 15 colores permitidos en OUTFIT_ANALYSIS_PROMPT con un RGB de referencia
+PALETTE_RGB = {
+    "negro": (20, 20, 20),
+    "blanco": (245, 245, 245),
+    "gris": (128, 128, 128),
+    "rojo": (190, 30, 45),
+    "azul": (40, 70, 160),
+    "verde": (50, 120, 60),
+    "amarillo": (240, 210, 50),
+    "naranja": (235, 120, 35),
+    "rosa": (235, 150, 180),
+    "morado": (110, 50, 140),
+    "marrón": (110, 70, 40),
+    "beige": (215, 195, 160),
+    "dorado": (200, 160, 60),
+    "plateado": (190, 190, 195),
+    "crema": (245, 235, 210),
+}
+PALETTE_NAMES = list(PALETTE_RGB)
+
+
+def _rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Convierte RGB (0-255, shape (..., 3)) a CIELAB (D65)."""
+    c = rgb / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array([
+        [0.4124, 0.2126, 0.0193],
+        [0.3576, 0.7152, 0.1192],
+        [0.1805, 0.0722, 0.9505],
+    ])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+_PALETTE_LAB = _rgb_to_lab(np.array(list(PALETTE_RGB.values()), dtype=np.float64))
+
+
+def _center_weights(size: int) -> np.ndarray:
+    """Peso gaussiano por píxel: la prenda suele estar al centro, el fondo en los bordes."""
+    axis = np.linspace(-1.0, 1.0, size)
+    yy, xx = np.meshgrid(axis, axis, indexing="ij")
+    return np.exp(-(xx ** 2 + yy ** 2) / (2 * 0.5 ** 2)).ravel()
+
+
+_WEIGHTS = _center_weights(_SAMPLE_SIZE)
+
+
+def kmeans(
+    points: np.ndarray, weights: np.ndarray, k: int, iterations: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    k-means ponderado y vectorizado (asignación por distancias en bloque).
+    Inicializa con k-means++ con semilla fija para que sea determinista.
+    Retorna (centroides, peso total de cada cluster).
+    """
+    rng = np.random.default_rng(0)
+    probs = weights / weights.sum()
+    centroids = [points[rng.choice(len(points), p=probs)]]
+    for _ in range(1, k):
+        d2 = ((points[:, None, :] - np.array(centroids)[None, :, :]) ** 2).sum(-1).min(1)
+        p = d2 * weights
+        if p.sum() == 0:
+            break
+        centroids.append(points[rng.choice(len(points), p=p / p.sum())])
+    centroids = np.array(centroids)
+
+    for _ in range(iterations):
+        d2 = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(-1)
+        labels = d2.argmin(1)
+        totals = np.bincount(labels, weights=weights, minlength=len(centroids))
+        sums = np.stack([
+            np.bincount(labels, weights=weights * points[:, j], minlength=len(centroids))
+            for j in range(points.shape[1])
+        ], axis=1)
+        nonempty = totals > 0
+        updated = centroids.copy()
+        updated[nonempty] = sums[nonempty] / totals[nonempty, None]
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+
+    labels = ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(-1).argmin(1)
+    totals = np.bincount(labels, weights=weights, minlength=len(centroids))
+    return centroids, totals
+
+
+def extract_palette(image_bytes: bytes) -> list[str]:
+    """
+    Paleta dominante de una imagen como colores de la lista del prompt,
+    ordenada por proporción. Corre en el pool de procesos (CPU puro).
+    """
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        small = img.convert("RGB").resize((_SAMPLE_SIZE, _SAMPLE_SIZE), Image.BILINEAR)
+        pixels = np.asarray(small, dtype=np.float64).reshape(-1, 3)
+
+    centroids, totals = kmeans(_rgb_to_lab(pixels), _WEIGHTS, CLUSTERS, KMEANS_ITERATIONS)
+    nearest = (
+        ((centroids[:, None, :] - _PALETTE_LAB[None, :, :]) ** 2).sum(-1).argmin(1)
+    )
+    # Varios clusters pueden caer en el mismo color de la lista: se suman
+    shares = np.bincount(nearest, weights=totals, minlength=len(PALETTE_NAMES))
+    shares /= shares.sum()
+    order = np.argsort(-shares)[:MAX_PALETTE_COLORS]
+    return [PALETTE_NAMES[i] for i in order if shares[i] >= MIN_SHARE]
+
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.COLOR_EXTRACTION_WORKERS)
+    return _executor
+
+
+async def warm_up_executor() -> None:
+    """Arranca los procesos del pool antes del primer tablero."""
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    await asyncio.gather(*[
+        loop.run_in_executor(executor, os.getpid)
+        for _ in range(settings.COLOR_EXTRACTION_WORKERS)
+    ])
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,130 @@
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_MAX_ENTRIES = 256
+# Pares candidatos que se extienden a tríos
+TRIPLE_CANDIDATE_PAIRS = 50
+
+# (board_id, k, min_count) -> (versión del análisis, resultado). Cada
+# combinación de parámetros tiene su entrada: clientes con distinto k no
+# se desalojan entre sí.
+_CacheKey = tuple[uuid.UUID, int, int]
+_cache: OrderedDict[_CacheKey, tuple[str, dict]] = OrderedDict()
+
+
+def get_cached(board_id: uuid.UUID, k: int, min_count: int, version: str) -> dict | None:
+    key = (board_id, k, min_count)
+    entry = _cache.get(key)
+    if entry is None or entry[0] != version:
+        return None
+    _cache.move_to_end(key)
+    return entry[1]
+
+
+def set_cached(
+    board_id: uuid.UUID, k: int, min_count: int, version: str, result: dict
+) -> None:
+    key = (board_id, k, min_count)
+    _cache[key] = (version, result)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+def invalidate(board_id: uuid.UUID) -> None:
+    for key in [key for key in _cache if key[0] == board_id]:
+        del _cache[key]
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Índices de los k mayores valores, ordenados de mayor a menor."""
+    if scores.size <= k:
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def compute_cooccurrence(
+    pairs: list[tuple[uuid.UUID, str]], k: int, min_count: int
+) -> dict:
+    """
+    Calcula co-ocurrencias de prendas a partir de pares (outfit_id, nombre).
+
+    Construye la matriz de incidencia dispersa outfit×prenda X; los conteos
+    de pares salen de XᵀX y los de tríos de (X[:,a]∘X[:,b])ᵀX para los pares
+    más frecuentes. El lift compara la co-ocurrencia con la esperada si las
+    prendas fueran independientes.
+    """
+    if not pairs:
+        return {"outfits": 0, "pairs": [], "triples": []}
+    # scipy se importa en el primer uso para no cargarlo al arrancar la API
+    from scipy import sparse
+
+    outfit_index: dict[uuid.UUID, int] = {}
+    name_index: dict[str, int] = {}
+    rows = np.fromiter(
+        (outfit_index.setdefault(o, len(outfit_index)) for o, _ in pairs),
+        dtype=np.int64, count=len(pairs),
+    )
+    cols = np.fromiter(
+        (name_index.setdefault(n, len(name_index)) for _, n in pairs),
+        dtype=np.int64, count=len(pairs),
+    )
+    names = np.array(list(name_index), dtype=object)
+    n_outfits = len(outfit_index)
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float64), (rows, cols)),
+        shape=(n_outfits, len(name_index)),
+    )
+    incidence.data[:] = 1.0  # pares repetidos cuentan una vez por outfit
+    name_counts = np.asarray(incidence.sum(axis=0)).ravel()
+
+    # ── Pares: triángulo superior de XᵀX ──
+    co = sparse.triu(incidence.T @ incidence, k=1).tocoo()
+    keep = co.data >= min_count
+    pair_a, pair_b, pair_counts = co.row[keep], co.col[keep], co.data[keep]
+    pair_lift = pair_counts * n_outfits / (name_counts[pair_a] * name_counts[pair_b])
+
+    pair_items = [
+        {
+            "garments": [names[pair_a[i]], names[pair_b[i]]],
+            "count": int(pair_counts[i]),
+            "support": float(pair_counts[i] / n_outfits),
+            "lift": float(pair_lift[i]),
+        }
+        for i in _top_k(pair_counts, k)
+    ]
+
+    # ── Tríos: extender los pares más frecuentes con una tercera prenda ──
+    triple_items: list[dict] = []
+    if pair_counts.size:
+        cand = _top_k(pair_counts, TRIPLE_CANDIDATE_PAIRS)
+        cand_a, cand_b = pair_a[cand], pair_b[cand]
+        both = incidence[:, cand_a].multiply(incidence[:, cand_b]).tocsc()
+        triple = (both.T @ incidence).tocoo()
+        a, b, c = cand_a[triple.row], cand_b[triple.row], triple.col
+        counts = triple.data
+        valid = (c != a) & (c != b) & (counts >= min_count)
+        a, b, c, counts = a[valid], b[valid], c[valid], counts[valid]
+
+        # Cada trío aparece desde varios pares: deduplicar por índices ordenados
+        keys = np.sort(np.stack([a, b, c], axis=1), axis=1)
+        keys, first = np.unique(keys, axis=0, return_index=True)
+        counts = counts[first]
+        lift = counts * n_outfits**2 / (
+            name_counts[keys[:, 0]] * name_counts[keys[:, 1]] * name_counts[keys[:, 2]]
+        )
+        triple_items = [
+            {
+                "garments": [names[j] for j in keys[i]],
+                "count": int(counts[i]),
+                "support": float(counts[i] / n_outfits),
+                "lift": float(lift[i]),
+            }
+            for i in _top_k(counts, k)
+        ]
+
+    return {"outfits": n_outfits, "pairs": pair_items, "triples": triple_items}
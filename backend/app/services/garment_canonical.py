@@ -0,0 +1,232 @@
+import asyncio
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import async_session
+from app.models.canonical_garment import CanonicalGarment
+
+# Palabras que no distinguen una prenda de otra ("Jeans de corte slim")
+STOPWORDS = {
+    "a", "al", "con", "corte", "de", "del", "el", "en", "estilo", "la", "las",
+    "los", "modelo", "para", "tipo", "un", "una", "y",
+}
+_VOWELS = set("aeiou")
+
+SIMILARITY_THRESHOLD = 0.6
+
+# MinHash: NUM_PERM permutaciones agrupadas en bandas para LSH. Con 20
+# bandas de 3 filas la probabilidad de ser candidato, 1 - (1 - s³)²⁰, cruza
+# 0,5 en s ≈ 0,37 y en el umbral (0,6) es del 99%: prácticamente los mismos
+# pares que la búsqueda exhaustiva del backfill de la migración 009.
+NUM_PERM = 60
+BANDS = 20
+_ROWS_PER_BAND = NUM_PERM // BANDS
+# Hash multiply-shift: (a·x + b) mod 2⁶⁴ con a impar, quedándose con los 32
+# bits altos. Cada permutación ordena los trigramas de forma independiente;
+# con (a·x + b) mod p y a, x < 2³² casi no había reducción modular y todas
+# las permutaciones ordenaban igual, así que las bandas coincidían o
+# fallaban juntas.
+_rng = np.random.default_rng(20260219)
+_PERM_A = _rng.integers(0, 1 << 64, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 64, NUM_PERM, dtype=np.uint64)
+
+
+def _singular(token: str) -> str:
+    """Singular aproximado en español: pantalones → pantalon, jeans → jean."""
+    if len(token) > 4 and token.endswith("es") and token[-3] not in _VOWELS:
+        return token[:-2]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def normalize_name(name: str) -> str:
+    """Minúsculas, sin acentos ni stopwords y en singular."""
+    text = unicodedata.normalize("NFKD", name.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    tokens = [
+        _singular(t) for t in re.findall(r"[a-z0-9]+", text) if t not in STOPWORDS
+    ]
+    return " ".join(tokens)[:100]
+
+
+def trigrams(normalized: str) -> frozenset[str]:
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_bands(grams: frozenset[str]) -> list[int]:
+    """Firma MinHash de los trigramas, resumida en un hash por banda."""
+    x = np.fromiter(
+        (zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams)
+    )
+    hashed = (_PERM_A[:, None] * x[None, :] + _PERM_B[:, None]) >> np.uint64(32)
+    signature = hashed.min(axis=1)
+    return [
+        hash(signature[b * _ROWS_PER_BAND:(b + 1) * _ROWS_PER_BAND].tobytes())
+        for b in range(BANDS)
+    ]
+
+
+class CanonicalIndex:
+    """
+    Índice en memoria de nombres canónicos por tipo de prenda.
+
+    Primero busca el nombre normalizado exacto; si no existe, usa LSH sobre
+    MinHash de trigramas para obtener candidatos y confirma con Jaccard.
+    """
+
+    def __init__(self) -> None:
+        self._exact: dict[tuple[str, str], int] = {}
+        self._grams: dict[int, frozenset[str]] = {}
+        self._buckets: dict[tuple[str, int, int], list[int]] = {}
+
+    def add(self, canonical_id: int, garment_type: str, normalized: str) -> None:
+        if canonical_id in self._grams:
+            return
+        self._exact.setdefault((garment_type, normalized), canonical_id)
+        grams = trigrams(normalized)
+        self._grams[canonical_id] = grams
+        for band, band_hash in enumerate(minhash_bands(grams)):
+            self._buckets.setdefault((garment_type, band, band_hash), []).append(
+                canonical_id
+            )
+
+    def lookup(self, garment_type: str, normalized: str) -> int | None:
+        exact = self._exact.get((garment_type, normalized))
+        if exact is not None:
+            return exact
+        grams = trigrams(normalized)
+        candidates: set[int] = set()
+        for band, band_hash in enumerate(minhash_bands(grams)):
+            candidates.update(self._buckets.get((garment_type, band, band_hash), ()))
+        best_id, best_score = None, SIMILARITY_THRESHOLD
+        for candidate in candidates:
+            score = jaccard(grams, self._grams[candidate])
+            if score >= best_score:
+                best_id, best_score = candidate, score
+        return best_id
+
+
+_index = CanonicalIndex()
+# Mayor id ya cargado por tipo: los canónicos de un tipo se crean en serie
+# (bloqueo por tipo) y se confirman en orden de id dentro de ese tipo
+_loaded_up_to: dict[str, int] = {}
+_type_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+_load_lock = asyncio.Lock()
+_loaded = False
+
+
+def _advisory_key(garment_type: str) -> int:
+    """Clave estable entre procesos para pg_advisory_xact_lock (hash() cambia por proceso)."""
+    return zlib.crc32(f"canonical_garments:{garment_type}".encode())
+
+
+async def _load_all() -> None:
+    """Carga inicial de todos los canónicos (una vez por proceso)."""
+    global _loaded
+    async with _load_lock:
+        if _loaded:
+            return
+        async with async_session() as db:
+            result = await db.execute(
+                select(CanonicalGarment.id, CanonicalGarment.type, CanonicalGarment.normalized)
+                .order_by(CanonicalGarment.id)
+            )
+            for row in result.all():
+                _index.add(row.id, row.type, row.normalized)
+                _loaded_up_to[row.type] = row.id
+        _loaded = True
+
+
+async def _refresh_type(db: AsyncSession, garment_type: str) -> None:
+    """Agrega al índice los canónicos del tipo creados por otros procesos."""
+    result = await db.execute(
+        select(CanonicalGarment.id, CanonicalGarment.normalized)
+        .where(
+            CanonicalGarment.type == garment_type,
+            CanonicalGarment.id > _loaded_up_to.get(garment_type, 0),
+        )
+        .order_by(CanonicalGarment.id)
+    )
+    for row in result.all():
+        _index.add(row.id, garment_type, row.normalized)
+        _loaded_up_to[garment_type] = row.id
+
+
+async def _create_missing(garment_type: str, normalized_names: dict[str, str]) -> None:
+    """
+    Resuelve los nombres de un tipo que el índice no conoce. Toma un bloqueo
+    de la base por tipo (entre procesos y réplicas), relee los canónicos que
+    otros hayan creado y solo entonces crea los que siguen sin similar, así
+    todos los workers asignan el mismo canónico a las mismas variantes.
+    """
+    async with _type_locks[garment_type], async_session() as db:
+        await db.execute(select(func.pg_advisory_xact_lock(_advisory_key(garment_type))))
+        await _refresh_type(db, garment_type)
+        # Creados en esta transacción: pasan al índice solo tras el commit
+        staged = CanonicalIndex()
+        created: list[tuple[int, str]] = []
+        for normalized, name in normalized_names.items():
+            if (
+                _index.lookup(garment_type, normalized) is not None
+                or staged.lookup(garment_type, normalized) is not None
+            ):
+                continue
+            canonical_id = (await db.execute(
+                pg_insert(CanonicalGarment)
+                .values(type=garment_type, name=name[:100], normalized=normalized)
+                .on_conflict_do_nothing(index_elements=["type", "normalized"])
+                .returning(CanonicalGarment.id)
+            )).scalar_one_or_none()
+            if canonical_id is None:
+                # Creado por alguien que no tomó el bloqueo: se relee
+                await _refresh_type(db, garment_type)
+                continue
+            created.append((canonical_id, normalized))
+            staged.add(canonical_id, garment_type, normalized)
+        await db.commit()
+        for canonical_id, normalized in created:
+            _index.add(canonical_id, garment_type, normalized)
+            _loaded_up_to[garment_type] = max(
+                _loaded_up_to.get(garment_type, 0), canonical_id
+            )
+
+
+async def resolve_canonical_ids(garments: list[tuple[str, str]]) -> list[int]:
+    """
+    Devuelve el id canónico de cada (nombre, tipo), creando canónicos nuevos
+    cuando no hay uno similar.
+
+    Los nombres ya conocidos se resuelven en memoria, sin bloqueo ni viaje
+    a la base; solo los desconocidos pasan por `_create_missing`, que
+    confirma antes de devolver para que ninguna tarea referencie un
+    canónico aún sin commit.
+    """
+    if not _loaded:
+        await _load_all()
+    normalized = [
+        (normalize_name(name) or name.lower()[:100], name, garment_type)
+        for name, garment_type in garments
+    ]
+    missing: dict[str, dict[str, str]] = defaultdict(dict)
+    for norm, name, garment_type in normalized:
+        if _index.lookup(garment_type, norm) is None:
+            missing[garment_type].setdefault(norm, name)
+    # Un tipo a la vez: nunca se retienen dos bloqueos juntos
+    for garment_type in sorted(missing):
+        await _create_missing(garment_type, missing[garment_type])
+    return [_index.lookup(garment_type, norm) for norm, _name, garment_type in normalized]
@@ -0,0 +1,65 @@
+import io
+import re
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8
+_DCT_SIZE = 32
+
+_PINIMG_SIZE_PATTERN = re.compile(r"/(originals|\d+x)/")
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix * np.sqrt(2 / n)
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def thumbnail_url(image_url: str) -> str:
+    """Usa la variante 236x de i.pinimg.com para no descargar el original."""
+    return _PINIMG_SIZE_PATTERN.sub("/236x/", image_url, count=1)
+
+
+def perceptual_hash(image_bytes: bytes) -> int:
+    """pHash de 64 bits: DCT de la imagen 32x32 en grises vs. su mediana."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        gray = img.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS)
+        pixels = np.asarray(gray, dtype=np.float64)
+    low_freq = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    bits = low_freq > np.median(low_freq[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def cluster_near_duplicates(
+    hashes: list[int | None], max_distance: int
+) -> list[int]:
+    """
+    Agrupa imágenes casi idénticas por distancia de Hamming entre pHashes.
+
+    Retorna, para cada índice, el índice de su representante (el primer
+    pin del cluster). Las imágenes sin hash son siempre su propio representante.
+    """
+    representatives = list(range(len(hashes)))
+    rep_indices: list[int] = []
+    rep_hashes = np.empty(0, dtype=np.uint64)
+
+    for i, h in enumerate(hashes):
+        if h is None:
+            continue
+        if rep_hashes.size:
+            xor = np.bitwise_xor(rep_hashes, np.uint64(h))
+            distances = np.unpackbits(xor.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+            best = int(np.argmin(distances))
+            if distances[best] <= max_distance:
+                representatives[i] = rep_indices[best]
+                continue
+        rep_indices.append(i)
+        rep_hashes = np.append(rep_hashes, np.uint64(h))
+
+    return representatives
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import httpx
+
+from app.core.config import settings
+from app.services.vision_errors import BadImageError, backoff_delay, classify_error
+
+logger = logging.getLogger(__name__)
+
+# Tamaño supuesto de una imagen sin Content-Length (se ajusta al descargarla)
+_ESTIMATED_IMAGE_BYTES = 512 * 1024
+
+
+@dataclass
+class PrefetchedImage:
+    url: str
+    data: bytes
+    mime_type: str
+
+
+class ByteBudget:
+    """
+    Presupuesto de bytes de imágenes descargadas y aún no analizadas.
+
+    acquire() espera hasta que haya espacio; una sola reserva mayor que el
+    límite se permite si no hay nada más reservado, para no bloquearse.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self, n: int) -> None:
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self.used == 0 or self.used + n <= self.limit
+            )
+            self.used += n
+
+    async def release(self, n: int) -> None:
+        async with self._changed:
+            self.used -= n
+            self._changed.notify_all()
+
+    async def adjust(self, reserved: int, actual: int) -> None:
+        """Corrige una reserva estimada al tamaño real (sin esperar)."""
+        async with self._changed:
+            self.used += actual - reserved
+            self._changed.notify_all()
+
+
+byte_budget = ByteBudget(settings.IMAGE_PREFETCH_BYTE_BUDGET)
+_download_slots = asyncio.Semaphore(settings.IMAGE_PREFETCH_CONCURRENCY)
+
+
+async def _download(image_url: str) -> tuple[bytes, str]:
+    """Descarga y valida una imagen; reserva su tamaño en el presupuesto."""
+    async with _download_slots:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            async with client.stream(
+                "GET", image_url, headers={"User-Agent": settings.PINTEREST_USER_AGENT}
+            ) as resp:
+                resp.raise_for_status()
+                mime_type = resp.headers.get("content-type", "image/jpeg").split(";")[0]
+                if not mime_type.startswith("image/"):
+                    raise BadImageError(f"Respuesta no es una imagen ({mime_type})")
+                declared = int(resp.headers.get("content-length") or 0)
+                if declared > settings.IMAGE_MAX_BYTES:
+                    raise BadImageError(f"Imagen demasiado grande ({declared} bytes)")
+
+                reserved = declared or _ESTIMATED_IMAGE_BYTES
+                await byte_budget.acquire(reserved)
+                try:
+                    chunks: list[bytes] = []
+                    size = 0
+                    async for chunk in resp.aiter_bytes():
+                        size += len(chunk)
+                        if size > settings.IMAGE_MAX_BYTES:
+                            raise BadImageError(f"Imagen demasiado grande (>{size} bytes)")
+                        chunks.append(chunk)
+                    if not size:
+                        raise BadImageError("Imagen vacía")
+                except BaseException:
+                    await byte_budget.release(reserved)
+                    raise
+                await byte_budget.adjust(reserved, size)
+                return b"".join(chunks), mime_type
+
+
+@asynccontextmanager
+async def prefetch_image(image_url: str):
+    """
+    Etapa de prefetch: descarga la imagen con su propia concurrencia
+    (independiente de los slots de Gemini), reintentando errores
+    transitorios, y la retiene dentro del presupuesto de bytes hasta salir
+    del bloque.
+    """
+    attempt = 0
+    while True:
+        try:
+            data, mime_type = await _download(image_url)
+            break
+        except Exception as e:
+            error = classify_error(e)
+            delay = backoff_delay(error, attempt)
+            if delay is None:
+                raise error from e
+            logger.warning(
+                "Error %s descargando %s, reintento %d en %.1fs",
+                error.kind, image_url, attempt + 1, delay,
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+    try:
+        yield PrefetchedImage(url=image_url, data=data, mime_type=mime_type)
+    finally:
+        await byte_budget.release(len(data))
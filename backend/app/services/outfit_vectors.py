@@ -0,0 +1,170 @@
+import uuid
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from app.services.garment_canonical import normalize_name
+
+# Dimensión de los vectores (feature hashing de los atributos)
+DIMENSIONS = 512
+CACHE_MAX_USERS = 256
+_INITIAL_CAPACITY = 64
+
+# Peso de cada tipo de atributo en el vector
+FEATURE_WEIGHTS = {
+    "garment": 2.0,
+    "type": 1.0,
+    "color": 1.0,
+    "material": 0.5,
+    "style": 1.5,
+    "season": 0.5,
+}
+
+
+def _feature_index(feature: str) -> int:
+    return zlib.crc32(feature.encode()) % DIMENSIONS
+
+
+def encode_outfit(
+    style: str | None,
+    season: str | None,
+    garments: list[tuple[str, int | None, str | None, str | None]],
+) -> np.ndarray | None:
+    """
+    Vector L2-normalizado de un outfit a partir de su estilo, temporada y
+    prendas (tipo, id canónico, color, material). None si no tiene prendas.
+    """
+    if not garments:
+        return None
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+
+    def add(kind: str, value) -> None:
+        if value is not None and value != "":
+            vector[_feature_index(f"{kind}:{value}")] += FEATURE_WEIGHTS[kind]
+
+    add("style", style)
+    add("season", season)
+    for garment_type, canonical_id, color, material in garments:
+        add("type", garment_type)
+        add("garment", canonical_id)
+        add("color", color)
+        add("material", normalize_name(material) if material else None)
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+
+class UserOutfitMatrix:
+    """Matriz outfits×dimensiones de un usuario, ampliable fila a fila."""
+
+    def __init__(self) -> None:
+        self.matrix = np.zeros((_INITIAL_CAPACITY, DIMENSIONS), dtype=np.float32)
+        self.outfit_ids: list[uuid.UUID] = []
+        self.board_ids: list[uuid.UUID] = []
+        self.rows: dict[uuid.UUID, int] = {}
+
+    def upsert(self, outfit_id: uuid.UUID, board_id: uuid.UUID, vector: np.ndarray) -> None:
+        row = self.rows.get(outfit_id)
+        if row is None:
+            row = len(self.outfit_ids)
+            if row == self.matrix.shape[0]:
+                grown = np.zeros((row * 2, DIMENSIONS), dtype=np.float32)
+                grown[:row] = self.matrix
+                self.matrix = grown
+            self.rows[outfit_id] = row
+            self.outfit_ids.append(outfit_id)
+            self.board_ids.append(board_id)
+        self.matrix[row] = vector
+
+    def remove_board(self, board_id: uuid.UUID) -> None:
+        keep = [i for i, b in enumerate(self.board_ids) if b != board_id]
+        if len(keep) == len(self.board_ids):
+            return
+        kept = self.matrix[keep]
+        self.matrix = np.zeros(
+            (max(_INITIAL_CAPACITY, len(keep) * 2), DIMENSIONS), dtype=np.float32
+        )
+        self.matrix[:len(keep)] = kept
+        self.outfit_ids = [self.outfit_ids[i] for i in keep]
+        self.board_ids = [self.board_ids[i] for i in keep]
+        self.rows = {outfit_id: i for i, outfit_id in enumerate(self.outfit_ids)}
+
+    def top_k(self, outfit_id: uuid.UUID, k: int) -> list[tuple[uuid.UUID, float]]:
+        """Los k outfits con mayor similitud coseno (excluye el propio)."""
+        row = self.rows.get(outfit_id)
+        n = len(self.outfit_ids)
+        if row is None or n < 2:
+            return []
+        scores = self.matrix[:n] @ self.matrix[row]
+        scores[row] = -np.inf
+        k = min(k, n - 1)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.outfit_ids[i], float(scores[i])) for i in top]
+
+
+# user_id -> matriz (LRU); se carga perezosamente desde la base
+_matrices: OrderedDict[uuid.UUID, UserOutfitMatrix] = OrderedDict()
+
+
+def get_matrix(user_id: uuid.UUID) -> UserOutfitMatrix | None:
+    matrix = _matrices.get(user_id)
+    if matrix is not None:
+        _matrices.move_to_end(user_id)
+    return matrix
+
+
+def build_matrix(
+    outfits: list[tuple[uuid.UUID, uuid.UUID, str | None, str | None]],
+    garments: list[tuple[uuid.UUID, str, int | None, str | None, str | None]],
+) -> UserOutfitMatrix:
+    """
+    Construye la matriz de un usuario a partir de (outfit_id, board_id,
+    estilo, temporada) y (outfit_id, tipo, id canónico, color, material).
+    """
+    by_outfit: dict[uuid.UUID, list] = {}
+    for outfit_id, garment_type, canonical_id, color, material in garments:
+        by_outfit.setdefault(outfit_id, []).append(
+            (garment_type, canonical_id, color, material)
+        )
+    matrix = UserOutfitMatrix()
+    for outfit_id, board_id, style, season in outfits:
+        vector = encode_outfit(style, season, by_outfit.get(outfit_id, []))
+        if vector is not None:
+            matrix.upsert(outfit_id, board_id, vector)
+    return matrix
+
+
+def set_matrix(user_id: uuid.UUID, matrix: UserOutfitMatrix) -> None:
+    _matrices[user_id] = matrix
+    _matrices.move_to_end(user_id)
+    while len(_matrices) > CACHE_MAX_USERS:
+        _matrices.popitem(last=False)
+
+
+def add_outfit(
+    user_id: uuid.UUID,
+    board_id: uuid.UUID,
+    outfit_id: uuid.UUID,
+    style: str | None,
+    season: str | None,
+    garments: list[tuple[str, int | None, str | None, str | None]],
+) -> None:
+    """Añade un outfit recién analizado si la matriz del usuario está cargada."""
+    matrix = _matrices.get(user_id)
+    if matrix is None:
+        return
+    vector = encode_outfit(style, season, garments)
+    if vector is not None:
+        matrix.upsert(outfit_id, board_id, vector)
+
+
+def remove_board(user_id: uuid.UUID, board_id: uuid.UUID) -> None:
+    matrix = _matrices.get(user_id)
+    if matrix is not None:
+        matrix.remove_board(board_id)
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    _matrices.pop(user_id, None)
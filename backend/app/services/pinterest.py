@@ -1,8 +1,14 @@
+import copy
 import json
 import re
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 
 import httpx
+import orjson
+
+from app.core.config import settings
 
 PINTEREST_BOARD_PATTERN = re.compile(
     r"https?://(\w+\.)?pinterest\.\w+(/\w+)?/([^/]+)/([^/?]+)"
@@ -12,10 +18,36 @@ PINTEREST_SHORT_PATTERN = re.compile(
     r"https?://pin\.it/\w+"
 )
 
-_USER_AGENT = (
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-)
+SHORT_LINK_CACHE_MAX_ENTRIES = 4096
+SCRAPE_CACHE_MAX_ENTRIES = 256
+
+
+@dataclass
+class _ScrapeCacheEntry:
+    result: dict
+    first_page_pin_ids: tuple[str, ...]
+    pin_count: int | None
+    etag: str | None
+    last_modified: str | None
+
+
+# Caches en memoria del proceso (LRU acotado)
+_short_link_cache: OrderedDict[str, str] = OrderedDict()
+_scrape_cache: OrderedDict[str, _ScrapeCacheEntry] = OrderedDict()
+
+
+def _lru_get(cache: OrderedDict, key: str):
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_set(cache: OrderedDict, key: str, value, max_entries: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
 
 
 async def resolve_pinterest_url(url: str) -> str:
@@ -23,14 +55,23 @@ async def resolve_pinterest_url(url: str) -> str:
     url = url.strip()
     if not PINTEREST_SHORT_PATTERN.match(url):
         return url
+
+    cached = _lru_get(_short_link_cache, url)
+    if cached is not None:
+        return cached
+
     try:
         async with httpx.AsyncClient(follow_redirects=True, timeout=15.0) as client:
-            resp = await client.get(url, headers={"User-Agent": _USER_AGENT})
+            resp = await client.get(
+                url, headers={"User-Agent": settings.PINTEREST_USER_AGENT}
+            )
             resolved = str(resp.url).split("?")[0].rstrip("/")
-            return resolved
     except httpx.HTTPError:
         return url
 
+    _lru_set(_short_link_cache, url, resolved, SHORT_LINK_CACHE_MAX_ENTRIES)
+    return resolved
+
 
 def validate_pinterest_url(url: str) -> bool:
     return bool(PINTEREST_BOARD_PATTERN.match(url.rstrip("/")))
@@ -44,23 +85,84 @@ def extract_board_info(url: str) -> dict:
     return {"username": match.group(3), "board_slug": match.group(4)}
 
 
+def canonical_board_url(url: str) -> str:
+    """URL canónica del tablero (dominio .com, minúsculas, barra final)."""
+    info = extract_board_info(url)
+    if not info["username"]:
+        return url.strip().rstrip("/")
+    return (
+        f"https://www.pinterest.com/{info['username'].lower()}/"
+        f"{info['board_slug'].lower()}/"
+    )
+
+
 # ---------------------------------------------------------------------------
 # Helpers internos para parsear la respuesta de Pinterest
 # ---------------------------------------------------------------------------
 
-def _extract_script_json(html: str, script_id: str) -> dict | None:
-    """Extrae y parsea un <script type='application/json' id='...'> del HTML."""
-    pattern = re.compile(
-        rf'<script\s+id="{script_id}"\s+type="application/json">(.*?)</script>',
-        re.DOTALL,
-    )
-    match = pattern.search(html)
-    if not match:
-        return None
+_BOARD_SCRIPT_IDS = ("__PWS_INITIAL_PROPS__", "__PWS_DATA__")
+
+_BOARD_SCRIPT_OPEN_PATTERN = re.compile(
+    r'<script\s+id="(__PWS_INITIAL_PROPS__|__PWS_DATA__)"\s+type="application/json">'
+)
+
+_SCRIPT_CLOSE_TAG = "</script>"
+
+# Cola que se conserva entre chunks para no partir una etiqueta de apertura
+_OPEN_TAG_TAIL = 128
+
+
+def _loads_json_object(raw: str) -> dict | None:
+    """Decodifica un objeto JSON con orjson; None si es inválido."""
     try:
-        return json.loads(match.group(1))
-    except (json.JSONDecodeError, ValueError):
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
         return None
+    return data if isinstance(data, dict) else None
+
+
+class _BoardScriptExtractor:
+    """
+    Extrae los <script type='application/json'> del tablero en una sola pasada.
+
+    Recibe el HTML por chunks y solo conserva en memoria el contenido del
+    script que se está leyendo; `done` indica que ya se cerraron ambos
+    bloques y se puede cortar la descarga.
+    """
+
+    def __init__(self) -> None:
+        self.scripts: dict[str, dict | None] = {}
+        self._buffer = ""
+        self._current: str | None = None
+        self._scan_from = 0
+
+    @property
+    def done(self) -> bool:
+        return all(sid in self.scripts for sid in _BOARD_SCRIPT_IDS)
+
+    def feed(self, chunk: str) -> None:
+        self._buffer += chunk
+        while not self.done:
+            if self._current is None:
+                match = _BOARD_SCRIPT_OPEN_PATTERN.search(self._buffer)
+                if not match:
+                    self._buffer = self._buffer[-_OPEN_TAG_TAIL:]
+                    return
+                self._current = match.group(1)
+                self._buffer = self._buffer[match.end():]
+                self._scan_from = 0
+
+            end = self._buffer.find(_SCRIPT_CLOSE_TAG, self._scan_from)
+            if end == -1:
+                # Evita re-escanear todo el script en cada chunk
+                self._scan_from = max(0, len(self._buffer) - len(_SCRIPT_CLOSE_TAG))
+                return
+
+            self.scripts.setdefault(
+                self._current, _loads_json_object(self._buffer[:end])
+            )
+            self._buffer = self._buffer[end + len(_SCRIPT_CLOSE_TAG):]
+            self._current = None
 
 
 def _get_pin_image_url(pin: dict) -> str | None:
@@ -105,10 +207,14 @@ async def scrape_board_images(url: str) -> dict:
     Scrapea imágenes de un tablero público de Pinterest con paginación.
 
     Estrategia:
-    1. Descarga el HTML de la página del tablero
+    1. Descarga el HTML del tablero en streaming, cortando al cerrar los scripts JSON
     2. Parsea __PWS_INITIAL_PROPS__ para obtener los primeros ~15 pins
     3. Pagina vía la API interna BoardFeedResource para obtener el resto
 
+    Si el tablero ya se scrapeó en este proceso, se envían los validadores
+    HTTP guardados y se compara la primera página de pins y el pin_count:
+    si nada cambió se devuelve el último resultado sin paginar.
+
     Retorna:
         {
             "name": str,
@@ -123,6 +229,8 @@ async def scrape_board_images(url: str) -> dict:
     username = info["username"]
     board_slug = info["board_slug"]
     source_url = f"/{username}/{board_slug}/"
+    cache_key = canonical_board_url(url)
+    cached = _lru_get(_scrape_cache, cache_key)
 
     image_urls: list[str] = []
     pin_urls: list[str] = []
@@ -133,29 +241,42 @@ async def scrape_board_images(url: str) -> dict:
     app_version: str | None = None
 
     page_headers = {
-        "User-Agent": _USER_AGENT,
+        "User-Agent": settings.PINTEREST_USER_AGENT,
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         "Accept-Language": "en-US,en;q=0.5",
     }
+    if cached:
+        if cached.etag:
+            page_headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            page_headers["If-Modified-Since"] = cached.last_modified
 
     async with httpx.AsyncClient(
         follow_redirects=True, timeout=30.0, http2=False
     ) as client:
-        # ── Paso 1: Descargar HTML de la página del tablero ──
-        resp = await client.get(
+        # ── Paso 1: Descargar HTML del tablero hasta cerrar los scripts JSON ──
+        extractor = _BoardScriptExtractor()
+        async with client.stream(
+            "GET",
             f"https://www.pinterest.com/{username}/{board_slug}/",
             headers=page_headers,
-        )
-        if resp.status_code != 200:
-            raise ValueError(
-                "No se pudo acceder al tablero de Pinterest. "
-                f"Status: {resp.status_code}"
-            )
-
-        html = resp.text
+        ) as resp:
+            if resp.status_code == 304 and cached:
+                return copy.deepcopy(cached.result)
+            if resp.status_code != 200:
+                raise ValueError(
+                    "No se pudo acceder al tablero de Pinterest. "
+                    f"Status: {resp.status_code}"
+                )
+            etag = resp.headers.get("etag")
+            last_modified = resp.headers.get("last-modified")
+            async for chunk in resp.aiter_text():
+                extractor.feed(chunk)
+                if extractor.done:
+                    break
 
         # ── Paso 2: Parsear __PWS_INITIAL_PROPS__ ──
-        props = _extract_script_json(html, "__PWS_INITIAL_PROPS__")
+        props = extractor.scripts.get("__PWS_INITIAL_PROPS__")
         if not props:
             raise ValueError(
                 "No se pudo extraer datos del tablero. "
@@ -165,7 +286,7 @@ async def scrape_board_images(url: str) -> dict:
         redux = props.get("initialReduxState", {})
 
         # Extraer app version para headers de API
-        pws_data = _extract_script_json(html, "__PWS_DATA__")
+        pws_data = extractor.scripts.get("__PWS_DATA__")
         if pws_data:
             app_version = pws_data.get("appVersion")
 
@@ -194,6 +315,22 @@ async def scrape_board_images(url: str) -> dict:
             bookmark = resource.get("nextBookmark")
             break
 
+        first_page_pin_ids = tuple(
+            pin_url.rstrip("/").rsplit("/", 1)[-1] for pin_url in pin_urls
+        )
+
+        # Revalidación: si la primera página y el pin_count no cambiaron,
+        # el tablero es el mismo y se evita paginar de nuevo.
+        if (
+            cached
+            and first_page_pin_ids
+            and first_page_pin_ids == cached.first_page_pin_ids
+            and detected_pin_count == cached.pin_count
+        ):
+            cached.etag = etag or cached.etag
+            cached.last_modified = last_modified or cached.last_modified
+            return copy.deepcopy(cached.result)
+
         # Fallback: si BoardFeedResource no existe, usar pins store
         if not image_urls:
             pins_store = redux.get("pins", {})
@@ -211,7 +348,7 @@ async def scrape_board_images(url: str) -> dict:
 
         while bookmark and bookmark != "-end-":
             api_headers = {
-                "User-Agent": _USER_AGENT,
+                "User-Agent": settings.PINTEREST_USER_AGENT,
                 "Accept": "application/json",
                 "X-Requested-With": "XMLHttpRequest",
                 "X-CSRFToken": csrf_token,
@@ -249,7 +386,7 @@ async def scrape_board_images(url: str) -> dict:
                 if api_resp.status_code != 200:
                     break
 
-                data = api_resp.json()
+                data = orjson.loads(api_resp.content)
                 resource_resp = data.get("resource_response", {})
                 page_pins = resource_resp.get("data", [])
 
@@ -279,7 +416,7 @@ async def scrape_board_images(url: str) -> dict:
     if not cover_image and image_urls:
         cover_image = image_urls[0]
 
-    return {
+    result = {
         "name": board_name,
         "image_urls": image_urls,
         "pin_urls": pin_urls,
@@ -287,3 +424,16 @@ async def scrape_board_images(url: str) -> dict:
         "pins_count": len(image_urls),
         "detected_pin_count": detected_pin_count or len(image_urls),
     }
+    _lru_set(
+        _scrape_cache,
+        cache_key,
+        _ScrapeCacheEntry(
+            result=copy.deepcopy(result),
+            first_page_pin_ids=first_page_pin_ids,
+            pin_count=detected_pin_count,
+            etag=etag,
+            last_modified=last_modified,
+        ),
+        SCRAPE_CACHE_MAX_ENTRIES,
+    )
+    return result
@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Protocol
+
+from app.core.config import settings
+from app.services.vision_errors import is_cache_rejected
+
+logger = logging.getLogger(__name__)
+
+# Se renueva el caché un poco antes de que expire
+REFRESH_MARGIN_SECONDS = 60
+# Tras un fallo al crear el caché se envía el prompt completo durante este tiempo
+FAILURE_COOLDOWN_SECONDS = 300
+
+
+@dataclass
+class CachedPrompt:
+    name: str
+    expires_at: float
+
+
+class CacheBackend(Protocol):
+    async def create(self, model: str, prompt: str, ttl_seconds: int) -> CachedPrompt: ...
+
+
+class GeminiCacheBackend:
+    """Crea el contexto cacheado en la API de Gemini (caches.create)."""
+
+    async def create(self, model: str, prompt: str, ttl_seconds: int) -> CachedPrompt:
+        from google import genai
+
+        # Import diferido: ai_vision importa este módulo
+        from app.services.ai_vision import get_client
+
+        cache = await get_client().aio.caches.create(
+            model=model,
+            config=genai.types.CreateCachedContentConfig(
+                contents=[prompt],
+                ttl=f"{ttl_seconds}s",
+                display_name="outfit-analysis-prompt",
+            ),
+        )
+        expires_at = (
+            cache.expire_time.timestamp() if cache.expire_time
+            else time.time() + ttl_seconds
+        )
+        return CachedPrompt(name=cache.name, expires_at=expires_at)
+
+
+class PromptCache:
+    """
+    Registra el prompt estático como contexto cacheado una vez por
+    modelo/versión de prompt y devuelve su nombre para cada llamada.
+
+    Lo re-crea al acercarse la expiración o cuando la API lo rechaza
+    (invalidate). Si crearlo falla, get() devuelve None durante un tiempo
+    y el llamador envía el prompt completo; si la API rechaza su contenido
+    (p. ej. bajo el mínimo de tokens cacheables), no se reintenta en todo
+    el proceso.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: dict[tuple[str, str], CachedPrompt] = {}
+        self._disabled_until: dict[tuple[str, str], float] = {}
+        self._lock = asyncio.Lock()
+        self.stats = {"created": 0, "hits": 0, "failures": 0}
+
+    @staticmethod
+    def _key(model: str, prompt: str) -> tuple[str, str]:
+        return model, hashlib.sha256(prompt.encode()).hexdigest()[:16]
+
+    def _valid(self, key: tuple[str, str]) -> CachedPrompt | None:
+        entry = self._entries.get(key)
+        if entry and entry.expires_at - REFRESH_MARGIN_SECONDS > self.clock():
+            return entry
+        return None
+
+    async def get(self, model: str, prompt: str) -> str | None:
+        key = self._key(model, prompt)
+        entry = self._valid(key)
+        if entry is None:
+            if self._disabled_until.get(key, 0) > self.clock():
+                return None
+            async with self._lock:
+                entry = self._valid(key)
+                if entry is None:
+                    try:
+                        entry = await self.backend.create(model, prompt, self.ttl_seconds)
+                    except Exception as e:
+                        self.stats["failures"] += 1
+                        if is_cache_rejected(e):
+                            # El prompt no va a cambiar: reintentar solo gasta una llamada
+                            self._disabled_until[key] = math.inf
+                            logger.info(
+                                "Gemini no acepta cachear el prompt para %s, se envía "
+                                "completo: %s",
+                                model, e,
+                            )
+                            return None
+                        self._disabled_until[key] = self.clock() + FAILURE_COOLDOWN_SECONDS
+                        logger.warning(
+                            "No se pudo cachear el prompt para %s, se envía completo: %s",
+                            model, e,
+                        )
+                        return None
+                    self._entries[key] = entry
+                    self.stats["created"] += 1
+                    logger.info("Prompt cacheado como %s", entry.name)
+                    return entry.name
+        self.stats["hits"] += 1
+        return entry.name
+
+    def invalidate(self, model: str, prompt: str) -> None:
+        """Descarta el caché actual (p. ej. la API indica que expiró)."""
+        self._entries.pop(self._key(model, prompt), None)
+
+
+prompt_cache = PromptCache(
+    GeminiCacheBackend(), ttl_seconds=settings.GEMINI_CONTEXT_CACHE_TTL_SECONDS
+)
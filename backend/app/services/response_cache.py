@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+from app.core.config import settings
+
+
+class ResponseCache:
+    """
+    Cache LRU de cuerpos JSON ya serializados, indexado por ETag (que ya
+    incluye ruta, parámetros y versión del tablero, así que una entrada
+    nunca queda obsoleta: las versiones viejas simplemente dejan de pedirse
+    y salen por LRU). Acotado por bytes totales.
+
+    Lleva también las estadísticas de las respuestas condicionales.
+    """
+
+    def __init__(self, enabled: bool, max_bytes: int) -> None:
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self.counters = {
+            "requests": 0,
+            # 304: el cliente ya tenía la versión vigente
+            "not_modified": 0,
+            # 200 servido desde este cache sin consultar la base
+            "hits": 0,
+            "misses": 0,
+            # Tableros en análisis: sin ETag ni cache
+            "bypassed": 0,
+        }
+
+    def get(self, key: str) -> bytes | None:
+        if not self.enabled:
+            return None
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        if not self.enabled or len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = body
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        requests = self.counters["requests"] - self.counters["bypassed"]
+        served = self.counters["not_modified"] + self.counters["hits"]
+        return {
+            **self.counters,
+            "hit_rate": round(served / requests, 4) if requests else None,
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+
+response_cache = ResponseCache(
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+)
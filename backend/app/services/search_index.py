@@ -0,0 +1,180 @@
+import bisect
+import math
+import uuid
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from app.services.garment_canonical import normalize_name
+
+CACHE_MAX_BOARDS = 64
+# Máximo de términos del vocabulario que expande un prefijo ("cue" → cuero, cuello…)
+MAX_PREFIX_EXPANSIONS = 50
+
+# Peso de cada campo en la puntuación
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "material": 2.0,
+    "style": 1.0,
+    "color": 1.0,
+    "outfit_style": 1.0,
+}
+
+
+@lru_cache(maxsize=8192)
+def _tokenize_cached(text: str) -> tuple[str, ...]:
+    return tuple(normalize_name(text).split())
+
+
+def tokenize(text: str | None) -> tuple[str, ...]:
+    """Tokens en minúsculas, sin acentos ni stopwords y en singular."""
+    if not text:
+        return ()
+    return _tokenize_cached(text)
+
+
+@dataclass
+class BoardSearchIndex:
+    """
+    Índice invertido en memoria de un tablero: término → (outfits, pesos).
+
+    Cada outfit es un documento con los campos de sus prendas y su estilo.
+    La puntuación es Σ idf(término) · peso del campo; todos los términos de
+    la consulta deben aparecer (el último se busca también como prefijo).
+    Las listas de postings son arrays de NumPy y la puntuación se acumula
+    en un vector denso por documento.
+    """
+
+    outfit_ids: list[uuid.UUID] = field(default_factory=list)
+    postings: dict[str, tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+    garment_terms: dict[int, list[tuple[uuid.UUID, frozenset[str]]]] = field(
+        default_factory=dict
+    )
+    vocabulary: list[str] = field(default_factory=list)
+
+    def _expand(self, term: str, prefix: bool) -> list[str]:
+        expansions = [term] if term in self.postings else []
+        if prefix:
+            start = bisect.bisect_left(self.vocabulary, term)
+            for candidate in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not candidate.startswith(term):
+                    break
+                if candidate != term:
+                    expansions.append(candidate)
+        return expansions
+
+    def search(
+        self, query: str, offset: int = 0, limit: int = 20
+    ) -> tuple[int, list[tuple[uuid.UUID, float, list[uuid.UUID]]]]:
+        """Devuelve (total de resultados, página de (outfit, score, prendas))."""
+        terms = tokenize(query)
+        n_docs = len(self.outfit_ids)
+        if not terms or not n_docs:
+            return 0, []
+
+        scores = np.zeros(n_docs, dtype=np.float32)
+        required = np.ones(n_docs, dtype=bool)
+        matched_terms: set[str] = set()
+        for i, term in enumerate(terms):
+            expansions = self._expand(term, prefix=i == len(terms) - 1)
+            if not expansions:
+                return 0, []
+            present = np.zeros(n_docs, dtype=bool)
+            for expansion in expansions:
+                docs, weights = self.postings[expansion]
+                scores[docs] += math.log(1 + n_docs / len(docs)) * weights
+                present[docs] = True
+            required &= present
+            matched_terms.update(expansions)
+
+        hits = np.flatnonzero(required)
+        if not hits.size:
+            return 0, []
+        # Orden estable por score descendente: solo se ordena lo necesario
+        end = min(offset + limit, hits.size)
+        hit_scores = scores[hits]
+        if end < hits.size:
+            top = np.argpartition(-hit_scores, end - 1)[:end]
+        else:
+            top = np.arange(hits.size)
+        top = top[np.lexsort((hits[top], -hit_scores[top]))][offset:end]
+
+        page = []
+        for doc in hits[top].tolist():
+            matched = [
+                garment_id
+                for garment_id, garment_terms in self.garment_terms.get(doc, ())
+                if garment_terms & matched_terms
+            ]
+            page.append((self.outfit_ids[doc], round(float(scores[doc]), 4), matched))
+        return int(hits.size), page
+
+
+def build_index(
+    outfits: list[tuple[uuid.UUID, str | None]],
+    garments: list[tuple[uuid.UUID, uuid.UUID, str, str | None, str | None, str | None]],
+) -> BoardSearchIndex:
+    """
+    Construye el índice a partir de (outfit_id, estilo) y
+    (garment_id, outfit_id, nombre, material, estilo, color).
+    """
+    index = BoardSearchIndex()
+    doc_of: dict[uuid.UUID, int] = {}
+    postings: dict[str, dict[int, float]] = defaultdict(lambda: defaultdict(float))
+    garment_terms: dict[int, list[tuple[uuid.UUID, frozenset[str]]]] = defaultdict(list)
+
+    for outfit_id, style in outfits:
+        doc = doc_of[outfit_id] = len(index.outfit_ids)
+        index.outfit_ids.append(outfit_id)
+        for term in tokenize(style):
+            postings[term][doc] += FIELD_WEIGHTS["outfit_style"]
+
+    for garment_id, outfit_id, name, material, style, color in garments:
+        doc = doc_of.get(outfit_id)
+        if doc is None:
+            continue
+        terms: set[str] = set()
+        for field_name, text in (
+            ("name", name), ("material", material), ("style", style), ("color", color)
+        ):
+            weight = FIELD_WEIGHTS[field_name]
+            for term in tokenize(text):
+                postings[term][doc] += weight
+                terms.add(term)
+        garment_terms[doc].append((garment_id, frozenset(terms)))
+
+    index.postings = {
+        term: (
+            np.fromiter(docs.keys(), dtype=np.int32, count=len(docs)),
+            np.fromiter(docs.values(), dtype=np.float32, count=len(docs)),
+        )
+        for term, docs in postings.items()
+    }
+    index.garment_terms = dict(garment_terms)
+    index.vocabulary = sorted(index.postings)
+    return index
+
+
+# board_id -> (versión del análisis, índice)
+_cache: OrderedDict[uuid.UUID, tuple[str, BoardSearchIndex]] = OrderedDict()
+
+
+def get_cached(board_id: uuid.UUID, version: str) -> BoardSearchIndex | None:
+    entry = _cache.get(board_id)
+    if entry is None or entry[0] != version:
+        return None
+    _cache.move_to_end(board_id)
+    return entry[1]
+
+
+def set_cached(board_id: uuid.UUID, version: str, index: BoardSearchIndex) -> None:
+    _cache[board_id] = (version, index)
+    _cache.move_to_end(board_id)
+    while len(_cache) > CACHE_MAX_BOARDS:
+        _cache.popitem(last=False)
+
+
+def invalidate(board_id: uuid.UUID) -> None:
+    _cache.pop(board_id, None)
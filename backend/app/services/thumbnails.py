@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+import httpx
+
+from app.core.config import settings
+from app.services.color_palette import extract_palette, get_executor
+from app.services.image_dedup import perceptual_hash, thumbnail_url
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ThumbnailFeatures:
+    phash: int | None
+    palette: list[str] | None
+
+
+def thumbnail_features(image_bytes: bytes, with_palette: bool) -> ThumbnailFeatures:
+    """pHash y paleta de una miniatura ya descargada. Corre en el pool de procesos."""
+    return ThumbnailFeatures(
+        phash=perceptual_hash(image_bytes),
+        palette=extract_palette(image_bytes) if with_palette else None,
+    )
+
+
+class ThumbnailStage:
+    """
+    Miniaturas de un tablero en análisis: cada una se descarga una sola vez
+    y de los mismos bytes salen el pHash (casi duplicados) y la paleta de
+    color. La etapa de color y la detección de duplicados piden las mismas
+    URLs en órdenes distintos; la primera que llega lanza la descarga y la
+    otra espera el mismo resultado. Solo se retienen pHash y paleta, no los
+    bytes.
+    """
+
+    def __init__(self, with_palette: bool) -> None:
+        self.with_palette = with_palette
+        self._features: dict[str, asyncio.Future[ThumbnailFeatures]] = {}
+        self._semaphore = asyncio.Semaphore(settings.THUMBNAIL_CONCURRENCY)
+        self._client = httpx.AsyncClient(
+            timeout=15.0, headers={"User-Agent": settings.PINTEREST_USER_AGENT}
+        )
+
+    async def _compute(self, image_url: str) -> ThumbnailFeatures:
+        async with self._semaphore:
+            try:
+                resp = await self._client.get(thumbnail_url(image_url))
+                resp.raise_for_status()
+            except Exception as e:
+                logger.warning("No se pudo descargar la miniatura de %s: %s", image_url, e)
+                return ThumbnailFeatures(phash=None, palette=None)
+        try:
+            if self.with_palette:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    get_executor(), thumbnail_features, resp.content, True
+                )
+            return await asyncio.to_thread(thumbnail_features, resp.content, False)
+        except Exception as e:
+            logger.warning("No se pudo procesar la miniatura de %s: %s", image_url, e)
+            return ThumbnailFeatures(phash=None, palette=None)
+
+    async def features(self, image_urls: list[str]) -> list[ThumbnailFeatures]:
+        """pHash y paleta de cada URL, descargando solo las que nadie pidió antes."""
+        futures = []
+        for url in image_urls:
+            future = self._features.get(url)
+            if future is None:
+                future = asyncio.ensure_future(self._compute(url))
+                self._features[url] = future
+            futures.append(future)
+        # shield: cancelar a un consumidor no cancela la descarga del otro
+        return await asyncio.gather(*[asyncio.shield(f) for f in futures])
+
+    async def aclose(self) -> None:
+        for future in self._features.values():
+            future.cancel()
+        await self._client.aclose()
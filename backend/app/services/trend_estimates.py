@@ -0,0 +1,37 @@
+import math
+
+# z para un intervalo de confianza del 95%
+Z_95 = 1.96
+
+
+def wilson_interval(successes: int, n: int, z: float = Z_95) -> tuple[float, float]:
+    """Intervalo de Wilson para una proporción observada en una muestra de n."""
+    if n <= 0:
+        return 0.0, 1.0
+    p = min(successes, n) / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def max_margin(presence_counts: list[int], n: int, z: float = Z_95) -> float:
+    """Mayor semiancho de los intervalos de Wilson; 1.0 si no hay muestra."""
+    if n <= 0 or not presence_counts:
+        return 1.0
+    margins = []
+    for successes in presence_counts:
+        low, high = wilson_interval(successes, n, z)
+        margins.append((high - low) / 2)
+    return max(margins)
+
+
+def estimate_fields(successes: int, n: int) -> dict:
+    """Campos de estimación (share e IC 95%) para un ranking de tendencias."""
+    low, high = wilson_interval(successes, n)
+    return {
+        "share": min(successes, n) / n if n > 0 else None,
+        "share_low": low,
+        "share_high": high,
+        "estimated": True,
+    }
@@ -0,0 +1,112 @@
+from datetime import date
+
+from sqlalchemy import delete, func as sa_func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.board import Board
+from app.models.canonical_garment import CanonicalGarment
+from app.models.garment import Garment
+from app.models.outfit import Outfit
+from app.models.trend_rollup import GLOBAL_SCOPE, TrendRollup
+
+DIMENSIONS = ("garment_type", "garment", "color", "style")
+
+
+def _period(board: Board) -> date:
+    """Mes del análisis: los acumulados se agrupan por mes."""
+    analyzed = board.analyzed_at or board.created_at
+    return analyzed.date().replace(day=1)
+
+
+async def _board_counts(db: AsyncSession, board: Board) -> dict[str, list[tuple[str, int]]]:
+    """Conteos del tablero por dimensión, con las mismas reglas que /trends."""
+    garment_base = select(sa_func.count()).select_from(Garment).join(Outfit).where(
+        Outfit.board_id == board.id
+    )
+    counts: dict[str, list[tuple[str, int]]] = {}
+    canonical_base = garment_base.join(
+        CanonicalGarment, Garment.canonical_id == CanonicalGarment.id
+    )
+    for dimension, base, column in (
+        ("garment_type", garment_base, Garment.type),
+        ("garment", canonical_base, CanonicalGarment.name),
+        ("color", garment_base, Garment.color),
+    ):
+        result = await db.execute(
+            base.add_columns(column)
+            .where(column.isnot(None))
+            .group_by(column)
+        )
+        counts[dimension] = [(row[1], row[0]) for row in result.all()]
+
+    style_result = await db.execute(
+        select(Outfit.style, sa_func.count())
+        .where(
+            Outfit.board_id == board.id,
+            Outfit.duplicate_of_id.is_(None),
+            Outfit.style.isnot(None),
+        )
+        .group_by(Outfit.style)
+    )
+    counts["style"] = [(row[0], row[1]) for row in style_result.all()]
+    return counts
+
+
+async def _apply(db: AsyncSession, board: Board, sign: int) -> None:
+    counts = await _board_counts(db, board)
+    period = _period(board)
+    rows = [
+        {
+            "scope_id": scope_id,
+            "dimension": dimension,
+            "key": key[:100],
+            "period": period,
+            "count": sign * count,
+        }
+        for scope_id in (board.user_id, GLOBAL_SCOPE)
+        for dimension, items in counts.items()
+        for key, count in items
+    ]
+    if rows:
+        stmt = pg_insert(TrendRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["scope_id", "dimension", "key", "period"],
+            set_={"count": TrendRollup.count + stmt.excluded.count},
+        )
+        await db.execute(stmt)
+    if sign < 0:
+        await db.execute(
+            delete(TrendRollup).where(
+                TrendRollup.scope_id.in_((board.user_id, GLOBAL_SCOPE)),
+                TrendRollup.period == period,
+                TrendRollup.count <= 0,
+            )
+        )
+
+
+async def add_board_to_rollups(db: AsyncSession, board: Board) -> None:
+    """Suma el tablero recién completado a los acumulados del usuario y globales."""
+    if board.in_rollups:
+        return
+    await _apply(db, board, 1)
+    board.in_rollups = True
+
+
+async def remove_board_from_rollups(db: AsyncSession, board: Board) -> None:
+    """Resta el tablero (antes de borrarlo o re-analizarlo) de los acumulados."""
+    if not board.in_rollups:
+        return
+    await _apply(db, board, -1)
+    board.in_rollups = False
+
+
+async def get_rollups(
+    db: AsyncSession, scope_id, since: date
+) -> list[TrendRollup]:
+    result = await db.execute(
+        select(TrendRollup)
+        .where(TrendRollup.scope_id == scope_id, TrendRollup.period >= since)
+        .order_by(TrendRollup.period)
+    )
+    return list(result.scalars().all())
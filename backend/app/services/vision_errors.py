@@ -0,0 +1,137 @@
+import asyncio
+import random
+import re
+from dataclasses import dataclass
+
+import httpx
+
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+BAD_IMAGE = "bad_image"
+
+# Clases de error que cuentan para el circuit breaker de Gemini
+BREAKER_KINDS = {RATE_LIMIT, TRANSIENT}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int
+    base_seconds: float
+    cap_seconds: float
+
+
+# Backoff exponencial con jitter completo, por clase de error
+RETRY_POLICIES = {
+    RATE_LIMIT: RetryPolicy(max_attempts=5, base_seconds=5.0, cap_seconds=90.0),
+    TRANSIENT: RetryPolicy(max_attempts=4, base_seconds=1.0, cap_seconds=30.0),
+    PERMANENT: RetryPolicy(max_attempts=1, base_seconds=0.0, cap_seconds=0.0),
+    BAD_IMAGE: RetryPolicy(max_attempts=1, base_seconds=0.0, cap_seconds=0.0),
+}
+
+
+class VisionError(Exception):
+    """Error del análisis de un pin, clasificado para decidir si reintentar."""
+
+    kind = PERMANENT
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitError(VisionError):
+    kind = RATE_LIMIT
+
+
+class TransientVisionError(VisionError):
+    kind = TRANSIENT
+
+
+class PermanentVisionError(VisionError):
+    kind = PERMANENT
+
+
+class BadImageError(VisionError):
+    kind = BAD_IMAGE
+
+
+def _retry_after(text: str) -> float | None:
+    match = re.search(r"retryDelay\D*?(\d+(?:\.\d+)?)", text)
+    return float(match.group(1)) if match else None
+
+
+def classify_error(error: Exception) -> VisionError:
+    """Traduce excepciones de httpx / google-genai a la taxonomía de errores."""
+    if isinstance(error, VisionError):
+        return error
+    message = f"{type(error).__name__}: {error}"[:500]
+
+    # Descarga de la imagen
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        if status_code == 429 or status_code >= 500:
+            return TransientVisionError(message)
+        return BadImageError(message)
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return TransientVisionError(message)
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return TransientVisionError(message)
+
+    # Llamada a Gemini
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        if code == 429:
+            return RateLimitError(message, retry_after=_retry_after(str(error)))
+        if code in (408, 500, 502, 503, 504):
+            return TransientVisionError(message)
+        if code == 400 and "image" in str(error).lower():
+            return BadImageError(message)
+        return PermanentVisionError(message)
+    if "429" in str(error):
+        return RateLimitError(message, retry_after=_retry_after(str(error)))
+    return PermanentVisionError(message)
+
+
+def _api_error(error: Exception) -> tuple[int, str] | None:
+    """Código HTTP y estado de un APIError de google-genai, o None si no lo es."""
+    # Import diferido: si el error viene del SDK, ya está cargado
+    from google.genai import errors
+
+    if isinstance(error, errors.APIError):
+        return error.code, error.status
+    return None
+
+
+def is_cache_error(error: Exception) -> bool:
+    """
+    True si Gemini rechaza el contexto cacheado de la llamada: no existe o
+    ya expiró (404 NOT_FOUND, o 403 PERMISSION_DENIED cuando ya no es
+    accesible). Se re-crea y se reintenta sin contar como fallo.
+    """
+    api_error = _api_error(error)
+    return api_error is not None and api_error[1] in ("NOT_FOUND", "PERMISSION_DENIED")
+
+
+def is_cache_rejected(error: Exception) -> bool:
+    """
+    True si Gemini rechaza crear el caché por su contenido (400
+    INVALID_ARGUMENT, p. ej. bajo el mínimo de tokens cacheables): el prompt
+    no cambia, así que reintentar no sirve.
+    """
+    api_error = _api_error(error)
+    return api_error is not None and api_error == (400, "INVALID_ARGUMENT")
+
+
+def backoff_delay(error: VisionError, attempt: int) -> float | None:
+    """
+    Segundos a esperar antes del intento `attempt + 1` (jitter completo), o
+    None si la clase de error no se reintenta o se agotaron los intentos.
+    """
+    policy = RETRY_POLICIES[error.kind]
+    if attempt + 1 >= policy.max_attempts:
+        return None
+    delay = random.uniform(0, min(policy.cap_seconds, policy.base_seconds * 2**attempt))
+    if error.retry_after is not None:
+        delay = max(delay, error.retry_after + random.uniform(0, 2))
+    return delay
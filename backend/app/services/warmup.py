@@ -0,0 +1,140 @@
+import asyncio
+import importlib
+import logging
+import time
+from collections.abc import Awaitable, Callable, Sequence
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class Readiness:
+    """
+    Estado del warm-up del proceso: cada paso (pool de la base, cliente de
+    Gemini, pool de procesos...) termina en ok, failed o skipped.
+
+    El proceso está listo cuando no quedan pasos pendientes y ningún paso
+    obligatorio falló; los opcionales fallidos solo se informan.
+    """
+
+    def __init__(self) -> None:
+        self.checks: dict[str, str] = {}
+        self._required: set[str] = set()
+        self._started_at = time.monotonic()
+        self.warmup_seconds: float | None = None
+
+    def register(self, name: str, required: bool) -> None:
+        self.checks[name] = PENDING
+        if required:
+            self._required.add(name)
+
+    @property
+    def ready(self) -> bool:
+        return all(
+            state != PENDING and not (state == FAILED and name in self._required)
+            for name, state in self.checks.items()
+        )
+
+    @property
+    def status(self) -> str:
+        if self.ready:
+            return "ready"
+        if any(self.checks[name] == FAILED for name in self._required):
+            return "failed"
+        return "warming"
+
+    async def run(self, name: str, step: Callable[[], Awaitable[str | None]]) -> None:
+        try:
+            self.checks[name] = await step() or OK
+        except Exception as e:
+            self.checks[name] = FAILED
+            logger.warning("Warm-up %s falló: %s", name, e)
+
+
+readiness = Readiness()
+
+
+async def _warm_database() -> None:
+    # Abre la primera conexión del pool
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _warm_gemini() -> str | None:
+    if not settings.GEMINI_API_KEY:
+        return SKIPPED
+    from app.services.ai_vision import get_client
+
+    # Importar google.genai y crear el cliente bloquea: se hace en un hilo
+    await asyncio.to_thread(get_client)
+    return None
+
+
+async def _warm_color_pool() -> str | None:
+    if not settings.LOCAL_COLOR_EXTRACTION:
+        return SKIPPED
+    from app.services.color_palette import warm_up_executor
+
+    await warm_up_executor()
+    return None
+
+
+async def _warm_analytics() -> None:
+    # scipy.sparse se usa en co-ocurrencias; se importa fuera del event loop
+    await asyncio.to_thread(importlib.import_module, "scipy.sparse")
+
+
+_STEPS: list[tuple[str, Callable[[], Awaitable[str | None]], bool]] = [
+    ("database", _warm_database, True),
+    ("gemini_client", _warm_gemini, False),
+    ("color_pool", _warm_color_pool, False),
+    ("analytics", _warm_analytics, False),
+]
+
+
+for _name, _step, _required in _STEPS:
+    readiness.register(_name, _required)
+
+
+async def _recover(jobs: Sequence[Callable[[], Awaitable[object]]]) -> None:
+    """Trabajo pendiente del proceso anterior; solo si la base respondió."""
+    if readiness.checks["database"] != OK:
+        logger.warning("Base de datos no disponible: no se retoma trabajo pendiente")
+        return
+    for job in jobs:
+        try:
+            await job()
+        except Exception as e:
+            logger.error("No se pudo retomar %s: %s", job.__name__, e)
+
+
+async def warm_up(recovery: Sequence[Callable[[], Awaitable[object]]] = ()) -> None:
+    """
+    Ejecuta los pasos de warm-up en paralelo y registra su duración.
+    `recovery` (análisis interrumpidos, purgas pendientes) corre en cuanto
+    termina el paso de la base, sin esperar al resto ni bloquear el arranque.
+    """
+    steps = {name: step for name, step, _ in _STEPS}
+    warm_database = steps.pop("database")
+
+    async def database_then_recover() -> None:
+        await readiness.run("database", warm_database)
+        await _recover(recovery)
+
+    await asyncio.gather(
+        database_then_recover(),
+        *[readiness.run(name, step) for name, step in steps.items()],
+    )
+    readiness.warmup_seconds = round(time.monotonic() - readiness._started_at, 3)
+    logger.info(
+        "Warm-up terminado en %.2fs: %s", readiness.warmup_seconds, readiness.checks
+    )
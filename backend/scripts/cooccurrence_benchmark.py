@@ -0,0 +1,91 @@
+"""
+Benchmark de co-ocurrencia de prendas: `compute_cooccurrence` (matriz de
+incidencia dispersa, XᵀX) frente a un conteo en Python puro con
+combinaciones por outfit, que es lo que haría un self-join por petición.
+
+Uso (desde backend/):
+    python scripts/cooccurrence_benchmark.py [--outfits 1000 5000 20000] [--runs 5]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.cooccurrence import compute_cooccurrence  # noqa: E402
+
+DISTINCT_GARMENTS = 300
+GARMENTS_PER_OUTFIT = (3, 7)
+TOP_K = 20
+MIN_COUNT = 2
+
+
+def synthetic_pairs(outfits: int) -> list[tuple[uuid.UUID, str]]:
+    """Pares (outfit, prenda) con popularidad tipo Zipf, como en un tablero real."""
+    rng = random.Random(outfits)
+    names = [f"prenda {i}" for i in range(DISTINCT_GARMENTS)]
+    weights = [1 / (i + 1) for i in range(DISTINCT_GARMENTS)]
+    pairs = []
+    for _ in range(outfits):
+        outfit_id = uuid.uuid4()
+        for name in set(rng.choices(names, weights, k=rng.randint(*GARMENTS_PER_OUTFIT))):
+            pairs.append((outfit_id, name))
+    return pairs
+
+
+def python_counts(pairs: list[tuple[uuid.UUID, str]]) -> tuple[list, list]:
+    by_outfit: dict[uuid.UUID, set[str]] = {}
+    for outfit_id, name in pairs:
+        by_outfit.setdefault(outfit_id, set()).add(name)
+    pair_counts: Counter = Counter()
+    triple_counts: Counter = Counter()
+    for names in by_outfit.values():
+        ordered = sorted(names)
+        pair_counts.update(combinations(ordered, 2))
+        triple_counts.update(combinations(ordered, 3))
+    return pair_counts.most_common(TOP_K), triple_counts.most_common(TOP_K)
+
+
+def timed(fn, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--outfits", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Primera llamada fuera de la medición: importa scipy
+    compute_cooccurrence(synthetic_pairs(10), TOP_K, MIN_COUNT)
+    print(f"{'outfits':>8} {'prendas':>8} {'Python puro':>12} {'disperso':>10} {'x':>6}")
+    for outfits in args.outfits:
+        pairs = synthetic_pairs(outfits)
+        naive = timed(lambda: python_counts(pairs), args.runs)
+        sparse = timed(lambda: compute_cooccurrence(pairs, TOP_K, MIN_COUNT), args.runs)
+
+        # Mismo top de pares en ambas implementaciones
+        expected = {frozenset(p): n for p, n in python_counts(pairs)[0]}
+        result = compute_cooccurrence(pairs, TOP_K, MIN_COUNT)["pairs"]
+        got = {frozenset(item["garments"]): item["count"] for item in result}
+        if sorted(expected.values()) != sorted(got.values()):
+            print(f"ERROR: los conteos de pares no coinciden con {outfits} outfits")
+            return 1
+        print(f"{outfits:8d} {len(pairs):8d} {naive:10.1f}ms {sparse:8.1f}ms "
+              f"{naive / sparse:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
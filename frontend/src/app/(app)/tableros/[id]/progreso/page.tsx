@@ -37,7 +37,9 @@ function derivePhases(data: AnalysisStatus): Phase[] {
   }
 
   // Fase 1: Obteniendo imágenes (scraping)
-  const scraping: Phase = (phase === "scraping" || phase === "pending")
+  const scraping: Phase = phase === "queued"
+    ? { title: "Obteniendo imágenes", subtitle: "En cola, esperando turno en el lote...", status: "active" }
+    : (phase === "scraping" || phase === "pending")
     ? { title: "Obteniendo imágenes", subtitle: "Conectando con Pinterest...", status: "active" }
     : { title: "Obteniendo imágenes", subtitle: `${pinsTotal} pines obtenidos`, status: "completed" };
 
@@ -64,7 +66,7 @@ function deriveProgress(data: AnalysisStatus): number {
   const { phase, pinsTotal, pinsAnalyzed } = data;
   if (phase === "completed") return 100;
   if (phase === "failed") return 0;
-  if (phase === "pending" || phase === "scraping") return 5;
+  if (phase === "pending" || phase === "queued" || phase === "scraping") return 5;
   if (phase === "analyzing") {
     if (pinsTotal > 0) return Math.round(5 + (pinsAnalyzed / pinsTotal) * 93);
     return 5;
@@ -18,7 +18,7 @@ export default function BoardCard({ board, onDelete }: BoardCardProps) {
   const router = useRouter();
   const isCompleted = board.status === "completed";
   const isFailed = board.status === "failed";
-  const isInProgress = board.status === "scraping" || board.status === "analyzing";
+  const isInProgress = board.status === "queued" || board.status === "scraping" || board.status === "analyzing";
   const canReanalyze = isCompleted || isFailed;
   const outfitsCount = board.outfits?.length ?? board.outfitsCount ?? 0;
   const href = isInProgress ? ROUTES.progreso(board.id) : ROUTES.tablero(board.id);
@@ -27,6 +27,7 @@ export default function BoardCard({ board, onDelete }: BoardCardProps) {
     switch (board.status) {
       case "completed": return "Completado";
       case "failed": return "Error";
+      case "queued": return "En cola";
       case "scraping": return "Obteniendo...";
       case "analyzing": return "Analizando...";
       default: return "Pendiente";
@@ -34,6 +35,7 @@ export default function BoardCard({ board, onDelete }: BoardCardProps) {
   };
 
   const getStatusTooltip = () => {
+    if (board.status === "queued") return "Esperando turno en el lote de importación...";
     if (board.status === "scraping") return "Obteniendo imágenes del tablero...";
     if (board.status === "analyzing") {
       const pct = board.pinsCount > 0 ? Math.round(((board.pinsAnalyzedCount ?? 0) / board.pinsCount) * 100) : 0;
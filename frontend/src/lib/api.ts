@@ -99,6 +99,12 @@ export const boards = {
     request<void>(`/api/boards/${id}`, { method: "DELETE" }),
   analyze: (id: string) =>
     request<AnalysisResult>(`/api/boards/${id}/analyze`, { method: "POST" }),
+  resumeAnalysis: (id: string) =>
+    request<AnalysisResult>(`/api/boards/${id}/analyze/resume`, { method: "POST" }),
+  cancelAnalysis: (id: string) =>
+    request<AnalysisResult>(`/api/boards/${id}/analyze/cancel`, { method: "POST" }),
+  retryFailed: (id: string) =>
+    request<AnalysisResult>(`/api/boards/${id}/retry-failed`, { method: "POST" }),
   status: (id: string) =>
     request<AnalysisStatus>(`/api/boards/${id}/status`),
   outfits: (id: string, opts?: { garmentNames?: string[]; garmentColors?: string[]; garmentType?: string; connectors?: string[]; outfitSeason?: string[]; outfitStyle?: string[] }) => {
@@ -16,7 +16,8 @@ export interface Board {
   imageUrl: string | null;
   pinsCount: number;
   pinsAnalyzedCount?: number;
-  status: "completed" | "analyzing" | "scraping" | "pending" | "failed";
+  status: "completed" | "analyzing" | "scraping" | "queued" | "pending" | "failed" | "cancelled";
+  analysisMode?: "full" | "sample";
   analyzedAt: string | null;
   createdAt: string;
   outfits?: Outfit[];
@@ -31,6 +32,7 @@ export interface Outfit {
   style: string | null;
   season: string | null;
   sourcePinUrl: string | null;
+  palette?: string[] | null;
   createdAt: string;
   garments?: Garment[];
   garmentsCount?: number;
@@ -62,18 +64,25 @@ export interface Product {
   createdAt: string;
 }
 
-export interface GarmentRank {
+export interface TrendEstimate {
+  share?: number | null;
+  shareLow?: number | null;
+  shareHigh?: number | null;
+  estimated?: boolean;
+}
+
+export interface GarmentRank extends TrendEstimate {
   name: string;
   count: number;
 }
 
-export interface GarmentTypeRank {
+export interface GarmentTypeRank extends TrendEstimate {
   type: string;
   count: number;
   garments: GarmentRank[];
 }
 
-export interface ColorRank {
+export interface ColorRank extends TrendEstimate {
   color: string;
   count: number;
 }
@@ -95,11 +104,16 @@ export interface AnalysisResult {
 
 export interface AnalysisStatus {
   status: string;
-  phase: "scraping" | "analyzing" | "completed" | "failed" | "pending";
+  phase: "queued" | "scraping" | "analyzing" | "completed" | "failed" | "pending" | "cancelled";
   pinsTotal: number;
   pinsAnalyzed: number;
   outfitsCreated: number;
   garmentsCreated: number;
+  duplicatesSkipped?: number;
+  pinsFailed?: number;
+  analysisMode?: "full" | "sample";
+  queuePosition?: number | null;
+  etaSeconds?: number | null;
 }
 
 export interface FacetItem {